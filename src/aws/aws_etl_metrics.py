@@ -0,0 +1,193 @@
+import bisect
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+# Latency histogram buckets in seconds (Prometheus "le" upper bounds)
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+REPORT_FILE = 'src/data/output/opensearch/etl_run_report.json'
+PROMETHEUS_FILE = 'src/data/output/opensearch/etl_metrics.prom'
+METRIC_PREFIX = 'neptune_etl'
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bucket bound containing the q-th observation"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + [self.max], self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'max': round(self.max, 6),
+            'buckets': {str(b): c for b, c in zip(self.buckets + ['+Inf'], self.counts)}
+        }
+
+
+class EtlMetrics:
+    """Thread-safe per-stage counters, gauges and histograms for an ETL run.
+
+    Stages record into named counters (e.g. fetch.vertices, index.bytes_sent),
+    histograms (fetch.request_seconds, transform.page_seconds,
+    index.bulk_seconds) and gauges (queue.fetched). The run is written as a
+    JSON report with derived rates and as a Prometheus textfile for the node
+    exporter's textfile collector.
+
+    Comparing fetch.vertices_per_second, index.docs_per_second, the bulk
+    latency percentiles and the queue depths shows whether a run is limited
+    by Neptune, the network or OpenSearch.
+    """
+
+    def __init__(self, run_name='etl'):
+        self.run_name = run_name
+        self.start_time = time.time()
+        self.started_at = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.gauge_max = {}
+        self.histograms = {}
+
+    def inc(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        with self.lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram()
+            self.histograms[name].observe(value)
+
+    def set_gauge(self, name, value):
+        with self.lock:
+            self.gauges[name] = value
+            self.gauge_max[name] = max(self.gauge_max.get(name, value), value)
+
+    def timer(self, name):
+        """Context manager observing the elapsed seconds into histogram `name`"""
+        return _Timer(self, name)
+
+    def elapsed(self):
+        return time.time() - self.start_time
+
+    def report(self):
+        elapsed = self.elapsed()
+        with self.lock:
+            counters = dict(self.counters)
+            rates = {
+                'fetch.vertices_per_second': counters.get('fetch.vertices', 0) / elapsed if elapsed else 0.0,
+                'index.docs_per_second': counters.get('index.succeeded', 0) / elapsed if elapsed else 0.0,
+                'index.mb_per_second': counters.get('index.bytes_sent', 0) / 1024 / 1024 / elapsed if elapsed else 0.0
+            }
+            return {
+                'run': self.run_name,
+                'started_at': self.started_at,
+                'elapsed_seconds': round(elapsed, 3),
+                'counters': counters,
+                'rates': {k: round(v, 2) for k, v in rates.items()},
+                'gauges': {name: {'last': value, 'max': self.gauge_max[name]} for name, value in self.gauges.items()},
+                'histograms': {name: h.to_dict() for name, h in self.histograms.items()}
+            }
+
+    def write_report(self, path=REPORT_FILE):
+        _atomic_write(path, json.dumps(self.report(), indent=2))
+        return path
+
+    def write_prometheus(self, path=PROMETHEUS_FILE):
+        """Write all metrics in the Prometheus text exposition format.
+
+        Every run overwrites the same unlabelled series; the run name is only
+        carried by the run_info gauge, so each run does not start a new set
+        of time series.
+        """
+        report = self.report()
+        lines = []
+
+        def metric_name(name, suffix=''):
+            return f"{METRIC_PREFIX}_{name.replace('.', '_')}{suffix}"
+
+        lines.append(f"# TYPE {METRIC_PREFIX}_run_info gauge")
+        lines.append(f'{METRIC_PREFIX}_run_info{{run="{self.run_name}"}} 1')
+        lines.append(f"# TYPE {METRIC_PREFIX}_run_start_timestamp_seconds gauge")
+        lines.append(f"{METRIC_PREFIX}_run_start_timestamp_seconds {round(self.start_time, 3)}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_elapsed_seconds gauge")
+        lines.append(f"{METRIC_PREFIX}_elapsed_seconds {report['elapsed_seconds']}")
+        for name, value in sorted(report['counters'].items()):
+            lines.append(f"# TYPE {metric_name(name, '_total')} counter")
+            lines.append(f"{metric_name(name, '_total')} {value}")
+        for name, value in sorted(report['rates'].items()):
+            lines.append(f"# TYPE {metric_name(name)} gauge")
+            lines.append(f"{metric_name(name)} {value}")
+        for name, value in sorted(report['gauges'].items()):
+            lines.append(f"# TYPE {metric_name(name)} gauge")
+            lines.append(f"{metric_name(name)} {value['last']}")
+            lines.append(f"# TYPE {metric_name(name, '_max')} gauge")
+            lines.append(f"{metric_name(name, '_max')} {value['max']}")
+        with self.lock:
+            histograms = {name: (list(h.buckets), list(h.counts), h.count, h.sum)
+                          for name, h in self.histograms.items()}
+        for name, (buckets, counts, count, total) in sorted(histograms.items()):
+            base = metric_name(name)
+            lines.append(f"# TYPE {base} histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(buckets + ['+Inf'], counts):
+                cumulative += bucket_count
+                lines.append(f'{base}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f"{base}_sum {round(total, 6)}")
+            lines.append(f"{base}_count {count}")
+
+        _atomic_write(path, '\n'.join(lines) + '\n')
+        return path
+
+
+class _Timer:
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self.start
+        self.metrics.observe(self.name, self.seconds)
+
+
+def _atomic_write(path, content):
+    # The textfile collector may read at any moment; never expose a partial file
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
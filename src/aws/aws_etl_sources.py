@@ -0,0 +1,117 @@
+"""
+Vertex sources for the OpenSearch ETL other than Neptune.
+
+Each source yields pages of Neptune-style records ({id, labels, properties})
+so they drop into EtlPipeline in place of the Neptune fetchers. Building the
+first index from the GDS output files or the Postgres nodes table leaves
+Neptune's read capacity alone.
+"""
+import logging
+import os
+
+from neptune.gds import GDS_DIR, iter_gds_vertices, vertex_properties
+
+logger = logging.getLogger(__name__)
+
+SOURCES = ['neptune', 'gds', 'postgres']
+PAGE_SIZE = 5000
+# Rows fetched per round trip by the Postgres server-side cursor
+CURSOR_ITERSIZE = 10000
+
+
+def _project(record, properties):
+    if properties:
+        record['properties'] = {k: v for k, v in record['properties'].items() if k in properties}
+    return record
+
+
+def gds_record_pages(page_size=PAGE_SIZE, properties=None, label=None, gds_dir=GDS_DIR, metrics=None):
+    """Stream the GDS node files (one JSON array per node type) in pages of vertex records"""
+    node_types = [label] if label else None
+    logger.info(f"Reading vertices from GDS files in {gds_dir}...")
+    page = []
+    total = 0
+    for record in iter_gds_vertices(node_types, gds_dir):
+        page.append(_project(record, properties))
+        if len(page) >= page_size:
+            total += len(page)
+            if metrics:
+                metrics.inc('fetch.vertices', len(page))
+            yield page
+            page = []
+    if page:
+        total += len(page)
+        if metrics:
+            metrics.inc('fetch.vertices', len(page))
+        yield page
+    logger.info(f"Read {total} vertices from GDS files.")
+
+
+def postgres_db_params():
+    """Connection parameters from the same DB_* environment as the Postgres loader"""
+    from dotenv import load_dotenv
+    load_dotenv()
+    return {
+        'dbname': os.getenv('DB_NAME', 'neptune_db'),
+        'user': os.getenv('DB_USER', 'postgres'),
+        'password': os.getenv('DB_PASSWORD', 'postgres'),
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'port': os.getenv('DB_PORT', '5432')
+    }
+
+
+def postgres_record_pages(page_size=PAGE_SIZE, properties=None, label=None, db_params=None, metrics=None,
+                          itersize=CURSOR_ITERSIZE):
+    """Stream the Postgres nodes table through a named (server-side) cursor in pages of vertex records.
+
+    The server-side cursor keeps the result set in Postgres and ships
+    `itersize` rows per round trip, so memory does not grow with the table.
+    """
+    import psycopg2
+
+    conn = psycopg2.connect(**(db_params or postgres_db_params()))
+    try:
+        # Named cursors must live inside a transaction; it is read-only
+        conn.set_session(readonly=True)
+        with conn.cursor(name='opensearch_etl_nodes') as cursor:
+            cursor.itersize = itersize
+            query = "SELECT node_id, node_type, node_properties FROM nodes"
+            params = None
+            if label:
+                query += " WHERE node_type = %s"
+                params = (label,)
+            cursor.execute(query + " ORDER BY node_id", params)
+            logger.info("Reading vertices from the Postgres nodes table...")
+
+            total = 0
+            page = []
+            # Iterating a named cursor fetches itersize rows per round trip
+            for node_id, node_type, node_properties in cursor:
+                page.append(_project({
+                    'id': node_id,
+                    'labels': [node_type],
+                    'properties': vertex_properties(node_properties)
+                }, properties))
+                if len(page) >= page_size:
+                    total += len(page)
+                    if metrics:
+                        metrics.inc('fetch.vertices', len(page))
+                    yield page
+                    page = []
+            if page:
+                total += len(page)
+                if metrics:
+                    metrics.inc('fetch.vertices', len(page))
+                yield page
+        logger.info(f"Read {total} vertices from Postgres.")
+    finally:
+        conn.close()
+
+
+def source_record_pages(source, page_size=PAGE_SIZE, properties=None, label=None, metrics=None):
+    """Page generator for a non-Neptune source name"""
+    if source == 'gds':
+        return gds_record_pages(page_size, properties, label, metrics=metrics)
+    if source == 'postgres':
+        return postgres_record_pages(page_size, properties, label, metrics=metrics)
+    raise ValueError(f"Unknown vertex source '{source}' (expected one of {', '.join(SOURCES)})")
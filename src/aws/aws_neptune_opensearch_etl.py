@@ -1,9 +1,17 @@
+import argparse
 import boto3
 import requests
-from requests_aws4auth import AWS4Auth
 import json
 import logging
+import queue
+import threading
+import time
 import urllib3
+from aws_etl_metrics import EtlMetrics, PROMETHEUS_FILE, REPORT_FILE
+from aws_etl_sources import SOURCES, source_record_pages
+from aws_opensearch_bulk_indexer import BulkIndexer, MAX_BATCH_BYTES, MAX_BATCH_DOCS
+from aws_opensearch_index_manager import IndexManager
+from aws_sigv4_signer import RefreshingSigV4Auth
 
 # Disable insecure HTTPS warnings for Neptune self-signed certs
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -16,6 +24,31 @@ logger = logging.getLogger(__name__)
 NEPTUNE_ENDPOINT = 'https://localhost:8182/openCypher'
 OPENSEARCH_ENDPOINT = 'https://utrkg13gnjqpmyz93250.us-east-1.aoss.amazonaws.com'
 INDEX_NAME = 'aws-neptune'
+# Serverless collections (*.aoss.amazonaws.com) sign as 'aoss' and have no
+# aliases or index settings; managed domains sign as 'es'
+OPENSEARCH_SERVERLESS = '.aoss.' in OPENSEARCH_ENDPOINT
+OPENSEARCH_SERVICE = 'aoss' if OPENSEARCH_SERVERLESS else 'es'
+
+# Vertices fetched per OpenCypher request
+PAGE_SIZE = 5000
+# Vertex properties copied into the index; None copies all of them
+INDEXED_PROPERTIES = None
+
+# Person edges whose neighbors are embedded in person documents when
+# enrichment is on, mapped to the document field that holds them
+ENRICH_EDGE_TYPES = {
+    'person_name': 'names',
+    'person_address': 'addresses'
+}
+
+# Pipeline parallelism; each stage is connected by a queue of at most QUEUE_SIZE pages
+FETCH_WORKERS = 4
+TRANSFORM_WORKERS = 2
+INDEX_WORKERS = 4
+QUEUE_SIZE = 8
+
+# Queue sentinel marking the end of a stage's input
+_DONE = object()
 
 # HTTP headers
 NEPTUNE_HEADERS = {
@@ -23,115 +56,517 @@ NEPTUNE_HEADERS = {
     'Accept': 'application/json'
 }
 
-BASE_OS_HEADERS = {
-    'Content-Type': 'application/json',
-    'Accept': 'application/json'
-}
 
+def record_to_document(record):
+    """Flatten a Neptune OpenCypher vertex ({id, labels, properties}) into an index document"""
+    doc = {}
+    doc['id'] = record.get('id')
+    doc['labels'] = record.get('labels', [])
+    properties = record.get('properties', {})
+
+    # Merge properties into the root document
+    if isinstance(properties, dict):
+        for k, v in properties.items():
+            doc[k] = v
+    return doc
+
+
+def build_page_query(label=None, properties=None, bounded=False):
+    """Build the keyset-paginated vertex query.
+
+    Vertices are ordered by ID and each page starts after the last ID of the
+    previous one, so every page is an index range scan instead of an ever
+    growing SKIP. With `properties` only those keys are projected, which keeps
+    unindexed fields off the wire. `bounded` adds an exclusive upper ID so
+    several fetchers can each page through their own ID range.
+    """
+    match = f"MATCH (n:`{label}`)" if label else "MATCH (n)"
+    where = "WHERE id(n) > $cursor AND id(n) < $end_before" if bounded else "WHERE id(n) > $cursor"
+    if properties:
+        projection = "n {" + ", ".join(f".`{p}`" for p in properties) + "}"
+    else:
+        projection = "properties(n)"
+    return (
+        f"{match} {where} "
+        f"RETURN id(n) AS id, labels(n) AS labels, {projection} AS properties "
+        f"ORDER BY id(n) LIMIT $page_size"
+    )
+
+
+def fetch_vertex_records(page_size=PAGE_SIZE, properties=INDEXED_PROPERTIES, label=None, start_after='',
+                         end_before=None, neptune_auth=None, metrics=None):
+    """Stream raw Neptune vertex records ({id, labels, properties}) one page at a time"""
+    logger.info(f"Fetching vertices from Neptune (OpenCypher, {page_size} per page, "
+                f"IDs after '{start_after}'{f' before {end_before!r}' if end_before else ''})...")
+    query = build_page_query(label, properties, bounded=end_before is not None)
+    cursor = start_after
+    total = 0
+
+    with requests.Session() as session:
+        while True:
+            parameters = {'cursor': cursor, 'page_size': page_size}
+            if end_before is not None:
+                parameters['end_before'] = end_before
+            payload = {
+                'query': query,
+                'parameters': json.dumps(parameters)
+            }
+            request_start = time.perf_counter()
+            try:
+                response = session.post(NEPTUNE_ENDPOINT, headers=NEPTUNE_HEADERS, json=payload, verify=False,
+                                        auth=neptune_auth)
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Error querying Neptune OpenCypher after ID '{cursor}': {str(e)}")
+                if metrics:
+                    metrics.inc('fetch.errors')
+                raise
+            if metrics:
+                metrics.observe('fetch.request_seconds', time.perf_counter() - request_start)
+                metrics.inc('fetch.requests')
+                metrics.inc('fetch.bytes_received', len(response.content))
+
+            results = response.json().get('results', [])
+            if not results:
+                break
+
+            records = []
+            for idx, row in enumerate(results):
+                record = row.get('n') or row
+                if not isinstance(record, dict):
+                    logger.warning(f"Skipping unexpected record at index {idx}: {record}")
+                    continue
+                records.append(record)
+
+            total += len(records)
+            if metrics:
+                metrics.inc('fetch.vertices', len(records))
+            # Keyset cursor: the last ID of this page, whatever was skipped
+            cursor = results[-1].get('id', cursor)
+            logger.debug(f"Fetched page of {len(records)} vertices (total {total}, cursor {cursor})")
+            yield records
+
+            if len(results) < page_size:
+                break
 
-def fetch_vertices():
-    """Fetch all vertices from Neptune using OpenCypher"""
-    logger.info("Fetching vertices from Neptune (OpenCypher)...")
-    query = {'query': 'MATCH (n) RETURN n'}
+    if total == 0:
+        logger.warning("No vertices returned from Neptune.")
+    logger.info(f"Fetched {total} vertices.")
+
+
+def fetch_vertices(page_size=PAGE_SIZE, properties=INDEXED_PROPERTIES, label=None, start_after='', end_before=None,
+                   neptune_auth=None):
+    """Stream vertices from Neptune using OpenCypher, one page of documents at a time"""
+    first = True
+    for records in fetch_vertex_records(page_size, properties, label, start_after, end_before, neptune_auth):
+        documents = [record_to_document(record) for record in records]
+        if first and documents:
+            logger.debug("First vertex sample: %s", json.dumps(documents[0], indent=2))
+            first = False
+        yield documents
+
+
+def fetch_vertices_by_id(ids, properties=INDEXED_PROPERTIES, session=None, neptune_auth=None):
+    """Fetch the current state of specific vertices; IDs that no longer exist are simply absent"""
+    if not ids:
+        return []
+    if properties:
+        projection = "n {" + ", ".join(f".`{p}`" for p in properties) + "}"
+    else:
+        projection = "properties(n)"
+    payload = {
+        'query': f"MATCH (n) WHERE id(n) IN $ids RETURN id(n) AS id, labels(n) AS labels, {projection} AS properties",
+        'parameters': json.dumps({'ids': list(ids)})
+    }
     try:
-        response = requests.post(NEPTUNE_ENDPOINT, headers=NEPTUNE_HEADERS, json=query, verify=False)
+        response = (session or requests).post(NEPTUNE_ENDPOINT, headers=NEPTUNE_HEADERS, json=payload, verify=False,
+                                              auth=neptune_auth)
         response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Error fetching {len(ids)} vertices by ID: {str(e)}")
+        raise
+    return transform_page(response.json().get('results', []))
 
-        body = response.json()
-        results = body.get('results', [])
-        if not results:
-            logger.warning("No vertices returned from Neptune.")
-            return []
-
-        documents = []
-        for idx, row in enumerate(results):
-            record = row.get('n') or row
-            if not isinstance(record, dict):
-                logger.warning(f"Skipping unexpected record at index {idx}: {record}")
-                continue
 
-            doc = {}
+def split_id_ranges(workers):
+    """Split the vertex ID space into `workers` contiguous (start_after, end_before) ranges.
 
-            # Neptune OpenCypher format: { id, labels, properties }
-            doc['id'] = record.get('id')
-            doc['labels'] = record.get('labels', [])
-            properties = record.get('properties', {})
+    Vertex IDs are UUIDs, so boundaries are spread over the leading hex digit.
+    The first range starts at '' and the last one is unbounded, so IDs that
+    are not UUIDs are still covered.
+    """
+    hex_digits = '0123456789abcdef'
+    workers = max(1, min(workers, len(hex_digits)))
+    bounds = [hex_digits[len(hex_digits) * i // workers] for i in range(1, workers)]
+    ranges = []
+    lower = ''
+    for bound in bounds:
+        ranges.append((lower, bound))
+        # Keyset pages are exclusive of start_after; the bound itself is a
+        # single character that no UUID equals, so nothing is skipped
+        lower = bound
+    ranges.append((lower, None))
+    return ranges
 
-            # Merge properties into the root document
-            if isinstance(properties, dict):
-                for k, v in properties.items():
-                    doc[k] = v
 
-            documents.append(doc)
+def transform_page(records):
+    """Turn a page of raw Neptune records into index documents"""
+    documents = []
+    for record in records:
+        doc = record_to_document(record)
+        if doc.get('id') is None:
+            continue
+        doc['id'] = str(doc['id'])
+        documents.append(doc)
+    return documents
 
-        logger.info(f"Fetched {len(documents)} vertices.")
-        if documents:
-            logger.debug("First vertex sample: %s", json.dumps(documents[0], indent=2))
-        return documents
 
+def fetch_neighbor_summaries(person_ids, session=None, neptune_auth=None):
+    """Fetch compact name/address summaries for a page of persons in a single query"""
+    edge_types = '|'.join(f"`{edge_type}`" for edge_type in ENRICH_EDGE_TYPES)
+    payload = {
+        'query': (
+            f"MATCH (p:person)-[e:{edge_types}]->(m) WHERE id(p) IN $ids "
+            "RETURN id(p) AS id, type(e) AS edge_type, id(m) AS neighbor_id, "
+            "coalesce(m.name_full, m.node_name) AS name_full, m.address_full AS address_full, "
+            "e.name_type AS name_type"
+        ),
+        'parameters': json.dumps({'ids': list(person_ids)})
+    }
+    try:
+        response = (session or requests).post(NEPTUNE_ENDPOINT, headers=NEPTUNE_HEADERS, json=payload, verify=False,
+                                              auth=neptune_auth)
+        response.raise_for_status()
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error querying Neptune OpenCypher: {str(e)}")
+        logger.error(f"Error fetching neighborhoods for {len(person_ids)} persons: {str(e)}")
         raise
+    return response.json().get('results', [])
+
+
+def enrich_page(documents, session=None, neptune_auth=None):
+    """Embed name and address neighbor summaries in the person documents of a page.
+
+    One batched neighborhood query per page, never one per vertex. Persons
+    without such edges get empty lists so stale neighbors are cleared on
+    reindex.
+    """
+    persons = {doc['id']: doc for doc in documents if 'person' in doc.get('labels', [])}
+    if not persons:
+        return documents
+
+    for doc in persons.values():
+        for field in ENRICH_EDGE_TYPES.values():
+            doc[field] = []
+
+    for row in fetch_neighbor_summaries(list(persons), session, neptune_auth):
+        doc = persons.get(str(row.get('id')))
+        field = ENRICH_EDGE_TYPES.get(row.get('edge_type'))
+        if doc is None or field is None:
+            continue
+        summary = {'id': str(row.get('neighbor_id'))}
+        for key in ('name_full', 'address_full', 'name_type'):
+            if row.get(key) is not None:
+                summary[key] = row[key]
+        doc[field].append(summary)
+    return documents
+
+
+def fetch_documents_by_id(ids, properties=INDEXED_PROPERTIES, session=None, neptune_auth=None, enrich=False):
+    """Current documents for specific vertices, shaped (and optionally enriched) like the full ETL's"""
+    documents = fetch_vertices_by_id(ids, properties, session, neptune_auth)
+    if enrich:
+        documents = enrich_page(documents, session, neptune_auth)
+    return documents
+
+
+class EtlPipeline:
+    """Fetch -> transform -> index pipeline connected by bounded queues.
+
+    Fetch workers page through their own ID range in Neptune, transform
+    workers shape documents (and optionally embed person neighborhoods), and index workers each drive a BulkIndexer, so
+    Neptune reads and OpenSearch writes overlap. Queues are bounded: when
+    OpenSearch falls behind, the fetchers block instead of buffering the
+    graph in memory. Queue depths are logged every `monitor_interval`
+    seconds to show which side is the bottleneck (full fetched queue:
+    transform/index bound; empty queues: Neptune bound).
+
+    Every stage records into `metrics` (an EtlMetrics): Neptune request
+    latency and vertices fetched, transform/enrich time per page, _bulk
+    latency, bytes and retries, and the queue depths sampled by the monitor.
+
+    With `source` set to 'gds' or 'postgres' a single fetcher streams the
+    GDS output files or the Postgres nodes table instead of reading Neptune;
+    the documents come out in the same shape.
+    """
+
+    def __init__(self, auth, fetch_workers=FETCH_WORKERS, transform_workers=TRANSFORM_WORKERS,
+                 index_workers=INDEX_WORKERS, queue_size=QUEUE_SIZE, page_size=PAGE_SIZE,
+                 properties=INDEXED_PROPERTIES, label=None, indexer_options=None, monitor_interval=10,
+                 index_name=INDEX_NAME, enrich=False, neptune_auth=None, metrics=None, source='neptune'):
+        if source != 'neptune' and enrich:
+            raise ValueError("Enrichment reads neighborhoods from Neptune; it needs source='neptune'")
+        self.auth = auth
+        self.source = source
+        self.metrics = metrics or EtlMetrics()
+        self.neptune_auth = neptune_auth
+        self.enrich = enrich
+        self.index_name = index_name
+        self.fetch_workers = fetch_workers
+        self.transform_workers = transform_workers
+        self.index_workers = index_workers
+        self.page_size = page_size
+        self.properties = properties
+        self.label = label
+        self.indexer_options = indexer_options or {}
+        self.monitor_interval = monitor_interval
+
+        self.fetched = queue.Queue(maxsize=queue_size)
+        self.transformed = queue.Queue(maxsize=queue_size)
+        self.stop = threading.Event()
+        self.errors = []
+        self.indexers = []
+
+    def _put(self, q, item):
+        # Poll so a failed downstream stage cannot leave producers blocked forever
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self.stop.is_set():
+            try:
+                return q.get(timeout=1)
+            except queue.Empty:
+                continue
+        return None
+
+    def _run_stage(self, name, target, *args):
+        try:
+            target(*args)
+        except Exception as e:
+            logger.error(f"{name} failed: {str(e)}")
+            self.errors.append(e)
+            self.stop.set()
+
+    def _fetch(self, start_after, end_before):
+        for records in fetch_vertex_records(self.page_size, self.properties, self.label, start_after, end_before,
+                                            self.neptune_auth, self.metrics):
+            if not self._put(self.fetched, records):
+                return
+
+    def _fetch_source(self):
+        for records in source_record_pages(self.source, self.page_size, self.properties, self.label, self.metrics):
+            if not self._put(self.fetched, records):
+                return
+
+    def _transform(self):
+        with requests.Session() as session:
+            while True:
+                records = self._get(self.fetched)
+                if records is None or records is _DONE:
+                    return
+                with self.metrics.timer('transform.page_seconds'):
+                    documents = transform_page(records)
+                if self.enrich:
+                    with self.metrics.timer('transform.enrich_seconds'):
+                        documents = enrich_page(documents, session, self.neptune_auth)
+                self.metrics.inc('transform.documents', len(documents))
+                if not self._put(self.transformed, documents):
+                    return
+
+    def _index(self, indexer):
+        with indexer:
+            while True:
+                documents = self._get(self.transformed)
+                if documents is None or documents is _DONE:
+                    return
+                index_documents(indexer, documents)
+
+    def _sample_queues(self):
+        self.metrics.set_gauge('queue.fetched', self.fetched.qsize())
+        self.metrics.set_gauge('queue.transformed', self.transformed.qsize())
+
+    def _monitor(self):
+        # Sample queue depths every second; log them every monitor_interval
+        last_log = time.time()
+        while not self.stop.wait(1):
+            self._sample_queues()
+            if time.time() - last_log < self.monitor_interval:
+                continue
+            last_log = time.time()
+            logger.info(
+                f"Queue depths: fetched={self.fetched.qsize()}/{self.fetched.maxsize} "
+                f"transformed={self.transformed.qsize()}/{self.transformed.maxsize}; "
+                f"indexed {sum(i.succeeded for i in self.indexers)} documents"
+            )
+
+    def _start(self, name, target, *args):
+        thread = threading.Thread(target=self._run_stage, args=(name, target, *args), name=name, daemon=True)
+        thread.start()
+        return thread
+
+    def run(self):
+        start_time = time.time()
+        monitor = threading.Thread(target=self._monitor, name='monitor', daemon=True)
+        monitor.start()
+
+        if self.source == 'neptune':
+            fetchers = [self._start(f'fetch-{i}', self._fetch, start_after, end_before)
+                        for i, (start_after, end_before) in enumerate(split_id_ranges(self.fetch_workers))]
+        else:
+            fetchers = [self._start(f'fetch-{self.source}', self._fetch_source)]
+        transformers = [self._start(f'transform-{i}', self._transform) for i in range(self.transform_workers)]
+        for i in range(self.index_workers):
+            # One request in flight per index worker, so index_workers is the
+            # total _bulk concurrency
+            indexer = BulkIndexer(OPENSEARCH_ENDPOINT, self.index_name, self.auth, concurrency=1,
+                                  metrics=self.metrics, **self.indexer_options)
+            self.indexers.append(indexer)
+        indexers = [self._start(f'index-{i}', self._index, indexer) for i, indexer in enumerate(self.indexers)]
+
+        # Shut down stage by stage: each downstream worker gets one sentinel
+        for thread in fetchers:
+            thread.join()
+        for _ in transformers:
+            self._put(self.fetched, _DONE)
+        for thread in transformers:
+            thread.join()
+        for _ in indexers:
+            self._put(self.transformed, _DONE)
+        for thread in indexers:
+            thread.join()
+        self.stop.set()
+        monitor.join()
+
+        if self.errors:
+            raise self.errors[0]
+
+        elapsed = time.time() - start_time
+        succeeded = sum(i.succeeded for i in self.indexers)
+        failed = sum(i.failed for i in self.indexers)
+        self.metrics.inc('index.succeeded', succeeded)
+        self.metrics.inc('index.failed', failed)
+        logger.info(
+            f"Pipeline finished in {elapsed:.1f}s: {succeeded} indexed, {failed} failed, "
+            f"{succeeded / elapsed if elapsed else 0:.0f} docs/s"
+        )
+        return succeeded, failed
 
 
 def create_index(auth):
-    """Create the OpenSearch index if it doesn't exist"""
-    url = f"{OPENSEARCH_ENDPOINT}/{INDEX_NAME}"
-    headers = BASE_OS_HEADERS.copy()
-    headers['X-Amz-Security-Token'] = auth.session_token
+    """Create the OpenSearch index with explicit mappings if it doesn't exist"""
+    manager = IndexManager(OPENSEARCH_ENDPOINT, INDEX_NAME, auth)
     try:
         logger.info(f"Creating index '{INDEX_NAME}'...")
-        response = requests.put(url, auth=auth, headers=headers)
-        logger.debug(f"Create index response: {response.status_code} - {response.text}")
-        if response.status_code == 200:
-            logger.info(f"Index '{INDEX_NAME}' created.")
-        elif response.status_code == 400 and 'resource_already_exists_exception' in response.text:
-            logger.info(f"Index '{INDEX_NAME}' already exists.")
-        else:
-            response.raise_for_status()
+        manager.create_index(INDEX_NAME)
     except requests.exceptions.RequestException as e:
         logger.error(f"Failed to create index '{INDEX_NAME}': {str(e)}")
         raise
 
 
-def index_documents(auth, documents):
-    """Index each document into OpenSearch"""
-    headers = BASE_OS_HEADERS.copy()
-    headers['X-Amz-Security-Token'] = auth.session_token
-    total = len(documents)
-    logger.info(f"Indexing {total} documents into OpenSearch...")
-
-    success = 0
-    failure = 0
-
+def index_documents(indexer, documents):
+    """Queue documents on the bulk indexer; batches are sent as they fill up"""
     for idx, doc in enumerate(documents, start=1):
         doc_id = str(doc.get('id') or f"doc_{idx}")
-        url = f"{OPENSEARCH_ENDPOINT}/{INDEX_NAME}/_doc/{doc_id}"
-        try:
-            response = requests.put(url, auth=auth, headers=headers, json=doc)
-            response.raise_for_status()
-            logger.info(f"[{idx}/{total}] Indexed document ID={doc_id}")
-            success += 1
-        except requests.exceptions.RequestException as e:
-            logger.error(f"[{idx}/{total}] Failed to index document {doc_id}: {str(e)}")
-            failure += 1
-
-    logger.info(f"Indexing complete: {success} succeeded, {failure} failed.")
+        indexer.index(doc_id, doc)
+    logger.debug(f"Queued {len(documents)} documents ({indexer.summary()})")
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Export Neptune vertices into OpenSearch')
+    parser.add_argument('--source', choices=SOURCES, default='neptune',
+                        help='Read vertices from Neptune, the GDS output files or the Postgres nodes table')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help='Vertices fetched per Neptune request')
+    parser.add_argument('--properties', nargs='+', default=INDEXED_PROPERTIES,
+                        help='Only fetch and index these vertex properties')
+    parser.add_argument('--label', help='Only export vertices with this label')
+    parser.add_argument('--batch-bytes', type=int, default=MAX_BATCH_BYTES, help='Maximum _bulk request size in bytes')
+    parser.add_argument('--batch-docs', type=int, default=MAX_BATCH_DOCS, help='Maximum documents per _bulk request')
+    parser.add_argument('--fetch-workers', type=int, default=FETCH_WORKERS,
+                        help='Concurrent Neptune readers, each paging through its own ID range (--source neptune only)')
+    parser.add_argument('--transform-workers', type=int, default=TRANSFORM_WORKERS,
+                        help='Threads shaping Neptune records into documents')
+    parser.add_argument('--index-workers', type=int, default=INDEX_WORKERS,
+                        help='Concurrent _bulk requests to OpenSearch')
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE, help='Pages buffered between stages')
+    parser.add_argument('--enrich', action='store_true',
+                        help='Embed connected name/address summaries in person documents')
+    parser.add_argument('--alias', action='store_true',
+                        help=f"Build a new bulk-tuned index and point the '{INDEX_NAME}' alias at it when done "
+                             "(managed OpenSearch domains only; Serverless has no aliases)")
+    parser.add_argument('--replicas', type=int, default=1, help='Replicas restored on the new index before the swap')
+    parser.add_argument('--neptune-iam', action='store_true', help='Sign Neptune requests (IAM database auth)')
+    parser.add_argument('--neptune-host', help='Host to sign Neptune requests for when tunnelling through localhost, '
+                                               'e.g. neptune-dev.cluster-....neptune.amazonaws.com:8182')
+    parser.add_argument('--report', default=REPORT_FILE, help='JSON run report with per-stage metrics')
+    parser.add_argument('--prometheus-file', default=PROMETHEUS_FILE,
+                        help='Prometheus textfile for the node exporter textfile collector')
+    args = parser.parse_args()
+
     try:
-        # Set up AWS credentials
+        # Set up AWS credentials; the signers refresh them as they near
+        # expiry, so long reindexes keep running
         session = boto3.Session(profile_name='default')
-        creds = session.get_credentials().get_frozen_credentials()
-        region = session.region_name or 'us-east-1'
-        auth = AWS4Auth(creds.access_key, creds.secret_key, region, 'aoss', session_token=creds.token)
+        auth = RefreshingSigV4Auth(OPENSEARCH_SERVICE, session=session)
+        neptune_auth = None
+        if args.neptune_iam:
+            neptune_auth = RefreshingSigV4Auth('neptune-db', session=session, host=args.neptune_host)
+
+        # With --alias a full reindex builds a fresh bulk-tuned index and swaps
+        # the alias at the end, so the live index is never written to during
+        # the rebuild; otherwise documents go straight into INDEX_NAME
+        manager = None
+        if args.alias:
+            if OPENSEARCH_SERVERLESS:
+                raise ValueError(f"--alias needs a managed OpenSearch domain; {OPENSEARCH_ENDPOINT} is a "
+                                 "Serverless collection, which has no aliases")
+            manager = IndexManager(OPENSEARCH_ENDPOINT, INDEX_NAME, auth)
+            target_index = manager.create_build_index()
+        else:
+            create_index(auth)
+            target_index = INDEX_NAME
 
-        # Run ETL
-        vertices = fetch_vertices()
-        create_index(auth)
-        index_documents(auth, vertices)
+        # Run ETL, indexing each page as it arrives
+        metrics = EtlMetrics(run_name=target_index)
+        pipeline = EtlPipeline(
+            auth,
+            fetch_workers=args.fetch_workers,
+            transform_workers=args.transform_workers,
+            index_workers=args.index_workers,
+            queue_size=args.queue_size,
+            page_size=args.page_size,
+            properties=args.properties,
+            label=args.label,
+            index_name=target_index,
+            enrich=args.enrich,
+            neptune_auth=neptune_auth,
+            metrics=metrics,
+            source=args.source,
+            indexer_options={
+                'max_bytes': args.batch_bytes,
+                'max_docs': args.batch_docs
+            }
+        )
+        try:
+            succeeded, failed = pipeline.run()
+        finally:
+            # Written for failed runs too; they are the ones worth diagnosing
+            logger.info(f"Run report written to {metrics.write_report(args.report)}, "
+                        f"Prometheus metrics to {metrics.write_prometheus(args.prometheus_file)}")
 
+        logger.info(f"Indexing complete: {succeeded} succeeded, {failed} failed.")
+        if failed:
+            errors = [error for indexer in pipeline.indexers for error in indexer.errors]
+            logger.error(f"Sample of failed documents: {json.dumps(errors[:5], default=str)}")
+        if manager:
+            if failed:
+                raise Exception(f"{failed} documents failed; alias left on the previous index, "
+                                f"partial build kept in '{target_index}'")
+            manager.publish(target_index, replicas=args.replicas)
         logger.info("ETL process completed successfully.")
     except Exception as e:
         logger.error(f"ETL process failed: {str(e)}")
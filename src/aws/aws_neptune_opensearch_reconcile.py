@@ -0,0 +1,334 @@
+"""
+Sampled, digest-based Neptune <-> OpenSearch reconciliation.
+
+The vertex ID space is split into hex-prefix ranges (vertex IDs are UUIDs).
+For each range both sides are streamed with only the key fields projected,
+and every vertex is hashed into an order-independent digest (count, XOR and
+sum of 64-bit hashes of the id plus key fields). Digests of the next prefix
+level are collected in the same pass, so a range whose digests differ is
+narrowed down without re-reading the matching parts. Once a differing range
+is small enough, per-ID hashes are compared to find the divergent IDs.
+
+Divergent IDs are reindexed from Neptune and IDs that no longer exist in
+Neptune are deleted from the index. Pass --enrich when the index was built
+with the ETL's --enrich, so repaired documents keep their neighbor summaries. --sample-ranges checks a random subset of
+ranges for a quick post-ETL spot check; --dry-run only reports.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+
+import boto3
+import requests
+
+from aws_neptune_opensearch_etl import (
+    INDEX_NAME, OPENSEARCH_ENDPOINT, OPENSEARCH_SERVICE, fetch_documents_by_id, fetch_vertex_records
+)
+from aws_opensearch_bulk_indexer import BulkIndexer
+from aws_opensearch_index_manager import DATE_FIELDS, KEYWORD_FIELDS, NAME_FIELDS
+from aws_sigv4_signer import RefreshingSigV4Auth
+
+logger = logging.getLogger(__name__)
+
+HEX_DIGITS = '0123456789abcdef'
+# Key fields hashed on both sides; enrichment fields only exist in OpenSearch
+KEY_FIELDS = [f for f in KEYWORD_FIELDS + NAME_FIELDS + DATE_FIELDS if f not in ('id', 'labels')]
+# Hex digits in a top-level range prefix (2 -> 256 ranges)
+PREFIX_LENGTH = 2
+# Ranges with at most this many vertices are compared ID by ID
+LEAF_SIZE = 2000
+PAGE_SIZE = 5000
+REPAIR_BATCH = 1000
+REPORT_FILE = 'src/data/output/opensearch/reconcile_report.json'
+
+_MASK = (1 << 64) - 1
+
+SEARCH_HEADERS = {
+    'Content-Type': 'application/json',
+    'Accept': 'application/json'
+}
+
+
+class Digest:
+    """Order-independent digest of a set of (id, fields) hashes"""
+
+    __slots__ = ('count', 'xor', 'sum')
+
+    def __init__(self):
+        self.count = 0
+        self.xor = 0
+        self.sum = 0
+
+    def add(self, value):
+        self.count += 1
+        self.xor ^= value
+        self.sum = (self.sum + value) & _MASK
+
+    def __eq__(self, other):
+        return (self.count, self.xor, self.sum) == (other.count, other.xor, other.sum)
+
+    def to_dict(self):
+        return {'count': self.count, 'xor': f"{self.xor:016x}", 'sum': f"{self.sum:016x}"}
+
+
+def vertex_hash(vertex_id, labels, fields, key_fields=KEY_FIELDS):
+    """64-bit hash of a vertex's id, labels and key fields.
+
+    Missing and null fields are treated alike: the Neptune projection returns
+    null for absent properties while the index document omits them.
+    """
+    canonical = {'id': str(vertex_id), 'labels': sorted(labels or [])}
+    for field in key_fields:
+        value = fields.get(field)
+        if value is not None:
+            canonical[field] = value
+    encoded = json.dumps(canonical, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), 'big')
+
+
+def prefix_bounds(prefix):
+    """(start_after, end_before) keyset bounds covering IDs that start with `prefix`.
+
+    The first range also covers IDs sorting before '0' and the last one IDs
+    after 'f', so non-UUID IDs are not silently skipped.
+    """
+    start_after = '' if prefix.strip('0') == '' else prefix
+    stripped = prefix.rstrip('f')
+    if not stripped:
+        return start_after, None
+    end_before = stripped[:-1] + HEX_DIGITS[HEX_DIGITS.index(stripped[-1]) + 1]
+    return start_after, end_before
+
+
+def child_prefix(vertex_id, prefix):
+    """Prefix one hex digit longer than `prefix` that the ID falls under"""
+    depth = len(prefix) + 1
+    head = str(vertex_id)[:depth].lower()
+    if len(head) < depth or head < prefix + '0':
+        return prefix + '0'
+    if head > prefix + 'f' or head[-1] not in HEX_DIGITS:
+        return prefix + 'f'
+    return head
+
+
+class NeptuneSide:
+    name = 'neptune'
+
+    def __init__(self, key_fields=KEY_FIELDS, label=None, page_size=PAGE_SIZE, neptune_auth=None):
+        self.key_fields = key_fields
+        self.label = label
+        self.page_size = page_size
+        self.neptune_auth = neptune_auth
+
+    def scan(self, prefix):
+        """Yield (id, hash) for every vertex in the prefix range"""
+        start_after, end_before = prefix_bounds(prefix)
+        for records in fetch_vertex_records(self.page_size, self.key_fields, self.label, start_after, end_before,
+                                            self.neptune_auth):
+            for record in records:
+                if record.get('id') is None:
+                    continue
+                yield str(record['id']), vertex_hash(record['id'], record.get('labels'),
+                                                     record.get('properties') or {}, self.key_fields)
+
+
+class OpenSearchSide:
+    name = 'opensearch'
+
+    def __init__(self, auth, index_name=INDEX_NAME, key_fields=KEY_FIELDS, label=None, page_size=PAGE_SIZE):
+        self.url = f"{OPENSEARCH_ENDPOINT}/{index_name}/_search"
+        self.auth = auth
+        self.key_fields = key_fields
+        self.label = label
+        self.page_size = min(page_size, 10000)
+        self.session = requests.Session()
+
+    def scan(self, prefix):
+        """Yield (id, hash) for every document in the prefix range, paged with search_after on id"""
+        start_after, end_before = prefix_bounds(prefix)
+        bounds = {'gt': start_after}
+        if end_before is not None:
+            bounds['lt'] = end_before
+        filters = [{'range': {'id': bounds}}]
+        if self.label:
+            filters.append({'term': {'labels': self.label}})
+        body = {
+            'size': self.page_size,
+            '_source': ['id', 'labels'] + self.key_fields,
+            'query': {'bool': {'filter': filters}},
+            'sort': [{'id': 'asc'}]
+        }
+        while True:
+            response = self.session.post(self.url, auth=self.auth, headers=SEARCH_HEADERS, json=body)
+            response.raise_for_status()
+            hits = response.json().get('hits', {}).get('hits', [])
+            for hit in hits:
+                source = hit.get('_source', {})
+                vertex_id = source.get('id', hit.get('_id'))
+                yield str(vertex_id), vertex_hash(vertex_id, source.get('labels'), source, self.key_fields)
+            if len(hits) < self.page_size:
+                return
+            body['search_after'] = hits[-1]['sort']
+
+
+def digest_scan(side, prefix):
+    """Digest of a prefix range plus the digests of its 16 child prefixes, in one pass"""
+    total = Digest()
+    children = {prefix + digit: Digest() for digit in HEX_DIGITS}
+    for vertex_id, value in side.scan(prefix):
+        total.add(value)
+        children[child_prefix(vertex_id, prefix)].add(value)
+    return total, children
+
+
+def diff_ids(neptune, opensearch, prefix):
+    """Compare a range ID by ID; returns (divergent_or_missing_in_index, missing_in_neptune)"""
+    source = dict(neptune.scan(prefix))
+    target = dict(opensearch.scan(prefix))
+    reindex = sorted(i for i, h in source.items() if target.get(i) != h)
+    delete = sorted(i for i in target if i not in source)
+    return reindex, delete
+
+
+class Reconciler:
+    def __init__(self, neptune, opensearch, leaf_size=LEAF_SIZE, max_depth=8):
+        self.neptune = neptune
+        self.opensearch = opensearch
+        self.leaf_size = leaf_size
+        self.max_depth = max_depth
+        self.reindex = []
+        self.delete = []
+        self.ranges = {}
+
+    def check(self, prefix, known=None):
+        """Compare a prefix range; drill into child ranges whose digests differ.
+
+        `known` carries the (neptune, opensearch) digests already computed by
+        the parent pass, so a range is only re-read when it has to be split.
+        """
+        if known is not None:
+            source, target = known
+            if source == target:
+                self.ranges[prefix] = {'status': 'match', 'count': source.count}
+                return
+            if max(source.count, target.count) <= self.leaf_size or len(prefix) >= self.max_depth:
+                self._compare_ids(prefix)
+                return
+
+        source, source_children = digest_scan(self.neptune, prefix)
+        target, target_children = digest_scan(self.opensearch, prefix)
+        if source == target:
+            self.ranges[prefix] = {'status': 'match', 'count': source.count}
+            return
+        logger.info(f"Range '{prefix}' differs: neptune {source.count} vertices, opensearch {target.count} documents")
+        if max(source.count, target.count) <= self.leaf_size or len(prefix) >= self.max_depth:
+            self._compare_ids(prefix)
+            return
+        for child in sorted(source_children):
+            self.check(child, (source_children[child], target_children[child]))
+
+    def _compare_ids(self, prefix):
+        reindex, delete = diff_ids(self.neptune, self.opensearch, prefix)
+        self.reindex.extend(reindex)
+        self.delete.extend(delete)
+        self.ranges[prefix] = {'status': 'differs', 'reindex': len(reindex), 'delete': len(delete)}
+        logger.info(f"Range '{prefix}': {len(reindex)} IDs to reindex, {len(delete)} to delete")
+
+
+def top_level_prefixes(prefix_length=PREFIX_LENGTH, sample=None, seed=None):
+    prefixes = ['']
+    for _ in range(prefix_length):
+        prefixes = [p + digit for p in prefixes for digit in HEX_DIGITS]
+    if sample and sample < len(prefixes):
+        prefixes = sorted(random.Random(seed).sample(prefixes, sample))
+    return prefixes
+
+
+def repair(auth, reindex, delete, index_name=INDEX_NAME, neptune_auth=None, enrich=False):
+    """Reindex divergent IDs from Neptune and delete IDs Neptune no longer has"""
+    with requests.Session() as session, BulkIndexer(OPENSEARCH_ENDPOINT, index_name, auth) as indexer:
+        for i in range(0, len(reindex), REPAIR_BATCH):
+            batch = reindex[i:i + REPAIR_BATCH]
+            found = set()
+            for doc in fetch_documents_by_id(batch, session=session, neptune_auth=neptune_auth, enrich=enrich):
+                indexer.index(doc['id'], doc)
+                found.add(doc['id'])
+            # Deleted from Neptune between the scan and now
+            for vertex_id in batch:
+                if vertex_id not in found:
+                    indexer.delete(vertex_id)
+        for vertex_id in delete:
+            indexer.delete(vertex_id)
+    logger.info(f"Repair: {indexer.summary()}")
+    return indexer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reconcile the OpenSearch index against Neptune')
+    parser.add_argument('--index', default=INDEX_NAME, help='Index or alias to check')
+    parser.add_argument('--label', help='Only reconcile vertices with this label')
+    parser.add_argument('--prefix-length', type=int, default=PREFIX_LENGTH,
+                        help='Hex digits per top-level range (16^n ranges)')
+    parser.add_argument('--sample-ranges', type=int, help='Only check this many randomly chosen ranges')
+    parser.add_argument('--seed', type=int, help='Random seed for --sample-ranges')
+    parser.add_argument('--leaf-size', type=int, default=LEAF_SIZE,
+                        help='Compare ranges ID by ID once they hold at most this many vertices')
+    parser.add_argument('--fields', nargs='+', default=KEY_FIELDS, help='Key fields included in the digests')
+    parser.add_argument('--dry-run', action='store_true', help='Report divergences without repairing them')
+    parser.add_argument('--enrich', action='store_true',
+                        help='Embed connected name/address summaries in repaired person documents (as the ETL --enrich)')
+    parser.add_argument('--report', default=REPORT_FILE, help='JSON report of the reconciliation')
+    parser.add_argument('--neptune-iam', action='store_true', help='Sign Neptune requests (IAM database auth)')
+    parser.add_argument('--neptune-host', help='Host to sign Neptune requests for when tunnelling through localhost')
+    args = parser.parse_args()
+
+    try:
+        session = boto3.Session(profile_name='default')
+        auth = RefreshingSigV4Auth(OPENSEARCH_SERVICE, session=session)
+        neptune_auth = None
+        if args.neptune_iam:
+            neptune_auth = RefreshingSigV4Auth('neptune-db', session=session, host=args.neptune_host)
+
+        reconciler = Reconciler(
+            NeptuneSide(args.fields, args.label, neptune_auth=neptune_auth),
+            OpenSearchSide(auth, args.index, args.fields, args.label),
+            leaf_size=args.leaf_size
+        )
+        prefixes = top_level_prefixes(args.prefix_length, args.sample_ranges, args.seed)
+        logger.info(f"Reconciling {len(prefixes)} ranges of '{args.index}' against Neptune...")
+        for prefix in prefixes:
+            reconciler.check(prefix)
+
+        report = {
+            'index': args.index,
+            'ranges_checked': len(prefixes),
+            'sampled': bool(args.sample_ranges),
+            'fields': args.fields,
+            'reindex': len(reconciler.reindex),
+            'delete': len(reconciler.delete),
+            'divergent_ids_sample': reconciler.reindex[:100],
+            'missing_in_neptune_sample': reconciler.delete[:100],
+            'ranges': reconciler.ranges
+        }
+        os.makedirs(os.path.dirname(args.report) or '.', exist_ok=True)
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"{len(reconciler.reindex)} IDs to reindex, {len(reconciler.delete)} to delete "
+                    f"(report: {args.report})")
+
+        if args.dry_run or not (reconciler.reindex or reconciler.delete):
+            return
+        indexer = repair(auth, reconciler.reindex, reconciler.delete, args.index, neptune_auth, args.enrich)
+        if indexer.failed:
+            raise Exception(f"{indexer.failed} repair actions failed: {indexer.errors[:5]}")
+        logger.info("Reconciliation completed successfully.")
+    except Exception as e:
+        logger.error(f"Reconciliation failed: {str(e)}")
+        print(f"Error: {str(e)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+"""
+Incremental Neptune -> OpenSearch sync driven by Neptune streams.
+
+Reads the property-graph change stream from the last committed checkpoint,
+collects the vertices touched by each batch of changes (including both
+endpoints of changed edges), re-reads their current state from Neptune in one
+query and turns them into bulk upserts (vertex still exists) or deletes
+(vertex is gone). The checkpoint is committed atomically only after a batch
+has been fully indexed, so a crash replays at most one batch and
+upserts/deletes are idempotent.
+
+With --enrich the upserts carry the same name/address neighbor summaries as
+the full ETL's --enrich documents; run both with the same setting.
+
+Streams must be enabled on the cluster (neptune_streams=1). For local testing
+pass --stream-file with a JSON lines file of stream records; it stands in for
+the stream endpoint.
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+import boto3
+import requests
+
+from aws_neptune_opensearch_etl import (
+    INDEX_NAME, INDEXED_PROPERTIES, NEPTUNE_ENDPOINT, NEPTUNE_HEADERS, OPENSEARCH_ENDPOINT, OPENSEARCH_SERVICE,
+    fetch_documents_by_id
+)
+from aws_opensearch_bulk_indexer import BulkIndexer
+from aws_sigv4_signer import RefreshingSigV4Auth
+
+logger = logging.getLogger(__name__)
+
+STREAM_ENDPOINT = 'https://localhost:8182/propertygraph/stream'
+CHECKPOINT_FILE = 'src/data/output/opensearch/stream_checkpoint.json'
+# Stream records per request (Neptune allows up to 100000)
+STREAM_LIMIT = 10000
+# Vertices re-read from Neptune per query
+REFETCH_BATCH = 1000
+POLL_INTERVAL = 10
+
+# Stream record data types that describe a vertex (label / property)
+VERTEX_TYPES = {'vl', 'vp'}
+# Stream record data types that describe an edge (edge / edge property)
+EDGE_TYPES = {'e', 'ep'}
+
+
+class NeptuneStream:
+    """Reader for the Neptune property-graph stream endpoint"""
+
+    def __init__(self, endpoint=STREAM_ENDPOINT, auth=None):
+        self.endpoint = endpoint
+        self.auth = auth
+        self.session = requests.Session()
+
+    def get_records(self, checkpoint, limit=STREAM_LIMIT):
+        """Return (records, last_event_id) for changes after the checkpoint"""
+        if checkpoint:
+            params = {
+                'iteratorType': 'AFTER_SEQUENCE_NUMBER',
+                'commitNum': checkpoint['commitNum'],
+                'opNum': checkpoint['opNum'],
+                'limit': limit
+            }
+        else:
+            params = {'iteratorType': 'TRIM_HORIZON', 'limit': limit}
+
+        response = self.session.get(self.endpoint, params=params, auth=self.auth, verify=False)
+        if response.status_code == 404 and 'StreamRecordsNotFoundException' in response.text:
+            # Nothing after the checkpoint yet
+            return [], checkpoint
+        response.raise_for_status()
+        body = response.json()
+        return body.get('records', []), body.get('lastEventId', checkpoint)
+
+
+class LocalStream:
+    """Stand-in for the stream endpoint backed by a JSON lines file of stream records.
+
+    Each line is one record in Neptune's PG_JSON stream format, e.g.
+    {"eventId": {"commitNum": 12, "opNum": 1}, "op": "ADD",
+     "data": {"id": "...", "type": "vp", "key": "name_full", "value": {...}}}
+    """
+
+    def __init__(self, path):
+        with open(path) as f:
+            self.records = [json.loads(line) for line in f if line.strip()]
+        self.records.sort(key=lambda r: (r['eventId']['commitNum'], r['eventId']['opNum']))
+
+    def get_records(self, checkpoint, limit=STREAM_LIMIT):
+        position = (checkpoint['commitNum'], checkpoint['opNum']) if checkpoint else (-1, -1)
+        records = [r for r in self.records
+                   if (r['eventId']['commitNum'], r['eventId']['opNum']) > position][:limit]
+        last_event_id = records[-1]['eventId'] if records else checkpoint
+        return records, last_event_id
+
+
+def load_checkpoint(path=CHECKPOINT_FILE):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(event_id, path=CHECKPOINT_FILE):
+    """Write the checkpoint atomically: a crash leaves either the old or the new file"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    checkpoint = {
+        'commitNum': event_id['commitNum'],
+        'opNum': event_id['opNum'],
+        'updated_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return checkpoint
+
+
+def fetch_edge_endpoints(edge_ids, session=None, neptune_auth=None):
+    """(from, to) vertex IDs of edges that still exist, keyed by edge ID"""
+    if not edge_ids:
+        return {}
+    payload = {
+        'query': "MATCH (a)-[e]->(b) WHERE id(e) IN $ids RETURN id(e) AS id, id(a) AS from_id, id(b) AS to_id",
+        'parameters': json.dumps({'ids': list(edge_ids)})
+    }
+    try:
+        response = (session or requests).post(NEPTUNE_ENDPOINT, headers=NEPTUNE_HEADERS, json=payload, verify=False,
+                                              auth=neptune_auth)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Error fetching endpoints of {len(edge_ids)} edges: {str(e)}")
+        raise
+    return {str(row['id']): (str(row['from_id']), str(row['to_id']))
+            for row in response.json().get('results', [])}
+
+
+def touched_vertex_ids(records, session=None, neptune_auth=None):
+    """Vertex IDs changed by a batch of stream records, in first-seen order.
+
+    A changed edge touches both of its endpoints, since enriched documents
+    embed their neighbors. Edge records carry from/to; edge property records
+    do not, so their endpoints are looked up in Neptune in one query (an edge
+    deleted since has its endpoints on its own 'e' REMOVE record).
+    """
+    ids = {}
+    unresolved_edges = {}
+    for record in records:
+        data = record.get('data', {})
+        if data.get('type') in VERTEX_TYPES and data.get('id') is not None:
+            ids[str(data['id'])] = True
+        elif data.get('type') in EDGE_TYPES:
+            if data.get('from') is not None and data.get('to') is not None:
+                ids[str(data['from'])] = True
+                ids[str(data['to'])] = True
+            elif data.get('id') is not None:
+                unresolved_edges[str(data['id'])] = True
+    unresolved_edges = list(unresolved_edges)
+    for i in range(0, len(unresolved_edges), REFETCH_BATCH):
+        batch = unresolved_edges[i:i + REFETCH_BATCH]
+        for from_id, to_id in fetch_edge_endpoints(batch, session, neptune_auth).values():
+            ids[from_id] = True
+            ids[to_id] = True
+    return list(ids)
+
+
+def apply_changes(indexer, vertex_ids, properties=INDEXED_PROPERTIES, neptune_auth=None, enrich=False):
+    """Upsert vertices that still exist and delete the rest; returns (upserts, deletes)"""
+    upserts = 0
+    deletes = 0
+    with requests.Session() as session:
+        for i in range(0, len(vertex_ids), REFETCH_BATCH):
+            batch = vertex_ids[i:i + REFETCH_BATCH]
+            documents = fetch_documents_by_id(batch, properties, session, neptune_auth, enrich)
+            found = set()
+            for doc in documents:
+                indexer.index(doc['id'], doc)
+                found.add(doc['id'])
+            for vertex_id in batch:
+                if vertex_id not in found:
+                    indexer.delete(vertex_id)
+            upserts += len(found)
+            deletes += len(batch) - len(found)
+    return upserts, deletes
+
+
+def sync(stream, auth, checkpoint_file=CHECKPOINT_FILE, limit=STREAM_LIMIT, properties=INDEXED_PROPERTIES,
+         follow=False, neptune_auth=None, enrich=False):
+    """Apply stream changes batch by batch until caught up (or forever with follow)"""
+    checkpoint = load_checkpoint(checkpoint_file)
+    logger.info(f"Starting from checkpoint: {json.dumps(checkpoint) if checkpoint else 'beginning of stream'}")
+    total_upserts = 0
+    total_deletes = 0
+
+    while True:
+        records, last_event_id = stream.get_records(checkpoint, limit)
+        if not records:
+            if not follow:
+                break
+            time.sleep(POLL_INTERVAL)
+            continue
+
+        vertex_ids = touched_vertex_ids(records, neptune_auth=neptune_auth)
+        with BulkIndexer(OPENSEARCH_ENDPOINT, INDEX_NAME, auth) as indexer:
+            upserts, deletes = apply_changes(indexer, vertex_ids, properties, neptune_auth, enrich)
+        if indexer.failed:
+            raise Exception(f"{indexer.failed} actions failed; checkpoint not advanced: {indexer.errors[:5]}")
+
+        checkpoint = save_checkpoint(last_event_id, checkpoint_file)
+        total_upserts += upserts
+        total_deletes += deletes
+        logger.info(f"Applied {len(records)} stream records: {upserts} upserts, {deletes} deletes "
+                    f"(checkpoint {checkpoint['commitNum']}/{checkpoint['opNum']})")
+
+    logger.info(f"Caught up: {total_upserts} upserts, {total_deletes} deletes in total")
+    return total_upserts, total_deletes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Incrementally sync Neptune changes into OpenSearch')
+    parser.add_argument('--checkpoint', default=CHECKPOINT_FILE, help='Checkpoint file')
+    parser.add_argument('--limit', type=int, default=STREAM_LIMIT, help='Stream records per batch')
+    parser.add_argument('--properties', nargs='+', default=INDEXED_PROPERTIES,
+                        help='Only index these vertex properties')
+    parser.add_argument('--follow', action='store_true', help='Keep polling for new changes')
+    parser.add_argument('--enrich', action='store_true',
+                        help='Embed connected name/address summaries in person documents (as the full ETL --enrich)')
+    parser.add_argument('--stream-file', help='Read stream records from a local JSON lines file')
+    parser.add_argument('--neptune-iam', action='store_true', help='Sign Neptune requests (IAM database auth)')
+    parser.add_argument('--neptune-host', help='Host to sign Neptune requests for when tunnelling through localhost')
+    args = parser.parse_args()
+
+    try:
+        session = boto3.Session(profile_name='default')
+        auth = RefreshingSigV4Auth(OPENSEARCH_SERVICE, session=session)
+        neptune_auth = None
+        if args.neptune_iam:
+            neptune_auth = RefreshingSigV4Auth('neptune-db', session=session, host=args.neptune_host)
+
+        stream = LocalStream(args.stream_file) if args.stream_file else NeptuneStream(auth=neptune_auth)
+        sync(stream, auth, args.checkpoint, args.limit, args.properties, args.follow, neptune_auth, args.enrich)
+        logger.info("Incremental sync completed successfully.")
+    except Exception as e:
+        logger.error(f"Incremental sync failed: {str(e)}")
+        print(f"Error: {str(e)}")
+
+
+if __name__ == '__main__':
+    main()
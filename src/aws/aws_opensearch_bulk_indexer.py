@@ -0,0 +1,205 @@
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Flush a batch when either limit is reached; ~5-10 MB is the usual sweet spot
+MAX_BATCH_BYTES = 5 * 1024 * 1024
+MAX_BATCH_DOCS = 1000
+# Concurrent _bulk requests in flight
+MAX_CONCURRENT_REQUESTS = 4
+# Retries for items rejected with 429 (or a whole request throttled)
+MAX_RETRIES = 5
+INITIAL_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+
+BULK_HEADERS = {
+    'Content-Type': 'application/x-ndjson',
+    'Accept': 'application/json'
+}
+
+
+class BulkIndexer:
+    """Batch documents into OpenSearch _bulk requests.
+
+    Actions are buffered and flushed once the batch reaches max_bytes or
+    max_docs. Up to `concurrency` requests run at once; when they are all busy
+    add() blocks, which pushes back on whatever is producing the documents.
+    Per-item failures are parsed from the response: 429 rejections are retried
+    with exponential backoff, anything else is counted as failed. With an
+    EtlMetrics instance, request latency, bytes sent and retries are recorded
+    under index.*.
+
+    Usage:
+        with BulkIndexer(OPENSEARCH_ENDPOINT, INDEX_NAME, auth) as indexer:
+            for doc in documents:
+                indexer.index(doc['id'], doc)
+        logger.info(indexer.summary())
+    """
+
+    def __init__(self, endpoint, index_name, auth, max_bytes=MAX_BATCH_BYTES, max_docs=MAX_BATCH_DOCS,
+                 concurrency=MAX_CONCURRENT_REQUESTS, max_retries=MAX_RETRIES, headers=None, metrics=None):
+        self.url = f"{endpoint}/_bulk"
+        self.index_name = index_name
+        self.auth = auth
+        self.max_bytes = max_bytes
+        self.max_docs = max_docs
+        self.max_retries = max_retries
+        self.headers = dict(BULK_HEADERS, **(headers or {}))
+        self.metrics = metrics
+
+        self.session = requests.Session()
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.lock = threading.Lock()
+        self.futures = []
+
+        self.batch = []
+        self.batch_bytes = 0
+
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.errors = []
+        self.start_time = time.time()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def index(self, doc_id, document):
+        """Queue an index (create or replace) action"""
+        self.add({'index': {'_index': self.index_name, '_id': str(doc_id)}}, document)
+
+    def delete(self, doc_id):
+        """Queue a delete action"""
+        self.add({'delete': {'_index': self.index_name, '_id': str(doc_id)}})
+
+    def add(self, action, source=None):
+        """Queue a raw bulk action with an optional source line"""
+        lines = json.dumps(action, separators=(',', ':')) + '\n'
+        if source is not None:
+            lines += json.dumps(source, separators=(',', ':'), default=str) + '\n'
+        item = lines.encode('utf-8')
+
+        if self.batch and (self.batch_bytes + len(item) > self.max_bytes or len(self.batch) >= self.max_docs):
+            self.flush()
+        self.batch.append(item)
+        self.batch_bytes += len(item)
+
+    def flush(self):
+        """Send the current batch; blocks while all request slots are busy"""
+        if not self.batch:
+            return
+        batch, self.batch, self.batch_bytes = self.batch, [], 0
+        self.slots.acquire()
+        future = self.executor.submit(self._send_with_slot, batch)
+        with self.lock:
+            self.futures = [f for f in self.futures if not f.done()]
+            self.futures.append(future)
+
+    def close(self):
+        """Flush remaining actions and wait for every in-flight request"""
+        self.flush()
+        with self.lock:
+            futures = list(self.futures)
+        for future in futures:
+            future.result()
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+    def _send_with_slot(self, batch):
+        try:
+            self._send(batch)
+        except Exception as e:
+            logger.error(f"Bulk request of {len(batch)} actions failed: {str(e)}")
+            with self.lock:
+                self.failed += len(batch)
+                self.errors.append({'error': str(e), 'count': len(batch)})
+        finally:
+            self.slots.release()
+
+    def _send(self, batch):
+        attempt = 0
+        while batch:
+            body = b''.join(batch)
+            request_start = time.perf_counter()
+            response = self.session.post(self.url, auth=self.auth, headers=self.headers, data=body)
+            with self.lock:
+                self.bytes_sent += len(body)
+            if self.metrics:
+                self.metrics.observe('index.bulk_seconds', time.perf_counter() - request_start)
+                self.metrics.inc('index.requests')
+                self.metrics.inc('index.bytes_sent', len(body))
+                if response.status_code == 429:
+                    self.metrics.inc('index.throttled_requests')
+
+            if response.status_code == 429:
+                retry = batch
+            else:
+                response.raise_for_status()
+                retry = self._parse_response(batch, response.json())
+
+            if not retry:
+                return
+            attempt += 1
+            if attempt > self.max_retries:
+                logger.error(f"Giving up on {len(retry)} actions after {self.max_retries} retries")
+                with self.lock:
+                    self.failed += len(retry)
+                    self.errors.append({'error': 'retries exhausted', 'count': len(retry)})
+                return
+
+            backoff = min(MAX_BACKOFF, INITIAL_BACKOFF * 2 ** (attempt - 1))
+            backoff *= random.uniform(0.5, 1.0)
+            logger.warning(f"{len(retry)} actions throttled (429), retry {attempt} in {backoff:.1f}s")
+            with self.lock:
+                self.retries += len(retry)
+            if self.metrics:
+                self.metrics.inc('index.retries', len(retry))
+            time.sleep(backoff)
+            batch = retry
+
+    def _parse_response(self, batch, body):
+        """Count per-item results and return the actions that should be retried"""
+        items = body.get('items', [])
+        if not body.get('errors'):
+            with self.lock:
+                self.succeeded += len(items)
+            return []
+
+        retry = []
+        succeeded = 0
+        for item, action in zip(items, batch):
+            result = next(iter(item.values()))
+            status = result.get('status', 500)
+            if status < 300 or (status == 404 and 'delete' in item):
+                succeeded += 1
+            elif status == 429:
+                retry.append(action)
+            else:
+                with self.lock:
+                    self.failed += 1
+                    if len(self.errors) < 100:
+                        self.errors.append({'id': result.get('_id'), 'status': status, 'error': result.get('error')})
+                logger.debug(f"Failed to index document {result.get('_id')}: {result.get('error')}")
+        with self.lock:
+            self.succeeded += succeeded
+        return retry
+
+    def docs_per_second(self):
+        elapsed = time.time() - self.start_time
+        return self.succeeded / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        return (f"{self.succeeded} succeeded, {self.failed} failed, {self.retries} retried, "
+                f"{self.bytes_sent / 1024 / 1024:.1f} MB sent, {self.docs_per_second():.0f} docs/s")
@@ -0,0 +1,152 @@
+import logging
+import time
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Field types for the Neptune vertex properties that end up in the index.
+# Names are the Neptune property names written by the gremlin CSV converters.
+KEYWORD_FIELDS = ['id', 'labels', 'anumber_primary', 'anumber_list']
+DATE_FIELDS = ['date_of_birth', 'date_of_birth_list', 'birth_date', 'birth_date_list']
+NAME_FIELDS = ['name_full', 'name_full_list', 'address_full']
+
+# Neptune returns dates as ISO datetimes; the GDS files use plain dates
+DATE_FORMAT = 'strict_date_optional_time||yyyy-MM-dd'
+
+# Settings that slow down bulk loading; applied to the fresh index while it
+# is being built and restored before it goes live
+BUILD_SETTINGS = {'index': {'refresh_interval': '-1', 'number_of_replicas': 0}}
+LIVE_SETTINGS = {'index': {'refresh_interval': '1s', 'number_of_replicas': 1}}
+
+
+def build_mappings():
+    """Explicit mappings from the node schema instead of dynamic guessing"""
+    properties = {}
+    for field in KEYWORD_FIELDS:
+        properties[field] = {'type': 'keyword'}
+    for field in DATE_FIELDS:
+        properties[field] = {'type': 'date', 'format': DATE_FORMAT, 'ignore_malformed': True}
+    for field in NAME_FIELDS:
+        # Full-text search on the name plus exact match / sorting on .raw
+        properties[field] = {
+            'type': 'text',
+            'fields': {'raw': {'type': 'keyword', 'ignore_above': 256}}
+        }
+    # Neighbor summaries embedded by the ETL's --enrich mode
+    neighbor_text = {'type': 'text', 'fields': {'raw': {'type': 'keyword', 'ignore_above': 256}}}
+    properties['names'] = {'properties': {
+        'id': {'type': 'keyword'},
+        'name_full': neighbor_text,
+        'name_type': {'type': 'keyword'}
+    }}
+    properties['addresses'] = {'properties': {
+        'id': {'type': 'keyword'},
+        'address_full': neighbor_text
+    }}
+    return {
+        # Unknown properties are still indexed, but strings become keywords
+        # instead of text + keyword pairs
+        'dynamic_templates': [{
+            'strings_as_keyword': {
+                'match_mapping_type': 'string',
+                'mapping': {'type': 'keyword', 'ignore_above': 256}
+            }
+        }],
+        'properties': properties
+    }
+
+
+class IndexManager:
+    """Create, tune and publish OpenSearch indices behind an alias.
+
+    A full reindex builds into a new timestamped index (`<alias>-<timestamp>`)
+    with refresh disabled and no replicas, so queries against the live index
+    are unaffected and bulk writes skip refresh and replication. Once the
+    build is done the live settings are restored and the alias is switched in
+    one atomic _aliases call.
+
+    OpenSearch Serverless collections manage refresh and replicas themselves
+    and do not support aliases; the ETL only uses this in its --alias mode,
+    which needs a managed domain.
+    """
+
+    def __init__(self, endpoint, alias, auth, headers=None, session=None):
+        self.endpoint = endpoint
+        self.alias = alias
+        self.auth = auth
+        self.headers = dict({'Content-Type': 'application/json', 'Accept': 'application/json'}, **(headers or {}))
+        self.session = session or requests.Session()
+
+    def _request(self, method, path, body=None, ok=(200,)):
+        response = self.session.request(method, f"{self.endpoint}/{path}", auth=self.auth,
+                                        headers=self.headers, json=body)
+        if response.status_code not in ok:
+            logger.error(f"{method} /{path} failed: {response.status_code} - {response.text}")
+            response.raise_for_status()
+        return response
+
+    def new_index_name(self):
+        return f"{self.alias}-{time.strftime('%Y%m%d%H%M%S')}"
+
+    def create_index(self, index_name, settings=None):
+        """Create an index with the schema mappings; an existing index or alias is left alone"""
+        # HEAD resolves aliases too: after an alias build, the live name is an
+        # alias and a PUT on it fails with invalid_index_name_exception
+        if self._request('HEAD', index_name, ok=(200, 404)).status_code == 200:
+            logger.info(f"Index '{index_name}' already exists.")
+            return False
+        body = {'mappings': build_mappings()}
+        if settings:
+            body['settings'] = settings
+        response = self._request('PUT', index_name, body, ok=(200, 400))
+        if response.status_code == 400:
+            if 'resource_already_exists_exception' in response.text:
+                logger.info(f"Index '{index_name}' already exists.")
+                return False
+            response.raise_for_status()
+        logger.info(f"Index '{index_name}' created.")
+        return True
+
+    def create_build_index(self):
+        """Create a fresh index tuned for bulk loading and return its name"""
+        index_name = self.new_index_name()
+        self.create_index(index_name, BUILD_SETTINGS)
+        logger.info(f"Building into '{index_name}' (refresh disabled, 0 replicas)")
+        return index_name
+
+    def update_settings(self, index_name, settings):
+        self._request('PUT', f"{index_name}/_settings", settings)
+
+    def current_indices(self):
+        """Indices the alias points at, or [alias] if a concrete index has that name"""
+        response = self._request('GET', f"_alias/{self.alias}", ok=(200, 404))
+        if response.status_code == 404:
+            exists = self._request('HEAD', self.alias, ok=(200, 404)).status_code == 200
+            return [self.alias] if exists else []
+        return list(response.json().keys())
+
+    def publish(self, index_name, replicas=1, delete_old=True):
+        """Restore live settings on a built index and atomically point the alias at it"""
+        settings = {'index': dict(LIVE_SETTINGS['index'], number_of_replicas=replicas)}
+        self.update_settings(index_name, settings)
+        self._request('POST', f"{index_name}/_refresh")
+
+        old_indices = [i for i in self.current_indices() if i != index_name]
+        actions = [{'add': {'index': index_name, 'alias': self.alias}}]
+        for old_index in old_indices:
+            if old_index == self.alias:
+                # A legacy concrete index holds the alias name; drop it in the
+                # same call so the name is never unresolvable
+                actions.append({'remove_index': {'index': old_index}})
+            else:
+                actions.append({'remove': {'index': old_index, 'alias': self.alias}})
+        self._request('POST', '_aliases', {'actions': actions})
+        logger.info(f"Alias '{self.alias}' now points at '{index_name}'")
+
+        if delete_old:
+            for old_index in old_indices:
+                if old_index != self.alias:
+                    self._request('DELETE', old_index, ok=(200, 404))
+                    logger.info(f"Deleted previous index '{old_index}'")
+        return old_indices
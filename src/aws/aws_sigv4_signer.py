@@ -0,0 +1,142 @@
+import hashlib
+import hmac
+import logging
+import threading
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, quote, urlsplit
+
+import boto3
+from requests.auth import AuthBase
+
+logger = logging.getLogger(__name__)
+
+ALGORITHM = 'AWS4-HMAC-SHA256'
+
+
+def _hmac(key, msg):
+    return hmac.new(key, msg.encode('utf-8'), hashlib.sha256).digest()
+
+
+class RefreshingSigV4Auth(AuthBase):
+    """requests auth that signs every request with SigV4 using live credentials.
+
+    Unlike AWS4Auth built from frozen credentials, credentials are resolved
+    from the boto3 session on each request. botocore refreshes assumed-role,
+    SSO and instance credentials ahead of expiry, so multi-hour bulk jobs keep
+    signing with valid keys. The derived signing key is cached per
+    (secret, day, region, service) and only recomputed when the day rolls over
+    or the credentials rotate. The session token is added as
+    X-Amz-Security-Token, so callers no longer copy it into headers.
+
+    If a request still comes back 403 with an expired-token error, the
+    credentials are re-resolved from a fresh session and the request is
+    resent once.
+
+    `host` signs for a different Host than the URL's, e.g. the Neptune
+    cluster endpoint when connecting through an SSH tunnel on localhost.
+    """
+
+    def __init__(self, service, region=None, session=None, profile_name='default', host=None):
+        self.service = service
+        self.profile_name = profile_name
+        self.session = session or boto3.Session(profile_name=profile_name)
+        self.region = region or self.session.region_name or 'us-east-1'
+        self.host = host
+        self._credentials = self.session.get_credentials()
+        if self._credentials is None:
+            raise ValueError("No AWS credentials found")
+        self._lock = threading.Lock()
+        self._key_cache = (None, None)
+
+    def get_credentials(self):
+        # Triggers botocore's refresh when refreshable credentials near expiry
+        return self._credentials.get_frozen_credentials()
+
+    def refresh(self):
+        """Re-resolve credentials from a new session (after an expired-token error)"""
+        with self._lock:
+            self.session = boto3.Session(profile_name=self.profile_name)
+            self._credentials = self.session.get_credentials()
+        logger.info(f"Re-resolved AWS credentials for {self.service}")
+
+    def signing_key(self, secret_key, date_stamp):
+        cache_key = (secret_key, date_stamp, self.region, self.service)
+        with self._lock:
+            cached_for, key = self._key_cache
+            if cached_for == cache_key:
+                return key
+        key = _hmac(('AWS4' + secret_key).encode('utf-8'), date_stamp)
+        key = _hmac(key, self.region)
+        key = _hmac(key, self.service)
+        key = _hmac(key, 'aws4_request')
+        with self._lock:
+            self._key_cache = (cache_key, key)
+        return key
+
+    def __call__(self, r):
+        self.sign(r)
+        r.register_hook('response', self._retry_if_expired)
+        return r
+
+    def sign(self, r):
+        creds = self.get_credentials()
+        now = datetime.now(timezone.utc)
+        amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+        date_stamp = now.strftime('%Y%m%d')
+
+        url = urlsplit(r.url)
+        host = self.host or url.netloc
+        body = r.body or b''
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        payload_hash = hashlib.sha256(body).hexdigest()
+
+        for name in ('Authorization', 'X-Amz-Date', 'X-Amz-Security-Token', 'X-Amz-Content-Sha256'):
+            r.headers.pop(name, None)
+        r.headers['Host'] = host
+        r.headers['X-Amz-Date'] = amz_date
+        r.headers['X-Amz-Content-Sha256'] = payload_hash
+        if creds.token:
+            r.headers['X-Amz-Security-Token'] = creds.token
+
+        signed = {k.lower(): ' '.join(str(v).split()) for k, v in r.headers.items()
+                  if k.lower() in ('host', 'content-type') or k.lower().startswith('x-amz-')}
+        signed_headers = ';'.join(sorted(signed))
+        canonical_headers = ''.join(f"{k}:{signed[k]}\n" for k in sorted(signed))
+
+        query = sorted(parse_qsl(url.query, keep_blank_values=True))
+        canonical_query = '&'.join(f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}" for k, v in query)
+        canonical_uri = quote(url.path or '/', safe='/~')
+
+        canonical_request = '\n'.join([
+            r.method, canonical_uri, canonical_query, canonical_headers, signed_headers, payload_hash
+        ])
+        scope = f"{date_stamp}/{self.region}/{self.service}/aws4_request"
+        string_to_sign = '\n'.join([
+            ALGORITHM, amz_date, scope, hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()
+        ])
+        signature = hmac.new(self.signing_key(creds.secret_key, date_stamp),
+                             string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+        r.headers['Authorization'] = (
+            f"{ALGORITHM} Credential={creds.access_key}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+        return r
+
+    def _retry_if_expired(self, response, **kwargs):
+        if response.status_code not in (401, 403) or 'expired' not in response.text.lower():
+            return response
+        if getattr(response.request, '_sigv4_retried', False):
+            return response
+
+        logger.warning(f"{self.service} credentials expired mid-request; refreshing and retrying")
+        self.refresh()
+        request = response.request.copy()
+        self.sign(request)
+        request._sigv4_retried = True
+        response.content  # release the connection before resending
+        response.close()
+        retry = response.connection.send(request, **kwargs)
+        retry.history.append(response)
+        retry.request = request
+        return retry
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import uuid
 import random
@@ -8,6 +9,8 @@ import json
 import platform
 import subprocess
 
+from neptune.node_registry import NodeRegistry
+
 def clear_terminal():
     """Clear the terminal screen based on the operating system"""
     if platform.system() == 'Windows':
@@ -15,67 +18,33 @@ def clear_terminal():
     else:
         os.system('clear')
 
-def validate_node_existence(node_df, node_id):
-    """Validate that a node exists in the node_data.csv"""
-    return node_id in node_df['node_id'].values
-
-def validate_referential_integrity(edges, node_df):
-    """Validate referential integrity of edges against node data"""
+def validate_referential_integrity(edges, registry):
+    """Validate referential integrity of edges against the node registry"""
+    edge_df = pd.DataFrame(edges, columns=['node_id_from', 'node_id_to', 'edge_type'])
+    
+    # Bulk registry lookups: an endpoint is valid if it exists with the right type
+    from_node_is_person = registry.contains(edge_df['node_id_from'], 'person')
+    to_node_is_name = registry.contains(edge_df['node_id_to'], 'name')
+    valid = from_node_is_person & to_node_is_name
+    valid_count = int(valid.sum())
+    
     validation_results = {
         'total_edges': len(edges),
-        'valid_edges': 0,
-        'invalid_edges': 0,
-        'missing_from_nodes': set(),
-        'missing_to_nodes': set(),
-        'edge_type_stats': {},
+        'valid_edges': valid_count,
+        'invalid_edges': len(edges) - valid_count,
+        'missing_from_nodes': set(edge_df.loc[~from_node_is_person, 'node_id_from']),
+        'missing_to_nodes': set(edge_df.loc[~to_node_is_name, 'node_id_to']),
+        'edge_type_stats': edge_df['edge_type'].value_counts().to_dict(),
         'node_type_stats': {
-            'person': {'total': 0, 'valid': 0},
-            'name': {'total': 0, 'valid': 0}
+            'person': {'total': len(registry.ids('person')), 'valid': valid_count},
+            'name': {'total': len(registry.ids('name')), 'valid': valid_count}
         },
-        'edges_per_person': {}  # New field to track edges per person
+        # Valid name edges per person, aligned with registry.ids('person')
+        'edges_per_person': np.bincount(
+            pd.Index(registry.ids('person')).get_indexer(edge_df.loc[valid, 'node_id_from']),
+            minlength=len(registry.ids('person')))
     }
     
-    # Get sets of valid node IDs for quick lookup
-    valid_node_ids = set(node_df['node_id'].values)
-    person_node_ids = set(node_df[node_df['node_type'] == 'person']['node_id'].values)
-    name_node_ids = set(node_df[node_df['node_type'] == 'name']['node_id'].values)
-    
-    # Initialize edges_per_person counter
-    for person_id in person_node_ids:
-        validation_results['edges_per_person'][person_id] = 0
-    
-    for edge in edges:
-        from_node = edge['node_id_from']
-        to_node = edge['node_id_to']
-        edge_type = edge['edge_type']
-        
-        # Count edge types
-        validation_results['edge_type_stats'][edge_type] = validation_results['edge_type_stats'].get(edge_type, 0) + 1
-        
-        # Validate node existence
-        from_node_exists = from_node in valid_node_ids
-        to_node_exists = to_node in valid_node_ids
-        
-        # Validate node types
-        from_node_is_person = from_node in person_node_ids
-        to_node_is_name = to_node in name_node_ids
-        
-        if from_node_exists and to_node_exists and from_node_is_person and to_node_is_name:
-            validation_results['valid_edges'] += 1
-            validation_results['node_type_stats']['person']['valid'] += 1
-            validation_results['node_type_stats']['name']['valid'] += 1
-            validation_results['edges_per_person'][from_node] += 1
-        else:
-            validation_results['invalid_edges'] += 1
-            if not from_node_exists or not from_node_is_person:
-                validation_results['missing_from_nodes'].add(from_node)
-            if not to_node_exists or not to_node_is_name:
-                validation_results['missing_to_nodes'].add(to_node)
-    
-    # Update total counts
-    validation_results['node_type_stats']['person']['total'] = len(person_node_ids)
-    validation_results['node_type_stats']['name']['total'] = len(name_node_ids)
-    
     return validation_results
 
 def generate_person_name_edges():
@@ -83,26 +52,26 @@ def generate_person_name_edges():
         clear_terminal()
         start_time = time.time()
         
-        # Read node_data.csv, excluding node_name column
+        # Load the node registry for node_data.csv (cached after the first run)
         print("Reading node data...")
-        node_df = pd.read_csv('src/data/input/node_data.csv', usecols=['node_id', 'node_type'])
+        registry = NodeRegistry.load('src/data/input/node_data.csv')
         
         # Print node type statistics
         print("\nNode Type Statistics:")
-        print(f"Total number of nodes: {len(node_df)}")
-        node_counts = node_df['node_type'].value_counts()
-        for node_type, count in node_counts.items():
+        print(f"Total number of nodes: {len(registry)}")
+        node_counts = sorted(registry.counts().items(), key=lambda item: item[1], reverse=True)
+        for node_type, count in node_counts:
             print(f"{node_type}: {count} nodes")
         
         # Get person nodes
-        person_nodes = node_df[node_df['node_type'] == 'person']
-        if person_nodes.empty:
+        person_nodes = registry.ids('person')
+        if len(person_nodes) == 0:
             print("Warning: No person nodes found in node_data.csv")
             return None
         
         # Get name nodes
-        name_nodes = node_df[node_df['node_type'] == 'name']
-        if name_nodes.empty:
+        name_nodes = registry.ids('name')
+        if len(name_nodes) == 0:
             print("Warning: No name nodes found in node_data.csv")
             return None
         
@@ -114,18 +83,15 @@ def generate_person_name_edges():
         
         # Generate edges for each person with progress bar
         print("\nGenerating person_name edges...")
-        for _, person in tqdm(person_nodes.iterrows(), total=len(person_nodes), desc="Processing person nodes"):
-            person_id = person['node_id']
-            
+        for person_id in tqdm(person_nodes, total=len(person_nodes), desc="Processing person nodes"):
             # Ensure each person has at least 1 name edge
             num_name_edges = random.randint(1, min(3, len(name_nodes)))
-            selected_names = name_nodes.sample(n=num_name_edges)
+            selected_names = registry.sample('name', num_name_edges)
             
             # First name is always PRIMARY
             first_name = True
-            for _, name in selected_names.iterrows():
-                name_id = name['node_id']
-                if validate_node_existence(node_df, name_id):
+            for name_id in selected_names:
+                if name_id in registry:
                     # Determine name type
                     if first_name:
                         name_type = 'PRIMARY'
@@ -156,7 +122,7 @@ def generate_person_name_edges():
         processing_time = time.time() - start_time
         
         # Validate referential integrity
-        validation_results = validate_referential_integrity(edges, node_df)
+        validation_results = validate_referential_integrity(edges, registry)
         
         clear_terminal()
         # Print validation results
@@ -166,13 +132,12 @@ def generate_person_name_edges():
         print(f"Invalid edges: {validation_results['invalid_edges']}")
         
         # Calculate and display edges per person distribution
-        edges_per_person_dist = {}
-        for person_id, count in validation_results['edges_per_person'].items():
-            edges_per_person_dist[count] = edges_per_person_dist.get(count, 0) + 1
+        edges_per_person_dist = np.bincount(validation_results['edges_per_person'])
         
         print("\nDistribution of Name Edges per Person:")
-        for count in sorted(edges_per_person_dist.keys()):
-            print(f"Persons with {count} name edges: {edges_per_person_dist[count]}")
+        for count, persons in enumerate(edges_per_person_dist):
+            if persons:
+                print(f"Persons with {count} name edges: {persons}")
         
         if validation_results['missing_from_nodes']:
             print(f"\nMissing or invalid person nodes: {len(validation_results['missing_from_nodes'])}")
@@ -209,6 +174,7 @@ def generate_person_name_edges():
 
 if __name__ == "__main__":
     edge_df = generate_person_name_edges()
-    if edge_df is not None:
-        print("\nSample of Generated Edges:")
-        print(edge_df.head()) 
\ No newline at end of file
+    if edge_df is None:
+        exit(1)
+    print("\nSample of Generated Edges:")
+    print(edge_df.head()) 
\ No newline at end of file
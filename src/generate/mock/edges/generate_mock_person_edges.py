@@ -5,38 +5,36 @@ from tqdm import tqdm
 import time
 import os
 
-def validate_node_existence(node_df, node_id):
-    """Validate that a node exists in the node_data.csv"""
-    return node_id in node_df['node_id'].values
+from neptune.node_registry import NodeRegistry
 
 def generate_person_edges():
     try:
         start_time = time.time()
         
-        # Read node_data.csv, excluding node_name column
+        # Load the node registry for node_data.csv (cached after the first run)
         print("Reading node data...")
-        node_df = pd.read_csv('src/data/input/node_data.csv', usecols=['node_id', 'node_type'])
+        registry = NodeRegistry.load('src/data/input/node_data.csv')
         
         # Print node type statistics
         print("\nNode Type Statistics:")
-        print(f"Total number of nodes: {len(node_df)}")
-        node_counts = node_df['node_type'].value_counts()
-        for node_type, count in node_counts.items():
+        print(f"Total number of nodes: {len(registry)}")
+        node_counts = sorted(registry.counts().items(), key=lambda item: item[1], reverse=True)
+        for node_type, count in node_counts:
             print(f"{node_type}: {count} nodes")
         
         # Get person nodes
-        person_nodes = node_df[node_df['node_type'] == 'person']
-        if person_nodes.empty:
+        person_nodes = registry.ids('person')
+        if len(person_nodes) == 0:
             print("Warning: No person nodes found in node_data.csv")
             return None
         
         # Get other node types
-        name_nodes = node_df[node_df['node_type'] == 'name']
-        address_nodes = node_df[node_df['node_type'] == 'address']
-        form_nodes = node_df[node_df['node_type'] == 'form']
-        phone_nodes = node_df[node_df['node_type'] == 'phone']
-        email_nodes = node_df[node_df['node_type'] == 'email']
-        anumber_nodes = node_df[node_df['node_type'] == 'anumber']
+        name_nodes = registry.ids('name')
+        address_nodes = registry.ids('address')
+        form_nodes = registry.ids('form')
+        phone_nodes = registry.ids('phone')
+        email_nodes = registry.ids('email')
+        anumber_nodes = registry.ids('anumber')
         
         # Initialize edge data and counters
         edges = []
@@ -52,16 +50,13 @@ def generate_person_edges():
         
         # Generate edges for each person with progress bar
         print("\nGenerating edges...")
-        for _, person in tqdm(person_nodes.iterrows(), total=len(person_nodes), desc="Processing person nodes"):
-            person_id = person['node_id']
-            
+        for person_id in tqdm(person_nodes, total=len(person_nodes), desc="Processing person nodes"):
             # Person to Name edges
-            if not name_nodes.empty:
+            if len(name_nodes):
                 num_name_edges = random.randint(1, min(3, len(name_nodes)))
-                selected_names = name_nodes.sample(n=num_name_edges)
-                for _, name in selected_names.iterrows():
-                    name_id = name['node_id']
-                    if validate_node_existence(node_df, name_id):
+                selected_names = registry.sample('name', num_name_edges)
+                for name_id in selected_names:
+                    if name_id in registry:
                         edges.append({
                             'edge_id': str(uuid.uuid4()),
                             'node_id_from': person_id,
@@ -73,12 +68,11 @@ def generate_person_edges():
                         missing_nodes.add(name_id)
             
             # Person to Address edges
-            if not address_nodes.empty:
+            if len(address_nodes):
                 num_address_edges = random.randint(1, min(2, len(address_nodes)))
-                selected_addresses = address_nodes.sample(n=num_address_edges)
-                for _, address in selected_addresses.iterrows():
-                    address_id = address['node_id']
-                    if validate_node_existence(node_df, address_id):
+                selected_addresses = registry.sample('address', num_address_edges)
+                for address_id in selected_addresses:
+                    if address_id in registry:
                         edges.append({
                             'edge_id': str(uuid.uuid4()),
                             'node_id_from': person_id,
@@ -90,12 +84,11 @@ def generate_person_edges():
                         missing_nodes.add(address_id)
             
             # Person to Form edges
-            if not form_nodes.empty:
+            if len(form_nodes):
                 num_form_edges = random.randint(1, min(3, len(form_nodes)))
-                selected_forms = form_nodes.sample(n=num_form_edges)
-                for _, form in selected_forms.iterrows():
-                    form_id = form['node_id']
-                    if validate_node_existence(node_df, form_id):
+                selected_forms = registry.sample('form', num_form_edges)
+                for form_id in selected_forms:
+                    if form_id in registry:
                         edges.append({
                             'edge_id': str(uuid.uuid4()),
                             'node_id_from': person_id,
@@ -107,12 +100,11 @@ def generate_person_edges():
                         missing_nodes.add(form_id)
             
             # Person to Phone edges
-            if not phone_nodes.empty:
+            if len(phone_nodes):
                 num_phone_edges = random.randint(1, min(2, len(phone_nodes)))
-                selected_phones = phone_nodes.sample(n=num_phone_edges)
-                for _, phone in selected_phones.iterrows():
-                    phone_id = phone['node_id']
-                    if validate_node_existence(node_df, phone_id):
+                selected_phones = registry.sample('phone', num_phone_edges)
+                for phone_id in selected_phones:
+                    if phone_id in registry:
                         edges.append({
                             'edge_id': str(uuid.uuid4()),
                             'node_id_from': person_id,
@@ -124,12 +116,11 @@ def generate_person_edges():
                         missing_nodes.add(phone_id)
             
             # Person to Email edges
-            if not email_nodes.empty:
+            if len(email_nodes):
                 num_email_edges = random.randint(1, min(2, len(email_nodes)))
-                selected_emails = email_nodes.sample(n=num_email_edges)
-                for _, email in selected_emails.iterrows():
-                    email_id = email['node_id']
-                    if validate_node_existence(node_df, email_id):
+                selected_emails = registry.sample('email', num_email_edges)
+                for email_id in selected_emails:
+                    if email_id in registry:
                         edges.append({
                             'edge_id': str(uuid.uuid4()),
                             'node_id_from': person_id,
@@ -141,12 +132,11 @@ def generate_person_edges():
                         missing_nodes.add(email_id)
             
             # Person to Anumber edges
-            if not anumber_nodes.empty:
+            if len(anumber_nodes):
                 num_anumber_edges = random.randint(1, min(2, len(anumber_nodes)))
-                selected_anumbers = anumber_nodes.sample(n=num_anumber_edges)
-                for _, anumber in selected_anumbers.iterrows():
-                    anumber_id = anumber['node_id']
-                    if validate_node_existence(node_df, anumber_id):
+                selected_anumbers = registry.sample('anumber', num_anumber_edges)
+                for anumber_id in selected_anumbers:
+                    if anumber_id in registry:
                         edges.append({
                             'edge_id': str(uuid.uuid4()),
                             'node_id_from': person_id,
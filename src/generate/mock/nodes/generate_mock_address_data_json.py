@@ -142,6 +142,7 @@ def generate_mock_address_data():
 
 if __name__ == "__main__":
     address_data = generate_mock_address_data()
-    if address_data is not None:
-        print("\nSample of Generated Address Data:")
-        print(json.dumps(address_data[:5], indent=2))
+    if address_data is None:
+        exit(1)
+    print("\nSample of Generated Address Data:")
+    print(json.dumps(address_data[:5], indent=2))
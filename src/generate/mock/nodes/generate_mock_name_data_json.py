@@ -142,6 +142,7 @@ def generate_mock_name_data():
 
 if __name__ == "__main__":
     name_data = generate_mock_name_data()
-    if name_data is not None:
-        print("\nSample of Generated Name Data:")
-        print(json.dumps(name_data[:5], indent=2)) 
\ No newline at end of file
+    if name_data is None:
+        exit(1)
+    print("\nSample of Generated Name Data:")
+    print(json.dumps(name_data[:5], indent=2)) 
\ No newline at end of file
@@ -26,7 +26,7 @@ except Exception as e:
 
 if NUM_RECORDS == 0:
     print("No person records found or error reading file. Exiting.")
-    exit()
+    exit(1)
 
 NODE_TYPES = ['person']
 
@@ -262,9 +262,10 @@ if __name__ == "__main__":
     # Clear terminal before starting
     clear_terminal()
     person_data = generate_mock_person_data()
-    if person_data is not None:
-        print("\nSample of Generated Person Data:")
-        print(json.dumps(person_data[:5], indent=2))
+    if person_data is None:
+        exit(1)
+    print("\nSample of Generated Person Data:")
+    print(json.dumps(person_data[:5], indent=2))
 
 def generate_node_data():
     # Initialize Faker
@@ -0,0 +1,3 @@
+"""
+Neptune Mocks pipeline tooling
+"""
@@ -0,0 +1,142 @@
+"""
+Bloom filters for node ID membership when the IDs do not fit in memory.
+
+A filter answers "definitely not a node of this type" or "probably is one"
+using a fixed number of bits per ID (about 10 bits at a 1% false-positive
+rate, against ~100 bytes per ID in a Python set or pd.Index). Misses are
+exact; hits are wrong with at most the configured false-positive rate.
+
+Hashing is vectorized: pd.util.hash_array gives two independent 64-bit
+hashes per ID and the k bit positions come from double hashing
+(h1 + i * h2), so a batch of IDs is added or tested with numpy only.
+
+NodeBloomFilter grows as IDs are added (a scalable Bloom filter: each new
+slice doubles in capacity at half the false-positive rate), so it is built
+in one pass without knowing the node count up front while keeping the
+overall false-positive rate under the configured bound.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_FPR = 0.01
+INITIAL_CAPACITY = 1000000
+# Each new slice gets this fraction of the previous slice's rate, so the
+# rates form a geometric series that sums to at most the configured FPR
+TIGHTENING_RATIO = 0.5
+# IDs hashed per numpy batch; bounds the (batch x k) position matrix
+HASH_BATCH = 200000
+
+_HASH_KEYS = ('neptune-bloom-h1', 'neptune-bloom-h2')
+
+
+def _hashes(ids):
+    values = np.asarray(ids, dtype=object)
+    return (pd.util.hash_array(values, hash_key=_HASH_KEYS[0]),
+            pd.util.hash_array(values, hash_key=_HASH_KEYS[1]) | np.uint64(1))
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for `capacity` IDs at false-positive rate `fpr`"""
+
+    def __init__(self, capacity, fpr=DEFAULT_FPR):
+        self.capacity = max(1, int(capacity))
+        self.fpr = fpr
+        self.size = max(8, math.ceil(-self.capacity * math.log(fpr) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def _positions(self, h1, h2):
+        steps = np.arange(self.hash_count, dtype=np.uint64)
+        # uint64 arithmetic wraps, which is fine for hashing
+        return (h1[:, None] + steps[None, :] * h2[:, None]) % np.uint64(self.size)
+
+    def add_hashes(self, h1, h2):
+        positions = self._positions(h1, h2).ravel()
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3),
+                         np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+        self.count += len(h1)
+
+    def contains_hashes(self, h1, h2):
+        positions = self._positions(h1, h2)
+        bits = (self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        return bits.all(axis=1)
+
+    def estimated_fpr(self):
+        """False-positive rate for the IDs actually added"""
+        return (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
+
+class NodeBloomFilter:
+    """Growing Bloom filter for one node type's IDs; overall false-positive rate stays below `fpr`"""
+
+    def __init__(self, fpr=DEFAULT_FPR, initial_capacity=INITIAL_CAPACITY):
+        self.fpr = fpr
+        self.initial_capacity = initial_capacity
+        self.slices = []
+
+    def _new_slice(self):
+        level = len(self.slices)
+        capacity = self.initial_capacity * 2 ** level
+        rate = self.fpr * (1 - TIGHTENING_RATIO) * TIGHTENING_RATIO ** level
+        self.slices.append(BloomFilter(capacity, rate))
+
+    def add(self, ids):
+        h1, h2 = _hashes(ids)
+        start = 0
+        while start < len(h1):
+            if not self.slices or self.slices[-1].count >= self.slices[-1].capacity:
+                self._new_slice()
+            current = self.slices[-1]
+            end = min(len(h1), start + current.capacity - current.count, start + HASH_BATCH)
+            current.add_hashes(h1[start:end], h2[start:end])
+            start = end
+
+    def contains(self, ids):
+        """Boolean array: False means definitely absent, True means present or a false positive"""
+        h1, h2 = _hashes(ids)
+        found = np.zeros(len(h1), dtype=bool)
+        for start in range(0, len(h1), HASH_BATCH):
+            end = start + HASH_BATCH
+            for bloom in self.slices:
+                found[start:end] |= bloom.contains_hashes(h1[start:end], h2[start:end])
+        return found
+
+    def __len__(self):
+        return sum(bloom.count for bloom in self.slices)
+
+    def nbytes(self):
+        return sum(bloom.bits.nbytes for bloom in self.slices)
+
+    def estimated_fpr(self):
+        return 1 - np.prod([1 - bloom.estimated_fpr() for bloom in self.slices]) if self.slices else 0.0
+
+class NodeBloomFilters:
+    """One NodeBloomFilter per node type, queried like NodeRegistry.contains"""
+
+    def __init__(self, fpr=DEFAULT_FPR, initial_capacity=INITIAL_CAPACITY):
+        self.fpr = fpr
+        self.initial_capacity = initial_capacity
+        self.filters = {}
+
+    def add(self, node_type, ids):
+        if node_type not in self.filters:
+            self.filters[node_type] = NodeBloomFilter(self.fpr, self.initial_capacity)
+        self.filters[node_type].add(ids)
+
+    def contains(self, ids, node_type=None):
+        """Boolean array: which IDs are (probably) nodes of node_type, or of any type if None"""
+        if node_type is None:
+            found = np.zeros(len(ids), dtype=bool)
+            for bloom in self.filters.values():
+                found |= bloom.contains(ids)
+            return found
+        if node_type not in self.filters:
+            return np.zeros(len(ids), dtype=bool)
+        return self.filters[node_type].contains(ids)
+
+    def counts(self):
+        return {node_type: len(bloom) for node_type, bloom in self.filters.items()}
+
+    def nbytes(self):
+        return sum(bloom.nbytes() for bloom in self.filters.values())
@@ -0,0 +1,372 @@
+"""
+neptune-mocks command line interface.
+
+Runs the mock data pipeline as a DAG of stages:
+
+    nodes -> names / addresses / persons / person_name_edges
+          -> person_csv / address_csv -> upload -> load
+
+Each stage wraps one of the existing standalone scripts and is run as a
+subprocess from the repository root, so the scripts keep working on their own.
+Stages whose dependencies are satisfied run in parallel. A stage is skipped
+when its fingerprint (script content + input file contents + arguments) matches
+the last successful run and its outputs are still unchanged on disk. A run only
+counts as successful if the script exits 0 and rewrites every output; stages
+without outputs (upload, load, lint) leave nothing to verify and always run.
+
+Usage:
+    neptune-mocks list
+    neptune-mocks run                       # whole pipeline
+    neptune-mocks run person_csv address_csv --jobs 4
+    neptune-mocks run --force persons load
+    neptune-mocks run --overlap-load        # overlap S3 upload with Neptune load
+    neptune-mocks run --lint                # lint the load CSVs before anything is uploaded
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = 'src/data/.pipeline_cache.json'
+LOG_DIR = 'src/data/logs'
+
+NODE_DATA = 'src/data/input/node_data.csv'
+GDS_DIR = 'src/data/output/gds'
+NEPTUNE_DIR = 'src/data/output/neptune'
+
+
+@dataclass
+class Stage:
+    name: str
+    script: str
+    deps: List[str] = field(default_factory=list)
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    args: List[str] = field(default_factory=list)
+
+
+STAGES = [
+    Stage('nodes', 'src/generate/mock/nodes/generate_node_data.py',
+          outputs=[NODE_DATA]),
+    Stage('names', 'src/generate/mock/nodes/generate_mock_name_data_json.py',
+          deps=['nodes'], inputs=[NODE_DATA],
+          outputs=[f'{GDS_DIR}/mock_name_data.json']),
+    Stage('addresses', 'src/generate/mock/nodes/generate_mock_address_data_json.py',
+          deps=['nodes'], inputs=[NODE_DATA],
+          outputs=[f'{GDS_DIR}/mock_address_data.json']),
+    Stage('persons', 'src/generate/mock/nodes/generate_mock_person_data_json.py',
+          deps=['nodes'], inputs=[NODE_DATA],
+          outputs=[f'{GDS_DIR}/mock_person_data.json']),
+    Stage('person_name_edges', 'src/generate/mock/edges/generate_mock_person-name_edge.py',
+          deps=['nodes'], inputs=[NODE_DATA],
+          outputs=[f'{GDS_DIR}/mock_person-name_data.json']),
+    Stage('person_csv', 'src/neptune/generate_neptune_person_json_gremlin_csv.py',
+          deps=['persons'], inputs=[f'{GDS_DIR}/mock_person_data.json'],
+          outputs=[f'{NEPTUNE_DIR}/neptune_person_nodes_gremlin.csv']),
+    Stage('address_csv', 'src/neptune/generate_neptune_address_json_gremlin_csv.py',
+          deps=['addresses'], inputs=[f'{GDS_DIR}/mock_address_data.json'],
+          outputs=[f'{NEPTUNE_DIR}/neptune_address_nodes_gremlin.csv']),
+    Stage('upload', 'src/utils/load_data_output_neptune_to_s3-deam-neptune.py',
+          deps=['person_csv', 'address_csv'],
+          inputs=[f'{NEPTUNE_DIR}/neptune_person_nodes_gremlin.csv',
+                  f'{NEPTUNE_DIR}/neptune_address_nodes_gremlin.csv']),
+    Stage('load', 'src/utils/bulkload_neptune_all_files_s3-deam-neptune.py',
+          deps=['upload'],
+          inputs=[f'{NEPTUNE_DIR}/neptune_person_nodes_gremlin.csv',
+                  f'{NEPTUNE_DIR}/neptune_address_nodes_gremlin.csv']),
+]
+
+# Optional gate between the CSV stages and upload: fails the run on any
+# linter error, before minutes of upload and bulk load are spent
+LINT_STAGE = Stage('lint', 'src/validation/validate_neptune_load_csv.py',
+                   deps=['person_csv', 'address_csv'],
+                   inputs=[f'{NEPTUNE_DIR}/neptune_person_nodes_gremlin.csv',
+                           f'{NEPTUNE_DIR}/neptune_address_nodes_gremlin.csv'],
+                   args=[NEPTUNE_DIR])
+
+
+class FingerprintCache:
+    """Persistent record of stage fingerprints and file digests.
+
+    File digests are memoised by (size, mtime) so unchanged multi-GB inputs
+    are not re-hashed on every run.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.data = {'stages': {}, 'files': {}}
+        if path.exists():
+            try:
+                with open(path) as f:
+                    self.data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Ignoring unreadable cache {path}: {str(e)}")
+
+    def file_digest(self, path: Path) -> Optional[str]:
+        if not path.exists():
+            return None
+        stat = path.stat()
+        key = str(path)
+        cached = self.data['files'].get(key)
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            return cached['sha256']
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        self.data['files'][key] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': digest.hexdigest()
+        }
+        return digest.hexdigest()
+
+    def fingerprint(self, stage: Stage, root: Path) -> str:
+        digest = hashlib.sha256()
+        digest.update(stage.name.encode())
+        digest.update((self.file_digest(root / stage.script) or 'missing').encode())
+        for path in stage.inputs:
+            digest.update(path.encode())
+            digest.update((self.file_digest(root / path) or 'missing').encode())
+        digest.update(json.dumps(stage.args).encode())
+        return digest.hexdigest()
+
+    def is_fresh(self, stage: Stage, fingerprint: str, root: Path) -> bool:
+        # Nothing on disk proves a stage without outputs took effect
+        if not stage.outputs:
+            return False
+        entry = self.data['stages'].get(stage.name)
+        if not entry or entry['fingerprint'] != fingerprint:
+            return False
+        for path in stage.outputs:
+            if self.file_digest(root / path) != entry['outputs'].get(path):
+                return False
+        return True
+
+    def record(self, stage: Stage, fingerprint: str, root: Path):
+        self.data['stages'][stage.name] = {
+            'fingerprint': fingerprint,
+            'outputs': {path: self.file_digest(root / path) for path in stage.outputs},
+            'completed_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+        }
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def pipeline_stages(overlap_load: bool = False, lint: bool = False) -> List[Stage]:
+    """Return the stage list, optionally with upload and load overlapped.
+
+    In overlap mode the separate upload stage is dropped and the load stage
+    uploads each shard itself, submitting its load job as soon as the shard
+    is in S3 (vertex loads before edge loads). With lint, the lint stage
+    runs after the CSV stages and whichever stage uploads depends on it.
+    """
+    if not overlap_load and not lint:
+        return STAGES
+    upload = next(s for s in STAGES if s.name == 'upload')
+    upload_deps = [LINT_STAGE.name] if lint else list(upload.deps)
+    stages = []
+    for stage in STAGES:
+        if stage.name == 'upload':
+            if lint:
+                stages.append(LINT_STAGE)
+            if overlap_load:
+                continue
+            stage = replace(stage, deps=upload_deps)
+        if stage.name == 'load' and overlap_load:
+            stage = replace(stage, deps=upload_deps, args=[*stage.args, '--pipelined'])
+        stages.append(stage)
+    return stages
+
+
+def select_stages(targets: List[str], overlap_load: bool = False, lint: bool = False) -> Dict[str, Stage]:
+    """Return the requested stages plus everything they depend on."""
+    all_stages = pipeline_stages(overlap_load, lint)
+    by_name = {stage.name: stage for stage in all_stages}
+    unknown = [t for t in targets if t not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(unknown)}")
+
+    selected = {}
+    pending = list(targets or by_name)
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected[name] = by_name[name]
+            pending.extend(by_name[name].deps)
+    # Keep declaration order, which is a valid topological order
+    return {s.name: s for s in all_stages if s.name in selected}
+
+
+def run_stage(stage: Stage, root: Path) -> float:
+    """Run one stage script as a subprocess, logging its output to a file."""
+    log_path = root / LOG_DIR / f"{stage.name}.log"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    start_time = time.time()
+    # Whole seconds, so filesystems with coarse timestamps still count a file
+    # written right after the start as new
+    started_at = int(start_time)
+    with open(log_path, 'w') as log_file:
+        result = subprocess.run(
+            [sys.executable, stage.script, *stage.args],
+            cwd=root,
+            stdout=log_file,
+            stderr=subprocess.STDOUT
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"exit code {result.returncode}, see {log_path}")
+    for path in stage.outputs:
+        if not (root / path).exists():
+            raise RuntimeError(f"expected output {path} was not written, see {log_path}")
+        # An output left over from an earlier run means this run did not produce it
+        if (root / path).stat().st_mtime < started_at:
+            raise RuntimeError(f"output {path} was not rewritten by this run, see {log_path}")
+    return time.time() - start_time
+
+
+def run_pipeline(targets: List[str], root: Path, jobs: int, force: Set[str], dry_run: bool,
+                 overlap_load: bool = False, lint: bool = False) -> bool:
+    stages = select_stages(targets, overlap_load, lint)
+    cache = FingerprintCache(root / CACHE_FILE)
+    force_all = 'all' in force
+
+    done: Set[str] = set()
+    failed: Set[str] = set()
+    rerun: Set[str] = set()
+    running = {}
+
+    def ready(stage: Stage) -> bool:
+        return all(dep in done or dep not in stages for dep in stage.deps)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while len(done) + len(failed) < len(stages):
+            for stage in stages.values():
+                if stage.name in done or stage.name in failed or stage.name in running:
+                    continue
+                if any(dep in failed for dep in stage.deps):
+                    logger.error(f"[{stage.name}] not run: upstream stage failed")
+                    failed.add(stage.name)
+                    continue
+                if not ready(stage):
+                    continue
+
+                fingerprint = cache.fingerprint(stage, root)
+                forced = force_all or stage.name in force
+                # A dry run writes nothing, so propagate reruns explicitly;
+                # real runs see upstream changes through the input digests
+                if dry_run and any(dep in rerun for dep in stage.deps):
+                    forced = True
+                if not forced and cache.is_fresh(stage, fingerprint, root):
+                    logger.info(f"[{stage.name}] up to date, skipping")
+                    done.add(stage.name)
+                    continue
+                if dry_run:
+                    logger.info(f"[{stage.name}] would run {stage.script}")
+                    done.add(stage.name)
+                    rerun.add(stage.name)
+                    continue
+
+                logger.info(f"[{stage.name}] starting {stage.script}")
+                running[stage.name] = executor.submit(run_stage, stage, root)
+
+            if not running:
+                continue
+
+            finished, _ = wait(running.values(), return_when=FIRST_COMPLETED)
+            for name, future in list(running.items()):
+                if future not in finished:
+                    continue
+                del running[name]
+                try:
+                    duration = future.result()
+                except Exception as e:
+                    logger.error(f"[{name}] failed: {str(e)}")
+                    failed.add(name)
+                    continue
+                # Fingerprint after the run so inputs written by upstream
+                # stages in this same run are accounted for
+                if stages[name].outputs:
+                    cache.record(stages[name], cache.fingerprint(stages[name], root), root)
+                    cache.save()
+                done.add(name)
+                rerun.add(name)
+                logger.info(f"[{name}] completed in {duration:.2f} seconds")
+
+    if failed:
+        logger.error(f"Pipeline failed: {', '.join(sorted(failed))}")
+        return False
+    logger.info(f"Pipeline completed: {len(rerun)} stage(s) run, {len(done) - len(rerun)} up to date")
+    return True
+
+
+def list_stages(root: Path):
+    cache = FingerprintCache(root / CACHE_FILE)
+    print(f"{'Stage':<20} {'Depends on':<28} {'Status':<10} Script")
+    print("-" * 100)
+    for stage in STAGES:
+        status = 'fresh' if cache.is_fresh(stage, cache.fingerprint(stage, root), root) else 'stale'
+        print(f"{stage.name:<20} {', '.join(stage.deps) or '-':<28} {status:<10} {stage.script}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='neptune-mocks', description=__doc__.splitlines()[1])
+    parser.add_argument('--root', default='.', help='Repository root (default: current directory)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('list', help='List pipeline stages and whether they are up to date')
+
+    run_parser = subparsers.add_parser('run', help='Run pipeline stages and their dependencies')
+    run_parser.add_argument('targets', nargs='*', help='Stages to run (default: all)')
+    run_parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                            help='Maximum number of stages run in parallel')
+    run_parser.add_argument('--force', nargs='*', metavar='STAGE',
+                            help='Rerun the given stages even if up to date (no names: all)')
+    run_parser.add_argument('--dry-run', action='store_true', help='Show what would run')
+    run_parser.add_argument('--overlap-load', action='store_true',
+                            help='Submit each shard\'s Neptune load as soon as its S3 upload finishes')
+    run_parser.add_argument('--lint', action='store_true',
+                            help='Lint the Neptune load CSVs and stop before upload if any have errors')
+
+    args = parser.parse_args(argv)
+    root = Path(args.root).resolve()
+    if not (root / 'src').is_dir():
+        logger.error(f"{root} does not look like the neptune-mocks repository root")
+        return 1
+
+    if args.command == 'list':
+        list_stages(root)
+        return 0
+
+    force = set()
+    if args.force is not None:
+        force = set(args.force) or {'all'}
+    try:
+        ok = run_pipeline(args.targets, root, max(1, args.jobs), force, args.dry_run, args.overlap_load, args.lint)
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
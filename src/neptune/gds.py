@@ -0,0 +1,171 @@
+"""
+Streaming access to the GDS output files and their Neptune property shape
+"""
+import glob
+import json
+import os
+
+GDS_DIR = 'src/data/output/gds'
+
+# GDS node files by node type (the Neptune vertex label)
+GDS_NODE_FILES = {
+    'person': 'mock_person_data.json',
+    'address': 'mock_address_data.json',
+    'name': 'mock_name_data.json'
+}
+
+# Edge files are named after both endpoint types, e.g. mock_person-name_data.json
+GDS_EDGE_PATTERN = 'mock_*-*_data.json'
+
+_WHITESPACE = ' \t\r\n'
+
+
+def iter_json_array(path, chunk_size=1 << 20):
+    """Yield the elements of a top-level JSON array without loading the whole file.
+
+    The file is read in chunks and each element is decoded as soon as it is
+    complete, so memory stays at one chunk plus one element regardless of
+    file size.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        pos = 0
+        started = False
+        eof = False
+        while not eof:
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+            if not started:
+                stripped = buffer.lstrip(_WHITESPACE)
+                if not stripped:
+                    continue
+                if stripped[0] != '[':
+                    raise ValueError(f"{path} does not contain a JSON array")
+                buffer = stripped[1:]
+                started = True
+
+            while True:
+                while pos < len(buffer) and buffer[pos] in _WHITESPACE + ',':
+                    pos += 1
+                if pos >= len(buffer):
+                    break
+                if buffer[pos] == ']':
+                    return
+                try:
+                    element, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    break
+                # Only accept an element once the ',' or ']' after it has been
+                # read: a number cut at the chunk boundary (1. of 1.5) decodes
+                # to a shorter number that ends before the buffer does
+                after = end
+                while after < len(buffer) and buffer[after] in _WHITESPACE:
+                    after += 1
+                if after == len(buffer) or buffer[after] not in ',]':
+                    if not eof:
+                        break
+                    if after < len(buffer):
+                        raise ValueError(f"{path}: expected ',' or ']' after an array element")
+                yield element
+                pos = end
+
+    raise ValueError(f"{path} ended before the JSON array was closed")
+
+
+def vertex_properties(node_properties):
+    """Map GDS node_properties to the Neptune property names and values.
+
+    Mirrors the gremlin CSV converters (src/neptune/generate_neptune_*_gremlin_csv.py)
+    so documents built from GDS files or Postgres look like the ones read
+    back from Neptune.
+    """
+    properties = {}
+    for key, value in (node_properties or {}).items():
+        key = key.lower()
+        if isinstance(value, list):
+            if key == 'name_full_list':
+                properties['name_full_list'] = value
+            elif key == 'birth_date_list':
+                properties['date_of_birth_list'] = value
+            elif key == 'anumber_list':
+                # The converter joins these with ':', which Neptune loads as a
+                # single value
+                properties['anumber_list'] = ':'.join(value)
+            else:
+                properties[key] = ';'.join(str(v) for v in value)
+        elif key == 'name_full':
+            properties['name_full'] = str(value).upper()
+        elif key == 'birth_date':
+            properties['date_of_birth'] = str(value)
+        elif key == 'anumber_primary':
+            properties['anumber_primary'] = str(value) if value is not None else ''
+        else:
+            properties[key] = str(value)
+    return properties
+
+
+# Gremlin CSV types of the Neptune property names, as written by the
+# converters; anything else is a String column
+GREMLIN_PROPERTY_TYPES = {
+    'name_full_list': 'String[]',
+    'date_of_birth': 'Date',
+    'date_of_birth_list': 'Date[]',
+    'anumber_list': 'String[]'
+}
+
+
+def property_name(key):
+    """Neptune property name for a GDS property key (see vertex_properties)"""
+    key = key.lower()
+    if key == 'birth_date':
+        return 'date_of_birth'
+    if key == 'birth_date_list':
+        return 'date_of_birth_list'
+    return key
+
+
+def gremlin_header(name):
+    """Typed Gremlin CSV column header for a Neptune property name"""
+    return f"{name}:{GREMLIN_PROPERTY_TYPES.get(name, 'String')}"
+
+
+def gremlin_value(value):
+    """Gremlin CSV field for a Neptune property value; array values are ';'-separated"""
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return ';'.join(str(v) for v in value)
+    return str(value)
+
+
+def node_to_vertex(node, node_type=None):
+    """GDS/Postgres node row -> Neptune-style {id, labels, properties} record"""
+    return {
+        'id': node['node_id'],
+        'labels': [node_type or node['node_type']],
+        'properties': vertex_properties(node.get('node_properties'))
+    }
+
+
+def iter_gds_vertices(node_types=None, gds_dir=GDS_DIR):
+    """Stream Neptune-style vertex records from the GDS node files"""
+    for node_type, filename in GDS_NODE_FILES.items():
+        if node_types and node_type not in node_types:
+            continue
+        path = os.path.join(gds_dir, filename)
+        if not os.path.exists(path) and not node_types:
+            # Only explicitly requested types must exist
+            continue
+        for node in iter_json_array(path):
+            yield node_to_vertex(node, node_type)
+
+
+def gds_edge_files(gds_dir=GDS_DIR):
+    """Paths of the GDS edge files (JSON arrays of edge records)"""
+    return sorted(glob.glob(os.path.join(gds_dir, GDS_EDGE_PATTERN)))
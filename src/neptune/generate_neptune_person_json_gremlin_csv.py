@@ -102,4 +102,5 @@ def convert_to_gremlin():
         return False
 
 if __name__ == "__main__":
-    convert_to_gremlin()
\ No newline at end of file
+    if not convert_to_gremlin():
+        exit(1)
\ No newline at end of file
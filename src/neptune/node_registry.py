@@ -0,0 +1,158 @@
+"""
+Indexed registry of every node ID and its node type.
+
+Built once from node_data.csv (or any {node_type: ids} mapping) and pickled
+next to it, so generators and validators share one hash index instead of
+each scanning node_df['node_id'].values per lookup.
+
+Usage:
+    registry = NodeRegistry.load()              # cached, rebuilt when node_data.csv changes
+    registry.type_of(node_id)                   # 'person', 'name', ... or None
+    node_id in registry
+    registry.ids('name')                        # ndarray of name node IDs
+    registry.contains(edge_df['node_id_to'], 'name')   # bulk membership
+"""
+import argparse
+import os
+import pickle
+import random
+
+import numpy as np
+import pandas as pd
+
+NODE_DATA = 'src/data/input/node_data.csv'
+# Registry files are saved next to their source, e.g. node_data.csv.registry.pkl
+REGISTRY_SUFFIX = '.registry.pkl'
+# Type code for IDs that are not in the registry
+MISSING = -1
+# Type code for node types with no IDs; no ID ever carries it
+UNKNOWN_TYPE = -2
+CSV_CHUNK_SIZE = 1000000
+
+
+class NodeRegistry:
+    """Node ID -> node type for every node, with vectorized bulk queries"""
+
+    def __init__(self, node_ids, node_types):
+        types = pd.Categorical(node_types)
+        index = pd.Index(np.asarray(node_ids, dtype=object))
+        codes = np.asarray(types.codes, dtype=np.int16)
+
+        # Hash lookups need unique labels; an ID listed under two types is
+        # kept with its first type and reported
+        duplicated = index.duplicated()
+        self.duplicate_ids = index[duplicated].unique().tolist()
+        self.index = index[~duplicated]
+        self.codes = codes[~duplicated]
+        self.node_types = list(types.categories)
+        self._ids_by_type = {}
+
+    @classmethod
+    def from_ids_by_type(cls, ids_by_type):
+        node_ids = []
+        node_types = []
+        for node_type, ids in ids_by_type.items():
+            node_ids.extend(ids)
+            node_types.extend([node_type] * len(ids))
+        return cls(node_ids, node_types)
+
+    @classmethod
+    def from_csv(cls, path=NODE_DATA, chunksize=CSV_CHUNK_SIZE):
+        """Build from a node_id,node_type CSV such as node_data.csv"""
+        node_ids = []
+        node_types = []
+        for chunk in pd.read_csv(path, usecols=['node_id', 'node_type'], dtype=str, chunksize=chunksize):
+            chunk = chunk.dropna()
+            node_ids.extend(chunk['node_id'].tolist())
+            node_types.extend(chunk['node_type'].tolist())
+        return cls(node_ids, node_types)
+
+    @classmethod
+    def load(cls, node_data=NODE_DATA, registry_file=None, rebuild=False):
+        """Registry for node_data, read from registry_file unless node_data has changed since it was saved"""
+        registry_file = registry_file or registry_file_for(node_data)
+        source = _source_signature(node_data)
+        if not rebuild and os.path.exists(registry_file):
+            with open(registry_file, 'rb') as f:
+                saved = pickle.load(f)
+            if saved.get('source') == source:
+                registry = cls.__new__(cls)
+                registry.__dict__.update(saved['state'])
+                registry._ids_by_type = {}
+                return registry
+
+        registry = cls.from_csv(node_data)
+        registry.save(registry_file, source)
+        return registry
+
+    def save(self, registry_file, source=None):
+        os.makedirs(os.path.dirname(registry_file) or '.', exist_ok=True)
+        state = {k: v for k, v in self.__dict__.items() if k != '_ids_by_type'}
+        tmp_file = f"{registry_file}.tmp"
+        with open(tmp_file, 'wb') as f:
+            pickle.dump({'source': source, 'state': state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, registry_file)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, node_id):
+        return node_id in self.index
+
+    def type_of(self, node_id):
+        """Node type of one ID, or None if it is not a node"""
+        try:
+            return self.node_types[self.codes[self.index.get_loc(node_id)]]
+        except KeyError:
+            return None
+
+    def type_code(self, node_type):
+        return self.node_types.index(node_type) if node_type in self.node_types else UNKNOWN_TYPE
+
+    def type_codes(self, node_ids):
+        """Type codes for a batch of IDs (one hash join), MISSING where an ID is unknown"""
+        if len(self.index) == 0:
+            return np.full(len(node_ids), MISSING, dtype=np.int16)
+        positions = self.index.get_indexer(node_ids)
+        return np.where(positions >= 0, self.codes[positions], MISSING)
+
+    def contains(self, node_ids, node_type=None):
+        """Boolean array: which IDs are nodes (of node_type, if given)"""
+        codes = self.type_codes(node_ids)
+        if node_type is None:
+            return codes != MISSING
+        return codes == self.type_code(node_type)
+
+    def ids(self, node_type):
+        """All IDs of one node type as an array, in registry order"""
+        if node_type not in self._ids_by_type:
+            self._ids_by_type[node_type] = self.index[self.codes == self.type_code(node_type)].to_numpy()
+        return self._ids_by_type[node_type]
+
+    def sample(self, node_type, k):
+        """k distinct random IDs of node_type; draws from the random module so random.seed applies"""
+        ids = self.ids(node_type)
+        return ids[random.sample(range(len(ids)), k)]
+
+    def counts(self):
+        return {node_type: int(count) for node_type, count in
+                zip(self.node_types, np.bincount(self.codes, minlength=len(self.node_types)))}
+
+def registry_file_for(node_data):
+    """Default registry file of a node_data CSV, so each source keeps its own cache"""
+    return f"{node_data}{REGISTRY_SUFFIX}"
+
+def _source_signature(path):
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build and save the node registry from node_data.csv')
+    parser.add_argument('--node-data', default=NODE_DATA, help='node_id,node_type CSV')
+    parser.add_argument('--output', help='Registry file (default: <node-data>.registry.pkl)')
+    args = parser.parse_args()
+    output = args.output or registry_file_for(args.node_data)
+    registry = NodeRegistry.load(args.node_data, output, rebuild=True)
+    print(f"Saved {len(registry)} nodes to {output}")
+    for node_type, count in registry.counts().items():
+        print(f"  {node_type}: {count}")
@@ -1,11 +1,15 @@
 import boto3
 import requests
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional, Set, Tuple
 import time
 import json
+import csv
+import os
+from pathlib import Path
 from colorama import init, Fore, Style
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import sys
 
 # Initialize colorama
@@ -53,10 +57,34 @@ def print_progress(current: int, total: int, prefix: str = '', suffix: str = '')
     sys.stdout.write(f'\r{prefix} |{bar}| {percents}% {suffix}')
     sys.stdout.flush()
 
+# Neptune returns per-record errors in pages; 500 is the loader's maximum page size
+ERRORS_PER_PAGE = 500
+REJECTS_DIR = "rejects"
+# Subdirectory of REJECTS_DIR that reloaded reject files are moved to
+RELOADED_DIR = "reloaded"
+# overallStatus counters of records Neptune skipped; non-zero after a
+# failOnError=FALSE load means rows were rejected even if the load completed
+RECORD_ERROR_COUNTERS = ("parsingErrors", "datatypeMismatchErrors", "insertErrors")
+
+# Terminal loader statuses; only the first group carries per-record errors
+RECORD_ERROR_STATUSES = {"LOAD_FAILED", "LOAD_CANCELLED_DUE_TO_ERRORS", "LOAD_COMMITTED_W_WRITE_CONFLICTS"}
+FAILED_STATUSES = RECORD_ERROR_STATUSES | {
+    "LOAD_CANCELLED", "LOAD_CANCELLED_BY_USER", "LOAD_UNEXPECTED_ERROR",
+    "LOAD_S3_READ_ERROR", "LOAD_S3_ACCESS_DENIED_ERROR", "LOAD_DATA_DEADLOCK",
+    "LOAD_DATA_FAILED_DUE_TO_FEED_MODIFIED_OR_DELETED",
+    "LOAD_FAILED_BECAUSE_DEPENDENCY_NOT_SATISFIED", "LOAD_FAILED_INVALID_REQUEST"
+}
+
 class NeptuneBulkLoader:
-    def __init__(self, neptune_endpoint: str = "https://localhost:8182"):
+    def __init__(self, neptune_endpoint: str = "https://localhost:8182", local_dir: str = "src/data/output/neptune",
+                 fail_on_error: bool = False):
         self.neptune_endpoint = neptune_endpoint
+        self.local_dir = Path(local_dir)
+        self.fail_on_error = fail_on_error
         self.s3_client = boto3.client('s3')
+        self.reject_files: List[Path] = []
+        self.completed_loads: Set[str] = set()
+        self.harvested_loads: Set[str] = set()
         logger.debug(f"Initialized NeptuneBulkLoader with endpoint: {neptune_endpoint}")
         
     def get_files_from_s3(self, bucket_name: str) -> List[Dict]:
@@ -73,8 +101,8 @@ class NeptuneBulkLoader:
             print_header("Found CSV Files in S3")
             for obj in response['Contents']:
                 file_key = obj['Key']
-                # Skip non-CSV files
-                if not file_key.lower().endswith('.csv'):
+                # Skip non-CSV files, and reject files, which are only loaded by --reload-rejects
+                if not file_key.lower().endswith('.csv') or file_key.startswith(f"{REJECTS_DIR}/"):
                     continue
                     
                 file_size = obj['Size']
@@ -95,19 +123,30 @@ class NeptuneBulkLoader:
             logger.error(f"Error listing S3 files: {str(e)}")
             raise
             
-    def submit_load_job(self, file_info: Dict) -> str:
-        """Submit a load job to Neptune bulk loader."""
+    def submit_load_job(self, file_info: Dict, fail_on_error: Optional[bool] = None) -> str:
+        """Submit a load job to Neptune bulk loader.
+
+        With fail_on_error=False (the default) Neptune keeps loading
+        past bad records, so the error log covers every failing row instead
+        of only the first one.
+        """
+        if fail_on_error is None:
+            fail_on_error = self.fail_on_error
         try:
             payload = {
                 "source": file_info['source'],
                 "format": "csv",
                 "iamRoleArn": "arn:aws:iam::244081531951:role/NeptuneLoadFromS3",
                 "region": "us-east-1",
-                "failOnError": "TRUE",
+                "failOnError": "TRUE" if fail_on_error else "FALSE",
                 "parallelism": "MEDIUM",
                 "updateSingleCardinalityProperties": "FALSE",
                 "queueRequest": "TRUE"
             }
+            if file_info.get('dependencies'):
+                # Neptune holds this job until the listed loads complete and
+                # fails it if any of them fail
+                payload["dependencies"] = file_info['dependencies']
             
             logger.debug(f"Submitting load job for: {file_info['source']}")
             response = requests.post(
@@ -130,7 +169,11 @@ class NeptuneBulkLoader:
             raise
             
     def check_load_status(self, load_id: str) -> bool:
-        """Check the status of a load job."""
+        """Check the status of a load job.
+
+        On failure the per-record errors are harvested into reject files
+        (see harvest_load_errors) before the exception is raised.
+        """
         try:
             response = requests.get(
                 f"{self.neptune_endpoint}/loader/{load_id}",
@@ -139,13 +182,18 @@ class NeptuneBulkLoader:
             response.raise_for_status()
             
             response_data = response.json()
-            status = response_data.get('status')
+            overall_status = response_data.get('payload', {}).get('overallStatus', {})
+            status = overall_status.get('status', response_data.get('status'))
             
-            if status == "LOAD_COMPLETED":
+            rejected = sum(int(overall_status.get(counter) or 0) for counter in RECORD_ERROR_COUNTERS)
+            if status == "LOAD_COMPLETED" and not rejected:
                 return True
-            elif status in ["LOAD_FAILED", "LOAD_CANCELLED"]:
-                error_details = response_data.get('details', {})
-                logger.error(f"Load job failed. Status: {status}, Details: {json.dumps(error_details)}")
+            elif status == "LOAD_COMPLETED" or status in FAILED_STATUSES:
+                logger.error(f"Load job failed. Status: {status}, Details: {json.dumps(overall_status)}")
+                if status in RECORD_ERROR_STATUSES or rejected:
+                    self.reject_files.extend(self.harvest_load_errors(load_id))
+                if status == "LOAD_COMPLETED":
+                    raise Exception(f"Load job completed with {rejected} rejected records")
                 raise Exception(f"Load job failed with status: {status}")
                 
             return False
@@ -153,6 +201,243 @@ class NeptuneBulkLoader:
         except Exception as e:
             logger.error(f"Error checking load status: {str(e)}")
             raise
+
+    def get_load_errors(self, load_id: str, errors_per_page: int = ERRORS_PER_PAGE) -> List[Dict]:
+        """Fetch every per-record error for a load job, page by page."""
+        error_logs = []
+        page = 1
+        while True:
+            response = requests.get(
+                f"{self.neptune_endpoint}/loader/{load_id}",
+                params={
+                    'details': 'true',
+                    'errors': 'true',
+                    'page': page,
+                    'errorsPerPage': errors_per_page
+                },
+                verify=False
+            )
+            response.raise_for_status()
+            errors = response.json().get('payload', {}).get('errors', {})
+            logs = errors.get('errorLogs', [])
+            error_logs.extend(logs)
+            logger.debug(f"Fetched error page {page} for load {load_id}: {len(logs)} errors")
+            if len(logs) < errors_per_page:
+                break
+            page += 1
+        logger.info(f"Harvested {len(error_logs)} record errors for load {load_id}")
+        return error_logs
+
+    def harvest_load_errors(self, load_id: str) -> List[Path]:
+        """Map a failed load's errors back to the local CSV files and write reject files.
+
+        Neptune reports errors as (fileName, recordNum), where fileName is the
+        S3 URI and recordNum the 1-based data record after the header. Each
+        reject file keeps the original header followed by only the failing
+        rows, plus a sidecar JSON with the error code and message per row, so a
+        reload covers just that subset.
+        """
+        try:
+            error_logs = self.get_load_errors(load_id)
+        except Exception as e:
+            logger.error(f"Could not fetch load errors for {load_id}: {str(e)}")
+            return []
+        self.harvested_loads.add(load_id)
+
+        errors_by_file: Dict[str, Dict[int, Dict]] = {}
+        for error in error_logs:
+            file_name = error.get('fileName')
+            record_num = error.get('recordNum')
+            if not file_name or record_num is None:
+                logger.warning(f"Skipping error without file/record reference: {json.dumps(error)}")
+                continue
+            errors_by_file.setdefault(file_name, {})[int(record_num)] = error
+
+        reject_dir = self.local_dir / REJECTS_DIR
+        reject_paths = []
+        for file_name, errors in errors_by_file.items():
+            local_path = self.local_dir / os.path.basename(file_name)
+            if not local_path.exists():
+                # A reload of a reject file
+                local_path = reject_dir / os.path.basename(file_name)
+            if not local_path.exists():
+                logger.error(f"Source file for {file_name} not found locally at {local_path}")
+                continue
+
+            reject_dir.mkdir(parents=True, exist_ok=True)
+            reject_path = reject_dir / f"{local_path.stem}_rejects_{load_id[:8]}.csv"
+            found = []
+            # csv.reader keeps multi-line quoted values together, so record
+            # numbers stay aligned with Neptune's
+            with open(local_path, newline='') as src, open(reject_path, 'w', newline='') as dst:
+                reader = csv.reader(src)
+                writer = csv.writer(dst, quoting=csv.QUOTE_ALL)
+                writer.writerow(next(reader))
+                for record_num, row in enumerate(reader, 1):
+                    if record_num in errors:
+                        writer.writerow(row)
+                        found.append(record_num)
+                        if len(found) == len(errors):
+                            break
+
+            missing = sorted(set(errors) - set(found))
+            if missing:
+                logger.warning(f"{len(missing)} error records not found in {local_path}: {missing[:5]}")
+
+            with open(reject_path.with_suffix('.errors.json'), 'w') as f:
+                json.dump({
+                    'load_id': load_id,
+                    'source': file_name,
+                    'errors': [errors[n] for n in found]
+                }, f, indent=2)
+
+            logger.info(f"Wrote {len(found)} rejected rows from {local_path.name} to {reject_path}")
+            reject_paths.append(reject_path)
+        return reject_paths
+
+    def reload_rejects(self, bucket_name: str, reject_files: List[Path] = None, s3_prefix: str = REJECTS_DIR) -> List[str]:
+        """Upload reject files, load only those rows and wait for the loads.
+
+        Call after fixing the rows in the reject files (or the data behind
+        them). Raises if any reload fails; rows rejected again are harvested
+        into new reject files. Each reject file whose reload completed, or
+        whose failures were harvested, is moved to rejects/reloaded and its S3
+        copy deleted, so it is not loaded twice. Returns the submitted load IDs.
+        """
+        reject_files = reject_files if reject_files is not None else self.reject_files
+        if not reject_files:
+            logger.warning("No reject files to reload")
+            return []
+
+        print_header("Reloading Rejected Records")
+        load_ids = {}
+        for reject_path in reject_files:
+            key = f"{s3_prefix}/{reject_path.name}" if s3_prefix else reject_path.name
+            logger.debug(f"Uploading {reject_path} to s3://{bucket_name}/{key}")
+            self.s3_client.upload_file(str(reject_path), bucket_name, key)
+            load_ids[self.submit_load_job({'source': f"s3://{bucket_name}/{key}"}, fail_on_error=False)] = (reject_path, key)
+        
+        try:
+            self.wait_for_loads(list(load_ids))
+        finally:
+            self.archive_rejects(bucket_name, [load_ids[load_id] for load_id in load_ids
+                                               if load_id in self.completed_loads or load_id in self.harvested_loads])
+        return list(load_ids)
+
+    def archive_rejects(self, bucket_name: str, reloaded: List[Tuple[Path, str]]):
+        """Take reloaded reject files out of the reload set: delete the S3 copy and
+        move the local file (and its error sidecar) to rejects/reloaded."""
+        archive_dir = self.local_dir / REJECTS_DIR / RELOADED_DIR
+        for reject_path, key in reloaded:
+            self.s3_client.delete_object(Bucket=bucket_name, Key=key)
+            archive_dir.mkdir(parents=True, exist_ok=True)
+            for path in (reject_path, reject_path.with_suffix('.errors.json')):
+                if path.exists():
+                    os.replace(path, archive_dir / path.name)
+            logger.info(f"Archived {reject_path.name} to {archive_dir}")
+            
+    def wait_for_loads(self, load_ids: List[str]):
+        """Poll load jobs until all have finished; raises if any failed.
+
+        Polling continues past a failed job, so the errors of every failed
+        load are harvested before the exception is raised.
+        """
+        print_header("Monitoring Load Jobs")
+        completed = set()
+        failed = {}
+        total_jobs = len(load_ids)
+        
+        while len(completed) + len(failed) < total_jobs:
+            for load_id in load_ids:
+                if load_id in completed or load_id in failed:
+                    continue
+                try:
+                    finished = self.check_load_status(load_id)
+                except Exception as e:
+                    failed[load_id] = str(e)
+                    continue
+                if finished:
+                    completed.add(load_id)
+                    self.completed_loads.add(load_id)
+                    print_progress(
+                        len(completed),
+                        total_jobs,
+                        prefix='Progress:',
+                        suffix=f'({len(completed)}/{total_jobs})'
+                    )
+            if len(completed) + len(failed) < total_jobs:
+                time.sleep(10)
+        print()  # New line after progress bar
+        if failed:
+            raise Exception(f"{len(failed)} of {total_jobs} load jobs failed: "
+                            f"{'; '.join(f'{load_id}: {error}' for load_id, error in failed.items())}")
+
+    def load_files_pipelined(self, bucket_name: str, s3_prefix: str = '', upload_workers: int = 4):
+        """Upload local CSV shards and submit each load as soon as its upload finishes.
+
+        Neptune loads the first shards while the rest are still uploading, so
+        the total time approaches the slower of upload and load instead of
+        their sum. Vertex shards are uploaded first. Edge shards are submitted
+        only after every vertex load has been submitted, with those loads as
+        dependencies, so Neptune never starts an edge load before its vertices
+        are in.
+        """
+        try:
+            print_header("Starting Pipelined Upload and Bulk Load")
+            start_time = datetime.now()
+            
+            shards = sorted(p for p in self.local_dir.iterdir() if p.is_file() and p.suffix.lower() == '.csv')
+            if not shards:
+                logger.warning(f"No CSV files found in {self.local_dir}")
+                return
+            
+            # Edge files are recognised by their ~from/~to header columns
+            edge_shards = set()
+            for path in shards:
+                with open(path, newline='') as f:
+                    header = next(csv.reader(f), [])
+                if '~from' in header or ':START_ID' in header:
+                    edge_shards.add(path)
+            vertex_shards = [p for p in shards if p not in edge_shards]
+            logger.info(f"Found {len(vertex_shards)} vertex and {len(edge_shards)} edge files")
+            
+            def upload(path: Path) -> Dict:
+                key = f"{s3_prefix}/{path.name}" if s3_prefix else path.name
+                logger.debug(f"Uploading {path} to s3://{bucket_name}/{key}")
+                self.s3_client.upload_file(str(path), bucket_name, key)
+                logger.info(f"✓ Uploaded {path.name}")
+                return {'source': f"s3://{bucket_name}/{key}", 'format': 'csv'}
+            
+            vertex_load_ids = []
+            edge_load_ids = []
+            pending_edges = []
+            with ThreadPoolExecutor(max_workers=upload_workers) as executor:
+                # Vertex uploads are queued first so they finish first
+                futures = {executor.submit(upload, p): p for p in vertex_shards + sorted(edge_shards)}
+                for future in as_completed(futures):
+                    path = futures[future]
+                    file_info = future.result()
+                    if path in edge_shards:
+                        pending_edges.append(file_info)
+                    else:
+                        vertex_load_ids.append(self.submit_load_job(file_info))
+                    
+                    if len(vertex_load_ids) == len(vertex_shards):
+                        for edge_info in pending_edges:
+                            edge_info['dependencies'] = list(vertex_load_ids)
+                            edge_load_ids.append(self.submit_load_job(edge_info))
+                        pending_edges = []
+            
+            self.wait_for_loads(vertex_load_ids + edge_load_ids)
+            
+            duration = datetime.now() - start_time
+            print_header("Load Process Completed")
+            print(f"{Fore.GREEN}✓ All {len(shards)} files uploaded and loaded successfully{Style.RESET_ALL}")
+            print(f"⏱️  Total duration: {duration}")
+            
+        except Exception as e:
+            logger.error(f"Script failed: {str(e)}")
+            raise
             
     def load_all_files(self, bucket_name: str):
         """Load all files from S3 bucket into Neptune."""
@@ -178,25 +463,7 @@ class NeptuneBulkLoader:
                 load_ids.append(load_id)
             print()  # New line after progress bar
             
-            # Monitor load jobs
-            print_header("Monitoring Load Jobs")
-            completed = set()
-            total_jobs = len(load_ids)
-            
-            while len(completed) < total_jobs:
-                for i, load_id in enumerate(load_ids):
-                    if load_id not in completed:
-                        if self.check_load_status(load_id):
-                            completed.add(load_id)
-                            print_progress(
-                                len(completed),
-                                total_jobs,
-                                prefix='Progress:',
-                                suffix=f'({len(completed)}/{total_jobs})'
-                            )
-                if len(completed) < total_jobs:
-                    time.sleep(10)
-            print()  # New line after progress bar
+            self.wait_for_loads(load_ids)
             
             end_time = datetime.now()
             duration = end_time - start_time
@@ -213,10 +480,25 @@ if __name__ == "__main__":
     # Configuration
     S3_BUCKET = "deam-neptune"
     NEPTUNE_ENDPOINT = "https://localhost:8182"
+    LOCAL_DIR = "src/data/output/neptune"
     
     try:
-        loader = NeptuneBulkLoader(NEPTUNE_ENDPOINT)
-        loader.load_all_files(S3_BUCKET)
+        # --fail-on-error stops each load at its first bad record instead of
+        # collecting every rejected row
+        loader = NeptuneBulkLoader(NEPTUNE_ENDPOINT, LOCAL_DIR, fail_on_error='--fail-on-error' in sys.argv)
+        if '--reload-rejects' in sys.argv:
+            # Reload harvested (and fixed) reject files only; files already
+            # reloaded were moved to rejects/reloaded
+            rejects = sorted((Path(LOCAL_DIR) / REJECTS_DIR).glob('*_rejects_*.csv'))
+            loader.reload_rejects(S3_BUCKET, rejects)
+        elif '--pipelined' in sys.argv:
+            # Upload from LOCAL_DIR and overlap each shard's load with the remaining uploads
+            loader.load_files_pipelined(S3_BUCKET)
+        else:
+            loader.load_all_files(S3_BUCKET)
     except Exception as e:
+        if 'loader' in locals() and loader.reject_files:
+            logger.error(f"Rejected rows written to: {', '.join(str(p) for p in loader.reject_files)}")
+            logger.error("Fix them and rerun with --reload-rejects to load only those rows")
         logger.error(f"Script failed: {str(e)}")
         exit(1)
@@ -119,6 +119,7 @@ def upload_files_to_s3(local_dir: str, s3_bucket: str, s3_prefix: str = ''):
             return
             
         # Upload each file
+        failed = []
         for file_path in files:
             s3_key = os.path.join(s3_prefix, file_path.name)
             try:
@@ -127,8 +128,14 @@ def upload_files_to_s3(local_dir: str, s3_bucket: str, s3_prefix: str = ''):
                 logger.info(f"Successfully uploaded {file_path.name}")
             except ClientError as e:
                 logger.error(f"AWS Error uploading {file_path.name}: {str(e)}")
+                failed.append(file_path.name)
             except Exception as e:
                 logger.error(f"Error uploading {file_path.name}: {str(e)}")
+                failed.append(file_path.name)
+        
+        # Keep going past a failed file, but fail the run so it is not taken as complete
+        if failed:
+            raise RuntimeError(f"{len(failed)} of {len(files)} files failed to upload: {', '.join(failed)}")
                 
     except Exception as e:
         logger.error(f"An error occurred: {str(e)}")
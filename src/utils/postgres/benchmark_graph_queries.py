@@ -0,0 +1,135 @@
+import argparse
+import json
+import os
+import statistics
+import time
+
+import requests
+import urllib3
+
+from postgres_graph_queries import PostgresGraph, SHARED_EDGE_TYPES
+
+# Disable insecure HTTPS warnings for Neptune self-signed certs
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+NEPTUNE_ENDPOINT = 'https://localhost:8182/openCypher'
+REPORT_FILE = 'src/data/output/postgres/graph_query_benchmark.json'
+
+# openCypher equivalents of the PostgresGraph queries. Variable-length
+# patterns are undirected and bounded like the PostgresGraph traversals.
+NEPTUNE_QUERIES = {
+    'k_hop': (
+        "MATCH (s)-[*1..{hops}]-(n) WHERE id(s) = $node_id AND id(n) <> $node_id "
+        "RETURN DISTINCT id(n) AS node_id LIMIT $limit"
+    ),
+    'shared_attribute_persons': (
+        "MATCH (p:person)-[e]->(m)<-[e2]-(o:person) WHERE id(p) = $node_id AND type(e) IN $edge_types "
+        "AND type(e2) = type(e) AND o <> p "
+        "RETURN id(o) AS person_id, type(e) AS edge_type, id(m) AS shared_node_id LIMIT $limit"
+    ),
+    'path_exists': (
+        "MATCH path = (s)-[*1..{max_depth}]-(t) WHERE id(s) = $node_id AND id(t) = $target_id "
+        "RETURN [n IN nodes(path) | id(n)] AS path LIMIT 1"
+    )
+}
+
+
+def neptune_query(session, query, parameters):
+    response = session.post(NEPTUNE_ENDPOINT, json={'query': query, 'parameters': json.dumps(parameters)},
+                            headers={'Content-Type': 'application/json'}, verify=False)
+    response.raise_for_status()
+    return response.json().get('results', [])
+
+def sample_workload(graph, samples):
+    """Persons to start from, plus source/target pairs that share a name or address"""
+    persons = graph.sample_nodes('person', samples)
+    pairs = []
+    for person_id in persons:
+        shared = graph.shared_attribute_persons(person_id, limit=1)
+        if shared:
+            pairs.append((person_id, shared[0]['person_id']))
+    return persons, pairs
+
+def summarize(latencies, rows):
+    latencies = sorted(latencies)
+    if not latencies:
+        return {'queries': 0}
+    return {
+        'queries': len(latencies),
+        'rows': rows,
+        'mean_ms': round(statistics.mean(latencies), 3),
+        'p50_ms': round(latencies[len(latencies) // 2], 3),
+        'p95_ms': round(latencies[max(0, int(len(latencies) * 0.95) - 1)], 3),
+        'max_ms': round(latencies[-1], 3)
+    }
+
+def timed(run, inputs):
+    latencies = []
+    rows = 0
+    for item in inputs:
+        start_time = time.perf_counter()
+        result = run(item)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+        rows += len(result) if isinstance(result, list) else int(result is not None)
+    return summarize(latencies, rows)
+
+def run_benchmark(samples=50, hops=2, max_depth=3, skip_neptune=False, report_file=REPORT_FILE):
+    try:
+        results = {}
+        with PostgresGraph() as graph:
+            persons, pairs = sample_workload(graph, samples)
+            print(f"Sampled {len(persons)} persons and {len(pairs)} connected pairs")
+
+            print("\nRunning Postgres queries...")
+            results['postgres'] = {
+                'k_hop': timed(lambda p: graph.k_hop(p, hops), persons),
+                'shared_attribute_persons': timed(graph.shared_attribute_persons, persons),
+                'path_exists': timed(lambda pair: graph.path_exists(pair[0], pair[1], max_depth), pairs)
+            }
+
+        if not skip_neptune:
+            print("Running Neptune openCypher queries...")
+            with requests.Session() as session:
+                k_hop_query = NEPTUNE_QUERIES['k_hop'].format(hops=hops)
+                path_query = NEPTUNE_QUERIES['path_exists'].format(max_depth=max_depth)
+                results['neptune'] = {
+                    'k_hop': timed(lambda p: neptune_query(
+                        session, k_hop_query, {'node_id': p, 'limit': 1000}), persons),
+                    'shared_attribute_persons': timed(lambda p: neptune_query(
+                        session, NEPTUNE_QUERIES['shared_attribute_persons'],
+                        {'node_id': p, 'edge_types': SHARED_EDGE_TYPES, 'limit': 1000}), persons),
+                    'path_exists': timed(lambda pair: neptune_query(
+                        session, path_query, {'node_id': pair[0], 'target_id': pair[1]}), pairs)
+                }
+
+        print("\nGraph Query Benchmark (p50 / p95 ms):")
+        print(f"{'query':<26} {'postgres':>18} {'neptune':>18}")
+        for query in results['postgres']:
+            line = f"{query:<26}"
+            for backend in ('postgres', 'neptune'):
+                stats = results.get(backend, {}).get(query)
+                if stats and stats['queries']:
+                    line += f" {stats['p50_ms']:>8.2f} / {stats['p95_ms']:>7.2f}"
+                else:
+                    line += f" {'-':>18}"
+            print(line)
+
+        os.makedirs(os.path.dirname(report_file), exist_ok=True)
+        with open(report_file, 'w') as f:
+            json.dump({'hops': hops, 'max_depth': max_depth, 'results': results}, f, indent=2)
+        print(f"\nSaved report to {report_file}")
+        return results
+
+    except Exception as e:
+        print(f"Error running benchmark: {str(e)}")
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare graph query latency on Postgres and Neptune')
+    parser.add_argument('--samples', type=int, default=50, help='Start persons to sample')
+    parser.add_argument('--hops', type=int, default=2, help='Neighborhood depth for k-hop queries')
+    parser.add_argument('--max-depth', type=int, default=3, help='Depth limit for path queries')
+    parser.add_argument('--skip-neptune', action='store_true', help='Only time the Postgres queries')
+    parser.add_argument('--report', default=REPORT_FILE, help='JSON report file')
+    args = parser.parse_args()
+    run_benchmark(args.samples, args.hops, args.max_depth, args.skip_neptune, args.report)
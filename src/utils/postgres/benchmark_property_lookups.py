@@ -0,0 +1,165 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+import psycopg2
+
+from load_mock_data_to_postgres import get_db_params, property_index_statements
+
+# Lookups run against each sample value. 'before' is the form a caller would
+# write against raw JSONB; 'after' uses the generated columns. The
+# containment query is the same in both; only the GIN index differs. Dates
+# go through gds_date, as the birth_date column does, so malformed values
+# are NULL instead of failing the cast and DateStyle does not matter.
+LOOKUPS = {
+    'anumber_containment': {
+        'before': "SELECT node_id FROM nodes WHERE node_type = 'person' AND node_properties @> %s",
+        'after': "SELECT node_id FROM nodes WHERE node_type = 'person' AND node_properties @> %s"
+    },
+    'name_full_exact': {
+        'before': "SELECT node_id FROM nodes WHERE node_type = 'person' AND node_properties->>'NAME_FULL' = %s",
+        'after': "SELECT node_id FROM nodes WHERE node_type = 'person' AND name_full = %s"
+    },
+    'birth_date_range': {
+        'before': "SELECT node_id FROM nodes WHERE node_type = 'person' "
+                  "AND gds_date(node_properties->>'BIRTH_DATE') BETWEEN %s AND %s",
+        'after': "SELECT node_id FROM nodes WHERE node_type = 'person' AND birth_date BETWEEN %s AND %s"
+    }
+}
+
+REPORT_FILE = 'src/data/output/postgres/property_lookup_benchmark.json'
+# How long DROP INDEX waits for the nodes lock before the benchmark gives up
+LOCK_TIMEOUT = '5s'
+
+
+def sample_parameters(cursor, samples, seed=None):
+    """Pick lookup values from random persons so every query has real matches"""
+    cursor.execute("SELECT setseed(%s)", ((seed % 1000) / 1000.0 if seed is not None else random.random(),))
+    cursor.execute("""
+        SELECT node_properties->'ANUMBER_LIST'->>0, node_properties->>'NAME_FULL', node_properties->>'BIRTH_DATE'
+        FROM nodes TABLESAMPLE BERNOULLI (10)
+        WHERE node_type = 'person'
+        ORDER BY random()
+        LIMIT %s
+    """, (samples,))
+    parameters = {name: [] for name in LOOKUPS}
+    for anumber, name_full, birth_date in cursor.fetchall():
+        if anumber:
+            parameters['anumber_containment'].append((json.dumps({'ANUMBER_LIST': [anumber]}),))
+        if name_full:
+            parameters['name_full_exact'].append((name_full,))
+        if birth_date:
+            # A one-week window starting at a real birth date
+            try:
+                start = date.fromisoformat(birth_date)
+            except ValueError:
+                continue
+            parameters['birth_date_range'].append((start, start + timedelta(days=7)))
+    return parameters
+
+def plan_summary(cursor, query, params):
+    """Top plan node and the index it uses, from EXPLAIN"""
+    cursor.execute("EXPLAIN (FORMAT JSON) " + query, params)
+    plan = cursor.fetchone()[0][0]['Plan']
+    while plan['Node Type'] in ('Gather', 'Gather Merge') and plan.get('Plans'):
+        plan = plan['Plans'][0]
+    if plan['Node Type'] == 'Bitmap Heap Scan':
+        return f"Bitmap Heap Scan via {plan['Plans'][0].get('Index Name')}"
+    if plan.get('Index Name'):
+        return f"{plan['Node Type']} via {plan['Index Name']}"
+    return plan['Node Type']
+
+def time_lookups(cursor, query, parameter_sets):
+    latencies = []
+    rows = 0
+    for params in parameter_sets:
+        start_time = time.perf_counter()
+        cursor.execute(query, params)
+        rows += len(cursor.fetchall())
+        latencies.append((time.perf_counter() - start_time) * 1000)
+    latencies.sort()
+    return {
+        'queries': len(latencies),
+        'rows': rows,
+        'mean_ms': round(statistics.mean(latencies), 3) if latencies else 0.0,
+        'p50_ms': round(latencies[len(latencies) // 2], 3) if latencies else 0.0,
+        'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1], 3) if latencies else 0.0,
+        'plan': plan_summary(cursor, query, parameter_sets[0]) if parameter_sets else None
+    }
+
+def property_index_names():
+    return [statement.split()[2] for statement in property_index_statements()]
+
+def run_benchmark(samples=200, seed=None, report_file=REPORT_FILE):
+    try:
+        print("Connecting to PostgreSQL database...")
+        conn = psycopg2.connect(**get_db_params())
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT count(*) FROM information_schema.columns "
+                       "WHERE table_name = 'nodes' AND column_name = 'birth_date'")
+        if cursor.fetchone()[0] == 0:
+            print("Error: nodes has no generated property columns; reload with load_mock_data_to_postgres.py")
+            return None
+
+        parameters = sample_parameters(cursor, samples, seed)
+        results = {}
+
+        # Before: drop the property indexes inside a transaction that is
+        # rolled back afterwards, so the live schema is never changed. DROP
+        # INDEX takes an ACCESS EXCLUSIVE lock on nodes that is held until the
+        # rollback, blocking every other reader and writer for the whole
+        # before phase, so only run this against a database nobody else is
+        # using. lock_timeout stops it queueing behind (and in front of) live
+        # queries if the table is busy.
+        print("\nTiming lookups without property indexes (nodes is locked until they finish)...")
+        cursor.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'")
+        for index_name in property_index_names():
+            cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+        for name, queries in LOOKUPS.items():
+            results[name] = {'before': time_lookups(cursor, queries['before'], parameters[name])}
+        conn.rollback()
+
+        print("Timing lookups with property indexes...")
+        for name, queries in LOOKUPS.items():
+            results[name]['after'] = time_lookups(cursor, queries['after'], parameters[name])
+        conn.rollback()
+
+        print("\nProperty Lookup Benchmark:")
+        print(f"{'lookup':<22} {'before p50':>11} {'after p50':>10} {'speedup':>8}  plan (after)")
+        for name, result in results.items():
+            before = result['before']['p50_ms']
+            after = result['after']['p50_ms']
+            result['speedup'] = round(before / after, 1) if after else None
+            print(f"{name:<22} {before:>9.2f}ms {after:>8.2f}ms {result['speedup'] or 0:>7.1f}x  "
+                  f"{result['after']['plan']}")
+
+        os.makedirs(os.path.dirname(report_file), exist_ok=True)
+        with open(report_file, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved report to {report_file}")
+
+        cursor.close()
+        conn.close()
+        return results
+
+    except Exception as e:
+        print(f"Error running benchmark: {str(e)}")
+        if 'conn' in locals():
+            conn.rollback()
+            conn.close()
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare JSONB property lookup latency with and without indexes. '
+                                                 'Locks the nodes table exclusively while timing the unindexed '
+                                                 'lookups; do not run against a shared database.')
+    parser.add_argument('--samples', type=int, default=200, help='Lookups per query type')
+    parser.add_argument('--seed', type=int, help='Seed for choosing sample values')
+    parser.add_argument('--report', default=REPORT_FILE, help='JSON report file')
+    args = parser.parse_args()
+    run_benchmark(args.samples, args.seed, args.report)
@@ -0,0 +1,194 @@
+import argparse
+import csv
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import psycopg2
+
+from load_mock_data_to_postgres import EDGE_TYPES, get_db_params
+from neptune.gds import GDS_NODE_FILES, gremlin_header, gremlin_value, property_name, vertex_properties
+
+# The directory the S3 upload, the pipelined bulk loader and the load CSV
+# linter read (top level only); shards are prefixed 'postgres_' to tell them
+# apart from the gremlin converters' files
+OUTPUT_DIR = 'src/data/output/neptune'
+SHARD_PREFIX = 'postgres'
+# Rows fetched per round trip by each server-side cursor
+FETCH_SIZE = 20000
+# Rows per CSV shard; Neptune loads shards of one type in parallel
+SHARD_ROWS = 500000
+EXPORT_WORKERS = 4
+
+
+def property_keys(cursor, query, params):
+    """Distinct JSONB property keys, so the typed header is known before streaming rows"""
+    cursor.execute(query, params)
+    return sorted({property_name(key) for (key,) in cursor.fetchall()})
+
+class ShardWriter:
+    """Writes rows to <prefix>_0000.csv, <prefix>_0001.csv, ... with the header repeated in each shard"""
+
+    def __init__(self, output_dir, prefix, header, shard_rows=SHARD_ROWS):
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.header = header
+        self.shard_rows = shard_rows
+        self.paths = []
+        self.rows = 0
+        self.file = None
+        self.writer = None
+        self.shard_count = 0
+
+    def _open_next(self):
+        self.close()
+        path = os.path.join(self.output_dir, f"{self.prefix}_{len(self.paths):04d}.csv")
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file, quoting=csv.QUOTE_ALL)
+        self.writer.writerow(self.header)
+        self.paths.append(path)
+        self.shard_count = 0
+
+    def write(self, row):
+        if self.writer is None or self.shard_count >= self.shard_rows:
+            self._open_next()
+        self.writer.writerow(row)
+        self.shard_count += 1
+        self.rows += 1
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+            self.writer = None
+
+def remove_stale_shards(output_dir, prefix):
+    # A smaller export would otherwise leave old trailing shards to be loaded
+    for path in glob.glob(os.path.join(output_dir, f"{prefix}_[0-9][0-9][0-9][0-9].csv")):
+        os.remove(path)
+
+def export_nodes(db_params, node_type, output_dir, fetch_size=FETCH_SIZE, shard_rows=SHARD_ROWS):
+    """Stream one node type into Gremlin vertex CSV shards; returns (label, rows, shard paths)"""
+    prefix = f"{SHARD_PREFIX}_{node_type}_nodes"
+    conn = psycopg2.connect(**db_params)
+    try:
+        conn.set_session(readonly=True)
+        with conn.cursor() as cursor:
+            names = property_keys(cursor, "SELECT DISTINCT jsonb_object_keys(node_properties) FROM nodes "
+                                          "WHERE node_type = %s AND jsonb_typeof(node_properties) = 'object'",
+                                  (node_type,))
+
+        remove_stale_shards(output_dir, prefix)
+        writer = ShardWriter(output_dir, prefix, ['~id'] + [gremlin_header(n) for n in names] + ['~label'],
+                             shard_rows)
+        # Named cursor: the result set stays on the server and only
+        # fetch_size rows are held here at a time
+        with conn.cursor(name=f"export_{prefix}") as cursor:
+            cursor.itersize = fetch_size
+            cursor.execute("SELECT node_id, node_properties FROM nodes WHERE node_type = %s ORDER BY node_id",
+                           (node_type,))
+            for node_id, node_properties in cursor:
+                properties = vertex_properties(node_properties)
+                writer.write([node_id] + [gremlin_value(properties.get(n)) for n in names] + [node_type])
+        writer.close()
+        return node_type, writer.rows, writer.paths
+    finally:
+        conn.close()
+
+def export_edges(db_params, edge_type, output_dir, fetch_size=FETCH_SIZE, shard_rows=SHARD_ROWS):
+    """Stream one edge type (one edges partition) into Gremlin edge CSV shards"""
+    prefix = f"{SHARD_PREFIX}_{edge_type}_edges"
+    conn = psycopg2.connect(**db_params)
+    try:
+        conn.set_session(readonly=True)
+        with conn.cursor() as cursor:
+            names = property_keys(cursor, "SELECT DISTINCT jsonb_object_keys(edge_properties) FROM edges "
+                                          "WHERE edge_type = %s AND jsonb_typeof(edge_properties) = 'object'",
+                                  (edge_type,))
+
+        remove_stale_shards(output_dir, prefix)
+        writer = ShardWriter(output_dir, prefix,
+                             ['~id', '~from', '~to'] + [gremlin_header(n) for n in names] + ['~label'], shard_rows)
+        with conn.cursor(name=f"export_{prefix}") as cursor:
+            cursor.itersize = fetch_size
+            cursor.execute("SELECT edge_id, node_id_from, node_id_to, edge_properties FROM edges "
+                           "WHERE edge_type = %s ORDER BY edge_id", (edge_type,))
+            for edge_id, node_id_from, node_id_to, edge_properties in cursor:
+                properties = {property_name(k): v for k, v in (edge_properties or {}).items()}
+                writer.write([edge_id, node_id_from, node_id_to] +
+                             [gremlin_value(properties.get(n)) for n in names] + [edge_type])
+        writer.close()
+        return edge_type, writer.rows, writer.paths
+    finally:
+        conn.close()
+
+def export_types(db_params):
+    """Node and edge types present in the nodes and edges tables"""
+    conn = psycopg2.connect(**db_params)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT DISTINCT node_type FROM nodes")
+            node_types = sorted(row[0] for row in cursor.fetchall())
+            cursor.execute("SELECT DISTINCT edge_type FROM edges")
+            edge_types = sorted(row[0] for row in cursor.fetchall())
+        return node_types, edge_types
+    finally:
+        conn.close()
+
+def export_postgres_to_neptune_csv(output_dir=OUTPUT_DIR, node_types=None, edge_types=None,
+                                   workers=EXPORT_WORKERS, fetch_size=FETCH_SIZE, shard_rows=SHARD_ROWS):
+    try:
+        db_params = get_db_params()
+        os.makedirs(output_dir, exist_ok=True)
+        if node_types is None or edge_types is None:
+            found_nodes, found_edges = export_types(db_params)
+            node_types = found_nodes if node_types is None else node_types
+            edge_types = found_edges if edge_types is None else edge_types
+        print(f"Exporting node types {', '.join(node_types) or '-'} and edge types {', '.join(edge_types) or '-'}")
+
+        start_time = time.time()
+        total_rows = 0
+        total_shards = 0
+        # One process per type: CSV formatting is CPU-bound in Python, so
+        # processes (not threads) are what lets the types export in parallel
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for node_type in node_types:
+                futures[executor.submit(export_nodes, db_params, node_type, output_dir, fetch_size,
+                                        shard_rows)] = 'nodes'
+            for edge_type in edge_types:
+                futures[executor.submit(export_edges, db_params, edge_type, output_dir, fetch_size,
+                                        shard_rows)] = 'edges'
+
+            for future in as_completed(futures):
+                label, rows, paths = future.result()
+                total_rows += rows
+                total_shards += len(paths)
+                elapsed = time.time() - start_time
+                print(f"Exported {rows} {label} {futures[future]} to {len(paths)} shard(s) "
+                      f"({elapsed:.1f}s since start)")
+
+        elapsed = time.time() - start_time
+        rate = total_rows / elapsed if elapsed > 0 else 0
+        print(f"\nExported {total_rows} rows to {total_shards} CSV shards in {output_dir} "
+              f"in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+        return True
+
+    except Exception as e:
+        print(f"Error exporting data: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Export the Postgres nodes and edges tables as Neptune Gremlin CSV')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='Directory for the CSV shards')
+    parser.add_argument('--node-types', nargs='*', choices=list(GDS_NODE_FILES),
+                        help='Node types to export (default: all in the nodes table)')
+    parser.add_argument('--edge-types', nargs='*', choices=EDGE_TYPES,
+                        help='Edge types to export (default: all in the edges table)')
+    parser.add_argument('--workers', type=int, default=EXPORT_WORKERS, help='Types exported in parallel')
+    parser.add_argument('--fetch-size', type=int, default=FETCH_SIZE, help='Rows per server-side cursor round trip')
+    parser.add_argument('--shard-rows', type=int, default=SHARD_ROWS, help='Rows per CSV shard')
+    args = parser.parse_args()
+    export_postgres_to_neptune_csv(args.output_dir, args.node_types, args.edge_types, args.workers,
+                                   args.fetch_size, args.shard_rows)
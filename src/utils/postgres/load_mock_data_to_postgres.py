@@ -1,165 +1,752 @@
-import pandas as pd
+import argparse
+import hashlib
 import psycopg2
-from psycopg2.extras import execute_values
 from tqdm import tqdm
 import os
 import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
-def delete_all_records(cursor):
-    """Delete all records from edges and nodes tables"""
+from neptune.gds import GDS_DIR, GDS_NODE_FILES, gds_edge_files, iter_json_array
+
+# Bytes handed to COPY per read() call
+COPY_BUFFER_SIZE = 1 << 20
+# Concurrent COPY connections, and rows handed to a shard at a time
+COPY_SHARDS = 4
+SHARD_BATCH_ROWS = 5000
+
+NODE_COLUMNS = ['node_id', 'node_type', 'node_name', 'node_properties', 'content_hash']
+EDGE_COLUMNS = ['edge_id', 'node_id_from', 'node_id_to', 'edge_type', 'edge_properties', 'content_hash']
+# Rows fetched per round trip when reading stored hashes in sync mode
+HASH_FETCH_SIZE = 50000
+
+# edges is list-partitioned on edge_type, one partition per type plus a
+# default partition for anything else. Queries filtering on edge_type are
+# pruned to a single partition, which replaces idx_edges_type.
+EDGE_TYPES = ['person_name', 'person_address', 'person_form', 'person_phone', 'person_email', 'person_anumber']
+DEFAULT_EDGE_PARTITION = 'edges_default'
+
+# Hot node properties promoted to stored generated columns, so lookups use
+# plain typed B-tree indexes instead of extracting from JSONB per row
+GENERATED_COLUMNS = {
+    'name_full': ('TEXT', "node_properties->>'NAME_FULL'"),
+    'birth_date': ('DATE', "gds_date(node_properties->>'BIRTH_DATE')"),
+    'address_full': ('TEXT', "node_properties->>'ADDRESS_FULL'")
+}
+# Per node type: whether node_properties gets a GIN jsonb_path_ops index (for
+# @> containment such as A-numbers in ANUMBER_LIST) and which generated
+# columns get B-tree indexes. All indexes are partial on the node type, so
+# queries must filter on node_type to use them.
+PROPERTY_INDEXES = {
+    'person': {'gin': True, 'columns': ['name_full', 'birth_date']},
+    'name': {'gin': False, 'columns': ['name_full']},
+    'address': {'gin': False, 'columns': ['address_full']}
+}
+# Generated columns need an IMMUTABLE expression; a text::date cast depends on
+# DateStyle, so dates are parsed explicitly. Malformed or impossible dates
+# become NULL instead of failing the insert. Plain SQL (no exception block)
+# keeps it inlinable and free of per-row subtransactions; nested CASEs fix
+# the evaluation order so make_date only sees valid fields.
+GDS_DATE_FUNCTION = """
+    CREATE OR REPLACE FUNCTION gds_date(value TEXT) RETURNS DATE
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT CASE WHEN value ~ '^[1-9][0-9]{3}-(0[1-9]|1[0-2])-(0[1-9]|[12][0-9]|3[01])$' THEN
+            CASE WHEN substr(value, 9, 2)::INT <= extract(DAY FROM
+                    make_date(substr(value, 1, 4)::INT, substr(value, 6, 2)::INT, 1) + INTERVAL '1 month - 1 day')
+                THEN make_date(substr(value, 1, 4)::INT, substr(value, 6, 2)::INT, substr(value, 9, 2)::INT)
+            END
+        END
+    $$
+"""
+
+# Connections used to build keys and indexes in bulk mode
+BUILD_WORKERS = 4
+MAINTENANCE_WORK_MEM = '512MB'
+
+# COPY text format escapes
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+_DONE = object()
+
+
+def get_db_params():
+    """Database connection parameters from the environment"""
+    load_dotenv()
+    return {
+        'dbname': os.getenv('DB_NAME', 'neptune_db'),
+        'user': os.getenv('DB_USER', 'postgres'),
+        'password': os.getenv('DB_PASSWORD', 'postgres'),
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'port': os.getenv('DB_PORT', '5432')
+    }
+
+def edge_partitions():
+    """Edge partition table names, including the default partition"""
+    return [f"edges_{edge_type}" for edge_type in EDGE_TYPES] + [DEFAULT_EDGE_PARTITION]
+
+def add_property_columns(cursor):
+    """Add the stored generated columns for hot properties to nodes"""
+    cursor.execute(GDS_DATE_FUNCTION)
+    for column, (column_type, expression) in GENERATED_COLUMNS.items():
+        cursor.execute(f"ALTER TABLE nodes ADD COLUMN {column} {column_type} GENERATED ALWAYS AS ({expression}) STORED")
+    print(f"Added generated columns: {', '.join(GENERATED_COLUMNS)}")
+
+def property_index_statements():
+    """CREATE INDEX statements for the per-type property indexes"""
+    statements = []
+    for node_type, config in PROPERTY_INDEXES.items():
+        if config.get('gin'):
+            statements.append(
+                f"CREATE INDEX idx_nodes_{node_type}_properties ON nodes "
+                f"USING GIN (node_properties jsonb_path_ops) WHERE node_type = '{node_type}'"
+            )
+        for column in config.get('columns', []):
+            statements.append(
+                f"CREATE INDEX idx_nodes_{node_type}_{column} ON nodes ({column}) WHERE node_type = '{node_type}'"
+            )
+    return statements
+
+def create_edge_partitions(cursor, unlogged=False):
+    """Create one partition of edges per known edge type plus a default partition.
+
+    A partitioned table itself cannot be unlogged, so in bulk mode each
+    partition is created (and later switched to logged) individually.
+    """
+    persistence = "UNLOGGED " if unlogged else ""
+    for edge_type in EDGE_TYPES:
+        cursor.execute(
+            f"CREATE {persistence}TABLE edges_{edge_type} PARTITION OF edges FOR VALUES IN (%s)",
+            (edge_type,)
+        )
+    cursor.execute(f"CREATE {persistence}TABLE {DEFAULT_EDGE_PARTITION} PARTITION OF edges DEFAULT")
+    print(f"Created {len(EDGE_TYPES) + 1} edge partitions")
+
+def create_bulk_tables(cursor):
+    """Create unlogged tables without keys, indexes or FKs for the bulk load"""
     try:
-        print("Deleting existing records...")
-        
-        # Delete edges first (due to foreign key constraints)
-        cursor.execute("DELETE FROM edges")
-        print("Deleted all edge records")
-        
-        # Delete nodes
-        cursor.execute("DELETE FROM nodes")
-        print("Deleted all node records")
-        
+        print("Creating unlogged tables for bulk load...")
+        cursor.execute("DROP TABLE IF EXISTS edges CASCADE")
+        cursor.execute("DROP TABLE IF EXISTS nodes CASCADE")
+        cursor.execute("""
+            CREATE UNLOGGED TABLE nodes (
+                node_id VARCHAR(255) NOT NULL,
+                node_type VARCHAR(255),
+                node_name VARCHAR(255),
+                node_properties JSONB,
+                content_hash CHAR(32)
+            )
+        """)
+        add_property_columns(cursor)
+        cursor.execute("""
+            CREATE TABLE edges (
+                edge_id VARCHAR(255) NOT NULL,
+                node_id_from VARCHAR(255),
+                node_id_to VARCHAR(255),
+                edge_type VARCHAR(255) NOT NULL,
+                edge_properties JSONB,
+                content_hash CHAR(32)
+            ) PARTITION BY LIST (edge_type)
+        """)
+        create_edge_partitions(cursor, unlogged=True)
+        print("Created unlogged nodes and edges tables")
         return True
     except Exception as e:
-        print(f"Error deleting records: {str(e)}")
+        print(f"Error creating tables: {str(e)}")
         return False
 
+def bulk_build_phases():
+    """Deferred DDL for bulk mode as (name, statements, parallel) phases.
+
+    Statements within a parallel phase never take conflicting locks: one
+    ALTER per table, or CREATE INDEX, whose SHARE locks coexist. Tables go
+    logged first because SET LOGGED rewrites a table together with its
+    indexes, so doing it before the builds writes each index once. Keys and
+    indexes are built per partition in parallel; the parent-level PK and
+    indexes created afterwards adopt the matching partition indexes instead
+    of rebuilding them. The FKs need the unique index on nodes(node_id).
+    """
+    partitions = edge_partitions()
+    return [
+        ('set logged', ["ALTER TABLE nodes SET LOGGED"] +
+                       [f"ALTER TABLE {p} SET LOGGED" for p in partitions], True),
+        ('primary keys', ["ALTER TABLE nodes ADD PRIMARY KEY (node_id)"] +
+                         [f"ALTER TABLE {p} ADD PRIMARY KEY (edge_id, edge_type)" for p in partitions], True),
+        ('indexes', ["CREATE INDEX idx_nodes_type ON nodes(node_type)"] + property_index_statements() +
+                    [f"CREATE INDEX idx_{p}_from ON {p}(node_id_from)" for p in partitions] +
+                    [f"CREATE INDEX idx_{p}_to ON {p}(node_id_to)" for p in partitions], True),
+        ('attach partition indexes', [
+            "ALTER TABLE edges ADD PRIMARY KEY (edge_id, edge_type)",
+            "CREATE INDEX idx_edges_from ON edges(node_id_from)",
+            "CREATE INDEX idx_edges_to ON edges(node_id_to)"
+        ], False),
+        # Both FKs in one statement: they lock the same tables and would serialise anyway
+        ('foreign keys', [
+            "ALTER TABLE edges ADD FOREIGN KEY (node_id_from) REFERENCES nodes(node_id), "
+            "ADD FOREIGN KEY (node_id_to) REFERENCES nodes(node_id)"
+        ], False)
+    ]
+
+def run_parallel(db_params, statements, workers=BUILD_WORKERS, maintenance_work_mem=MAINTENANCE_WORK_MEM):
+    """Run DDL statements concurrently, one autocommit connection per statement"""
+    def run(statement):
+        conn = psycopg2.connect(**db_params)
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute("SET maintenance_work_mem = %s", (maintenance_work_mem,))
+                start_time = time.time()
+                cursor.execute(statement)
+                print(f"  {time.time() - start_time:7.2f}s  {statement}")
+        finally:
+            conn.close()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(statements)))) as executor:
+        # list() re-raises the first failure
+        list(executor.map(run, statements))
+
+def finalize_bulk_tables(db_params, workers=BUILD_WORKERS, maintenance_work_mem=MAINTENANCE_WORK_MEM):
+    """Switch the bulk-loaded tables to logged and add keys, indexes and FKs; returns seconds per phase"""
+    timings = {}
+    for name, statements, parallel in bulk_build_phases():
+        phase_workers = workers if parallel else 1
+        print(f"\nBuilding {name} ({len(statements)} statements, {phase_workers} connection(s))...")
+        start_time = time.time()
+        run_parallel(db_params, statements, phase_workers, maintenance_work_mem)
+        timings[name] = time.time() - start_time
+    return timings
+
 def create_tables(cursor):
     """Create necessary tables if they don't exist"""
     try:
         print("Creating tables...")
-        
+
         # Drop tables if they exist (optional, comment out if you want to preserve existing data)
         cursor.execute("DROP TABLE IF EXISTS edges CASCADE")
         cursor.execute("DROP TABLE IF EXISTS nodes CASCADE")
-        
+
         # Create nodes table
         cursor.execute("""
             CREATE TABLE nodes (
                 node_id VARCHAR(255) PRIMARY KEY,
                 node_type VARCHAR(255),
                 node_name VARCHAR(255),
-                node_properties JSONB
+                node_properties JSONB,
+                content_hash CHAR(32)
             )
         """)
+        add_property_columns(cursor)
         print("Created nodes table")
-        
-        # Create edges table
+
+        # Create edges table, partitioned by edge type; the partition key
+        # must be part of the primary key
         cursor.execute("""
             CREATE TABLE edges (
-                edge_id VARCHAR(255) PRIMARY KEY,
+                edge_id VARCHAR(255) NOT NULL,
                 node_id_from VARCHAR(255),
                 node_id_to VARCHAR(255),
-                edge_type VARCHAR(255),
+                edge_type VARCHAR(255) NOT NULL,
+                edge_properties JSONB,
+                content_hash CHAR(32),
+                PRIMARY KEY (edge_id, edge_type),
                 FOREIGN KEY (node_id_from) REFERENCES nodes(node_id),
                 FOREIGN KEY (node_id_to) REFERENCES nodes(node_id)
-            )
+            ) PARTITION BY LIST (edge_type)
         """)
+        create_edge_partitions(cursor)
         print("Created edges table")
-        
-        # Create indexes
+
+        # Create indexes; edge_type lookups are served by partition pruning
         cursor.execute("CREATE INDEX idx_nodes_type ON nodes(node_type)")
-        cursor.execute("CREATE INDEX idx_edges_type ON edges(edge_type)")
         cursor.execute("CREATE INDEX idx_edges_from ON edges(node_id_from)")
         cursor.execute("CREATE INDEX idx_edges_to ON edges(node_id_to)")
+        for statement in property_index_statements():
+            cursor.execute(statement)
         print("Created indexes")
-        
+
         return True
     except Exception as e:
         print(f"Error creating tables: {str(e)}")
         return False
 
-def validate_json(json_str):
-    """Validate and escape JSON string"""
+def copy_value(value):
+    """Format one field for COPY text format; dicts/lists are encoded as JSON exactly once"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+    return str(value).translate(_COPY_ESCAPES)
+
+class CopyStream:
+    """File-like reader that encodes rows into COPY text format on demand.
+
+    copy_expert() pulls fixed-size chunks through read(), so rows are
+    produced from the source generator only as fast as Postgres consumes
+    them and the file is never materialised in memory.
+    """
+
+    def __init__(self, rows):
+        self.rows = iter(rows)
+        self.buffer = b''
+        self.count = 0
+
+    def read(self, size=-1):
+        parts = [self.buffer]
+        length = len(self.buffer)
+        while size < 0 or length < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            line = ('\t'.join(copy_value(v) for v in row) + '\n').encode('utf-8')
+            parts.append(line)
+            length += len(line)
+            self.count += 1
+        data = b''.join(parts)
+        if size < 0:
+            size = len(data)
+        self.buffer = data[size:]
+        return data[:size]
+
+def copy_rows(cursor, table, columns, rows):
+    """Stream rows into a table with COPY ... FROM STDIN; returns the row count"""
+    stream = CopyStream(rows)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", stream, size=COPY_BUFFER_SIZE)
+    return stream.count
+
+def copy_rows_sharded(db_params, table, columns, rows, shards=COPY_SHARDS):
+    """COPY rows over several connections at once; returns the row count.
+
+    The rows are read once and dealt out round-robin in batches to `shards`
+    connections, each running its own COPY, so the server parses, routes and
+    writes the shards in parallel. Shard queues are bounded, so a slow
+    connection throttles the reader instead of buffering. The shards commit
+    only after every COPY has succeeded; if any shard or the row source fails,
+    all of them roll back and the error is raised.
+    """
+    if shards <= 1:
+        conn = psycopg2.connect(**db_params)
+        try:
+            with conn.cursor() as cursor:
+                count = copy_rows(cursor, table, columns, rows)
+            conn.commit()
+            return count
+        finally:
+            conn.close()
+
+    queues = [queue.Queue(maxsize=4) for _ in range(shards)]
+    connections = [None] * shards
+    counts = [0] * shards
+    finished = [False] * shards
+    errors = []
+    failed = threading.Event()
+
+    def shard_rows(i):
+        while True:
+            batch = queues[i].get()
+            if batch is _DONE:
+                finished[i] = True
+                return
+            yield from batch
+
+    def copy_shard(i):
+        try:
+            connections[i] = psycopg2.connect(**db_params)
+            with connections[i].cursor() as cursor:
+                counts[i] = copy_rows(cursor, table, columns, shard_rows(i))
+        except Exception as e:
+            errors.append(e)
+            failed.set()
+            # Keep draining so the reader never blocks on a dead shard
+            while not finished[i]:
+                finished[i] = queues[i].get() is _DONE
+
+    threads = [threading.Thread(target=copy_shard, args=(i,), daemon=True) for i in range(shards)]
+    for thread in threads:
+        thread.start()
+
+    batch = []
+    shard = 0
+    reader_errors = []
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= SHARD_BATCH_ROWS:
+                queues[shard].put(batch)
+                batch = []
+                shard = (shard + 1) % shards
+                if failed.is_set():
+                    break
+        if batch and not failed.is_set():
+            queues[shard].put(batch)
+    except Exception as e:
+        # A bad source row; the shards' partial COPYs are rolled back below
+        reader_errors.append(e)
+    finally:
+        # Always end every shard's COPY, or its thread blocks on get() with
+        # its transaction (and locks) held open
+        for q in queues:
+            q.put(_DONE)
+        for thread in threads:
+            thread.join()
+
     try:
-        # Try to parse the JSON
-        parsed = json.loads(json_str)
-        # Convert back to string with proper escaping
-        return json.dumps(parsed)
-    except json.JSONDecodeError:
-        print(f"Invalid JSON found: {json_str[:100]}...")
+        if reader_errors:
+            raise reader_errors[0]
+        if errors:
+            raise errors[0]
+        for conn in connections:
+            conn.commit()
+    finally:
+        # Closing a connection with an open transaction rolls it back
+        for conn in connections:
+            if conn is not None:
+                conn.close()
+    return sum(counts)
+
+def encode_json(value):
+    """Canonical JSON (sorted keys) so equal content always hashes the same"""
+    if value is None:
         return None
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+def content_hash(*values):
+    """MD5 over a row's fields; stored with the row so syncs can skip unchanged content"""
+    joined = '\x1f'.join('\x00' if v is None else str(v) for v in values)
+    return hashlib.md5(joined.encode('utf-8')).hexdigest()
 
-def load_data_to_postgres():
+def node_rows(path, node_type):
+    for node in iter_json_array(path):
+        row = (
+            node['node_id'],
+            node.get('node_type', node_type),
+            node.get('node_name'),
+            encode_json(node.get('node_properties'))
+        )
+        yield row + (content_hash(*row),)
+
+def edge_rows(path):
+    for edge in iter_json_array(path):
+        row = (
+            edge['edge_id'],
+            edge['node_id_from'],
+            edge['node_id_to'],
+            edge['edge_type'],
+            encode_json(edge.get('edge_properties'))
+        )
+        yield row + (content_hash(*row),)
+
+def load_file(db_params, table, columns, rows, label, shards=COPY_SHARDS):
+    start_time = time.time()
+    count = copy_rows_sharded(db_params, table, columns, tqdm(rows, desc=f"Loading {label}", unit=" rows"), shards)
+    elapsed = time.time() - start_time
+    print(f"Loaded {count} {label} rows in {elapsed:.2f}s ({count / elapsed if elapsed else 0:,.0f} rows/s)")
+    return count
+
+def drop_tables(db_params):
+    """Drop the nodes and edges tables, e.g. after a failed load left them partly filled"""
+    conn = psycopg2.connect(**db_params)
     try:
-        # Load environment variables
-        load_dotenv()
-        
-        # Database connection parameters
-        db_params = {
-            'dbname': os.getenv('DB_NAME', 'neptune_db'),
-            'user': os.getenv('DB_USER', 'postgres'),
-            'password': os.getenv('DB_PASSWORD', 'postgres'),
-            'host': os.getenv('DB_HOST', 'localhost'),
-            'port': os.getenv('DB_PORT', '5432')
-        }
-        
+        with conn.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS edges CASCADE")
+            cursor.execute("DROP TABLE IF EXISTS nodes CASCADE")
+        conn.commit()
+    finally:
+        conn.close()
+
+def load_data_to_postgres(gds_dir=GDS_DIR, bulk=False, workers=BUILD_WORKERS,
+                          maintenance_work_mem=MAINTENANCE_WORK_MEM, shards=COPY_SHARDS):
+    """Load the GDS files into Postgres.
+
+    In bulk mode the rows go into unlogged tables with no keys, indexes or
+    FKs, so COPY pays neither WAL nor constraint checks per row; those are
+    built afterwards across several connections.
+
+    A failure in any COPY or build phase drops the tables again instead of
+    leaving them half loaded (or, in bulk mode, without keys).
+    """
+    tables_created = False
+    try:
+        db_params = get_db_params()
+        timings = {}
+
         # Connect to PostgreSQL
         print("Connecting to PostgreSQL database...")
         conn = psycopg2.connect(**db_params)
         cursor = conn.cursor()
-        
-        # Create tables
-        if not create_tables(cursor):
-            return False
-            
-        # Delete all existing records
-        if not delete_all_records(cursor):
+
+        # Create tables; committed so the COPY connections can see them
+        phase_start = time.time()
+        if not (create_bulk_tables(cursor) if bulk else create_tables(cursor)):
             return False
-        
-        # Load person nodes
-        print("\nLoading person nodes...")
-        person_df = pd.read_csv('data/output/mock_person_data.csv')
-        person_data = []
-        invalid_json_count = 0
-        
-        for _, row in person_df.iterrows():
-            # Validate and escape JSON
-            valid_json = validate_json(row['node_properties'])
-            if valid_json is None:
-                invalid_json_count += 1
-                continue
-                
-            person_data.append((
-                row['node_id'],
-                'person',
-                row['node_name'],
-                valid_json
-            ))
-        
-        if invalid_json_count > 0:
-            print(f"Warning: Skipped {invalid_json_count} person nodes due to invalid JSON")
-        
-        if person_data:
-            execute_values(cursor,
-                "INSERT INTO nodes (node_id, node_type, node_name, node_properties) VALUES %s ON CONFLICT (node_id) DO NOTHING",
-                person_data
-            )
-            print(f"Loaded {len(person_data)} person nodes")
-        
-        # Commit the transaction
         conn.commit()
-        
+        tables_created = True
+        timings['create tables'] = time.time() - phase_start
+
+        start_time = time.time()
+        total_rows = 0
+
+        # Load every node type before the edges that reference them
+        for node_type, filename in GDS_NODE_FILES.items():
+            path = os.path.join(gds_dir, filename)
+            if not os.path.exists(path):
+                print(f"Warning: {path} not found, skipping {node_type} nodes")
+                continue
+            total_rows += load_file(db_params, 'nodes', NODE_COLUMNS, node_rows(path, node_type),
+                                    f"{node_type} node", shards)
+
+        for path in gds_edge_files(gds_dir):
+            label = os.path.basename(path).replace('mock_', '').replace('_data.json', '') + ' edge'
+            total_rows += load_file(db_params, 'edges', EDGE_COLUMNS, edge_rows(path), label, shards)
+
+        elapsed = time.time() - start_time
+        timings['copy'] = elapsed
+        print(f"\nLoaded {total_rows} rows in {elapsed:.2f}s ({total_rows / elapsed if elapsed else 0:,.0f} rows/s)")
+
+        if bulk:
+            timings.update(finalize_bulk_tables(db_params, workers, maintenance_work_mem))
+
+        print("\nPhase Timings:")
+        for phase, seconds in timings.items():
+            print(f"{phase}: {seconds:.2f}s")
+        print(f"total: {sum(timings.values()):.2f}s")
+
         # Print final statistics
         print("\nData Loading Statistics:")
         cursor.execute("SELECT node_type, COUNT(*) FROM nodes GROUP BY node_type")
         print("\nNode Types Distribution:")
         for node_type, count in cursor.fetchall():
             print(f"{node_type}: {count} nodes")
-        
+        cursor.execute("SELECT tableoid::regclass, edge_type, COUNT(*) FROM edges GROUP BY 1, 2 ORDER BY 1")
+        print("\nEdge Types Distribution:")
+        for partition, edge_type, count in cursor.fetchall():
+            print(f"{edge_type}: {count} edges ({partition})")
+
         # Close the connection
         cursor.close()
         conn.close()
-        
+
         print("\nData loading completed successfully!")
         return True
-        
+
     except Exception as e:
         print(f"Error loading data to PostgreSQL: {str(e)}")
+        if 'conn' in locals():
+            conn.rollback()
+            conn.close()
+        if tables_created:
+            try:
+                drop_tables(db_params)
+                print("Dropped the partially loaded nodes and edges tables")
+            except Exception as drop_error:
+                print(f"Error dropping partially loaded tables: {str(drop_error)}")
+        return False
+
+def stored_hashes(conn, query):
+    """Stream {id: stored values} for one table through a server-side cursor"""
+    hashes = {}
+    with conn.cursor(name='sync_stored_hashes') as cursor:
+        cursor.itersize = HASH_FETCH_SIZE
+        cursor.execute(query)
+        for row in cursor:
+            hashes[row[0]] = row[1:] if len(row) > 2 else row[1]
+    return hashes
+
+def diff_nodes(rows, stored, stats):
+    """Yield staging rows ('u' upsert / 'd' delete) for nodes whose content changed"""
+    for row in rows:
+        old_hash = stored.pop(row[0], None)
+        if old_hash == row[-1]:
+            stats['unchanged'] += 1
+            continue
+        stats['changed'] += 1
+        yield ('u',) + row
+    # Whatever was not seen in the files is gone
+    for node_id in stored:
+        stats['deleted'] += 1
+        yield ('d', node_id, None, None, None, None)
+
+def diff_edges(rows, stored, stats):
+    """Yield staging rows for edges; a changed edge_type moves the row to another partition"""
+    for row in rows:
+        old = stored.pop(row[0], None)
+        if old is not None and old[0] != row[3]:
+            stats['deleted'] += 1
+            yield ('d', row[0], None, None, old[0], None, None)
+        elif old is not None and old[1] == row[-1]:
+            stats['unchanged'] += 1
+            continue
+        stats['changed'] += 1
+        yield ('u',) + row
+    for edge_id, (edge_type, _) in stored.items():
+        stats['deleted'] += 1
+        yield ('d', edge_id, None, None, edge_type, None, None)
+
+# Applies all staged changes in one statement. FK checks run at the end of
+# the statement, so deleting edges before their nodes and inserting nodes
+# before their edges needs no ordering between the CTEs.
+SYNC_MERGE = """
+    WITH deleted_edges AS (
+        DELETE FROM edges e USING sync_edges s
+        WHERE s.op = 'd' AND e.edge_id = s.edge_id AND e.edge_type = s.edge_type
+        RETURNING 1
+    ), deleted_nodes AS (
+        DELETE FROM nodes n USING sync_nodes s
+        WHERE s.op = 'd' AND n.node_id = s.node_id
+        RETURNING 1
+    ), upserted_nodes AS (
+        INSERT INTO nodes (node_id, node_type, node_name, node_properties, content_hash)
+        SELECT node_id, node_type, node_name, node_properties, content_hash FROM sync_nodes WHERE op = 'u'
+        ON CONFLICT (node_id) DO UPDATE SET
+            node_type = EXCLUDED.node_type,
+            node_name = EXCLUDED.node_name,
+            node_properties = EXCLUDED.node_properties,
+            content_hash = EXCLUDED.content_hash
+        RETURNING (xmax = 0) AS inserted
+    ), upserted_edges AS (
+        INSERT INTO edges (edge_id, node_id_from, node_id_to, edge_type, edge_properties, content_hash)
+        SELECT edge_id, node_id_from, node_id_to, edge_type, edge_properties, content_hash
+        FROM sync_edges WHERE op = 'u'
+        ON CONFLICT (edge_id, edge_type) DO UPDATE SET
+            node_id_from = EXCLUDED.node_id_from,
+            node_id_to = EXCLUDED.node_id_to,
+            edge_properties = EXCLUDED.edge_properties,
+            content_hash = EXCLUDED.content_hash
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT
+        (SELECT count(*) FILTER (WHERE inserted) FROM upserted_nodes),
+        (SELECT count(*) FILTER (WHERE NOT inserted) FROM upserted_nodes),
+        (SELECT count(*) FROM deleted_nodes),
+        (SELECT count(*) FILTER (WHERE inserted) FROM upserted_edges),
+        (SELECT count(*) FILTER (WHERE NOT inserted) FROM upserted_edges),
+        (SELECT count(*) FROM deleted_edges)
+"""
+
+def sync_data_to_postgres(gds_dir=GDS_DIR):
+    """Apply only what changed in the GDS files since the last load or sync.
+
+    Stored content hashes are read once, the files are streamed and hashed
+    client-side, and only new, changed and deleted rows are copied into
+    temporary staging tables. A single statement then merges them, so a
+    regeneration that touches a few percent of the data moves only that
+    fraction to the server and the tables are never dropped.
+    """
+    try:
+        db_params = get_db_params()
+        timings = {}
+
+        print("Connecting to PostgreSQL database...")
+        conn = psycopg2.connect(**db_params)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT count(*) FROM information_schema.columns
+            WHERE table_name IN ('nodes', 'edges') AND column_name = 'content_hash'
+        """)
+        if cursor.fetchone()[0] < 2:
+            print("Error: nodes/edges have no content_hash column; run a full load first")
+            return False
+
+        phase_start = time.time()
+        stored_nodes = stored_hashes(conn, "SELECT node_id, content_hash FROM nodes")
+        stored_edges = stored_hashes(conn, "SELECT edge_id, edge_type, content_hash FROM edges")
+        timings['read stored hashes'] = time.time() - phase_start
+        print(f"Read hashes of {len(stored_nodes)} nodes and {len(stored_edges)} edges")
+
+        cursor.execute("""
+            CREATE TEMP TABLE sync_nodes (
+                op CHAR(1) NOT NULL,
+                node_id VARCHAR(255),
+                node_type VARCHAR(255),
+                node_name VARCHAR(255),
+                node_properties JSONB,
+                content_hash CHAR(32)
+            ) ON COMMIT DROP
+        """)
+        cursor.execute("""
+            CREATE TEMP TABLE sync_edges (
+                op CHAR(1) NOT NULL,
+                edge_id VARCHAR(255),
+                node_id_from VARCHAR(255),
+                node_id_to VARCHAR(255),
+                edge_type VARCHAR(255),
+                edge_properties JSONB,
+                content_hash CHAR(32)
+            ) ON COMMIT DROP
+        """)
+
+        phase_start = time.time()
+        node_stats = {'unchanged': 0, 'changed': 0, 'deleted': 0}
+        edge_stats = {'unchanged': 0, 'changed': 0, 'deleted': 0}
+
+        def all_node_rows():
+            for node_type, filename in GDS_NODE_FILES.items():
+                path = os.path.join(gds_dir, filename)
+                if os.path.exists(path):
+                    yield from node_rows(path, node_type)
+
+        def all_edge_rows():
+            for path in gds_edge_files(gds_dir):
+                yield from edge_rows(path)
+
+        copy_rows(cursor, 'sync_nodes', ['op'] + NODE_COLUMNS,
+                  diff_nodes(tqdm(all_node_rows(), desc="Diffing nodes", unit=" rows"), stored_nodes, node_stats))
+        copy_rows(cursor, 'sync_edges', ['op'] + EDGE_COLUMNS,
+                  diff_edges(tqdm(all_edge_rows(), desc="Diffing edges", unit=" rows"), stored_edges, edge_stats))
+        timings['diff and stage'] = time.time() - phase_start
+        print(f"Nodes: {node_stats['unchanged']} unchanged, {node_stats['changed']} new/changed, "
+              f"{node_stats['deleted']} deleted")
+        print(f"Edges: {edge_stats['unchanged']} unchanged, {edge_stats['changed']} new/changed, "
+              f"{edge_stats['deleted']} deleted")
+
+        phase_start = time.time()
+        cursor.execute("ANALYZE sync_nodes")
+        cursor.execute("ANALYZE sync_edges")
+        cursor.execute(SYNC_MERGE)
+        (nodes_inserted, nodes_updated, nodes_deleted,
+         edges_inserted, edges_updated, edges_deleted) = cursor.fetchone()
+        conn.commit()
+        timings['merge'] = time.time() - phase_start
+
+        print("\nSync Results:")
+        print(f"nodes: {nodes_inserted} inserted, {nodes_updated} updated, {nodes_deleted} deleted")
+        print(f"edges: {edges_inserted} inserted, {edges_updated} updated, {edges_deleted} deleted")
+        print("\nPhase Timings:")
+        for phase, seconds in timings.items():
+            print(f"{phase}: {seconds:.2f}s")
+        print(f"total: {sum(timings.values()):.2f}s")
+
+        cursor.close()
+        conn.close()
+
+        print("\nSync completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"Error syncing data to PostgreSQL: {str(e)}")
         if 'conn' in locals():
             conn.rollback()
             conn.close()
         return False
 
 if __name__ == "__main__":
-    load_data_to_postgres() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Load the GDS node and edge files into Postgres')
+    parser.add_argument('--gds-dir', default=GDS_DIR, help='Directory with the GDS JSON files')
+    parser.add_argument('--bulk', action='store_true',
+                        help='Load into unlogged tables and build keys, indexes and FKs afterwards')
+    parser.add_argument('--workers', type=int, default=BUILD_WORKERS,
+                        help='Connections used to build keys and indexes in bulk mode')
+    parser.add_argument('--maintenance-work-mem', default=MAINTENANCE_WORK_MEM,
+                        help='maintenance_work_mem for each index build')
+    parser.add_argument('--shards', type=int, default=COPY_SHARDS,
+                        help='Concurrent COPY connections per file')
+    parser.add_argument('--sync', action='store_true',
+                        help='Apply only inserts, updates and deletes since the last load instead of reloading')
+    args = parser.parse_args()
+    if args.sync:
+        ok = sync_data_to_postgres(args.gds_dir)
+    else:
+        ok = load_data_to_postgres(args.gds_dir, args.bulk, args.workers, args.maintenance_work_mem, args.shards)
+    if not ok:
+        exit(1)
@@ -0,0 +1,181 @@
+import argparse
+import json
+
+import psycopg2
+
+from load_mock_data_to_postgres import get_db_params
+
+# Depth limits keep traversals bounded on hub nodes (a shared name or
+# address connects every person that uses it)
+MAX_HOPS = 4
+DEFAULT_LIMIT = 1000
+SHARED_EDGE_TYPES = ['person_name', 'person_address']
+
+
+def _edge_type_filter(edge_types, alias='e'):
+    # psycopg2 inlines the array client-side, so the planner sees a constant
+    # and prunes edges partitions; a catch-all "type IS NULL OR ..." would not
+    if not edge_types:
+        return ''
+    return f" AND {alias}.edge_type = ANY(%(edge_types)s)"
+
+class PostgresGraph:
+    """Graph queries over the Postgres mirror of the Neptune graph (nodes/edges).
+
+    Edges are followed in both directions, as Neptune traversals with an
+    undirected pattern do. Traversals run breadth-first, one query per depth
+    over the whole frontier, with a visited set so every node is expanded at
+    most once however many paths lead to it. Every traversal is depth-limited.
+
+    Usage:
+        with PostgresGraph() as graph:
+            graph.k_hop(person_id, hops=2)
+            graph.shared_attribute_persons(person_id)
+            graph.path_exists(person_id, other_id, max_depth=3)
+    """
+
+    def __init__(self, conn=None):
+        self.conn = conn or psycopg2.connect(**get_db_params())
+        self.owns_connection = conn is None
+        # Read-only queries; autocommit avoids holding a snapshot open
+        self.conn.autocommit = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.owns_connection:
+            self.conn.close()
+
+    def _query(self, sql, params):
+        with self.conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            columns = [c.name for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def sample_nodes(self, node_type='person', samples=50, percent=10):
+        """Up to `samples` random node IDs of node_type, drawn from a `percent` Bernoulli table sample"""
+        rows = self._query("""
+            SELECT node_id FROM nodes TABLESAMPLE BERNOULLI (%(percent)s)
+            WHERE node_type = %(node_type)s ORDER BY random() LIMIT %(samples)s
+        """, {'node_type': node_type, 'samples': samples, 'percent': percent})
+        return [row['node_id'] for row in rows]
+
+    def _expand(self, frontier, edge_types=None):
+        """(node_id, next_id) for every edge touching the frontier, followed in both directions"""
+        type_filter = _edge_type_filter(edge_types)
+        sql = f"""
+            SELECT e.node_id_from AS node_id, e.node_id_to AS next_id FROM edges e
+            WHERE e.node_id_from = ANY(%(frontier)s){type_filter}
+            UNION
+            SELECT e.node_id_to, e.node_id_from FROM edges e
+            WHERE e.node_id_to = ANY(%(frontier)s){type_filter}
+        """
+        return self._query(sql, {'frontier': list(frontier), 'edge_types': edge_types})
+
+    def _walk(self, node_id, max_depth, edge_types=None, stop=None):
+        """Breadth-first walk from node_id; returns {node_id: (depth, parent)}.
+
+        One query per depth expands the whole frontier, and nodes already
+        visited are never expanded again, so a hub costs one expansion
+        instead of one per path through it. `stop(visited)` is checked after
+        each depth.
+        """
+        visited = {node_id: (0, None)}
+        frontier = [node_id]
+        for depth in range(1, max_depth + 1):
+            if not frontier or (stop and stop(visited)):
+                break
+            next_frontier = []
+            for row in self._expand(frontier, edge_types):
+                if row['next_id'] not in visited:
+                    visited[row['next_id']] = (depth, row['node_id'])
+                    next_frontier.append(row['next_id'])
+            frontier = next_frontier
+        return visited
+
+    def k_hop(self, node_id, hops=2, edge_types=None, limit=DEFAULT_LIMIT):
+        """Nodes within `hops` edges of node_id with their shortest distance"""
+        hops = max(1, min(hops, MAX_HOPS))
+        # Results are ordered by depth, so once `limit` nodes are found no
+        # deeper node can make the cut
+        visited = self._walk(node_id, hops, edge_types, stop=lambda visited: len(visited) > limit)
+        del visited[node_id]
+        sql = """
+            SELECT n.node_id, n.node_type, n.node_name, found.depth
+            FROM unnest(%(node_ids)s::VARCHAR[], %(depths)s::INT[]) AS found(node_id, depth)
+            JOIN nodes n ON n.node_id = found.node_id
+            ORDER BY found.depth, n.node_id
+            LIMIT %(limit)s
+        """
+        return self._query(sql, {'node_ids': list(visited), 'depths': [depth for depth, _ in visited.values()],
+                                 'limit': limit})
+
+    def shared_attribute_persons(self, person_id, edge_types=SHARED_EDGE_TYPES, limit=DEFAULT_LIMIT):
+        """Other persons linked to the same name/address node as person_id"""
+        sql = f"""
+            SELECT other.node_id_from AS person_id, mine.edge_type, mine.node_id_to AS shared_node_id,
+                   shared.node_name AS shared_node_name
+            FROM edges mine
+            JOIN edges other
+              ON other.node_id_to = mine.node_id_to AND other.edge_type = mine.edge_type
+            JOIN nodes shared ON shared.node_id = mine.node_id_to
+            WHERE mine.node_id_from = %(person_id)s
+              AND other.node_id_from <> %(person_id)s{_edge_type_filter(edge_types, 'mine')}
+            ORDER BY mine.edge_type, other.node_id_from
+            LIMIT %(limit)s
+        """
+        return self._query(sql, {'person_id': person_id, 'edge_types': list(edge_types), 'limit': limit})
+
+    def shared_attribute_groups(self, edge_type='person_address', min_persons=2, limit=DEFAULT_LIMIT):
+        """Name/address nodes shared by at least `min_persons` persons, largest first"""
+        sql = """
+            SELECT e.node_id_to AS shared_node_id, n.node_name AS shared_node_name,
+                   count(DISTINCT e.node_id_from) AS persons,
+                   array_agg(DISTINCT e.node_id_from) AS person_ids
+            FROM edges e JOIN nodes n ON n.node_id = e.node_id_to
+            WHERE e.edge_type = %(edge_type)s
+            GROUP BY e.node_id_to, n.node_name
+            HAVING count(DISTINCT e.node_id_from) >= %(min_persons)s
+            ORDER BY persons DESC, shared_node_id
+            LIMIT %(limit)s
+        """
+        return self._query(sql, {'edge_type': edge_type, 'min_persons': min_persons, 'limit': limit})
+
+    def path_exists(self, source_id, target_id, max_depth=3, edge_types=None):
+        """Shortest path (list of node IDs) from source to target within max_depth, or None"""
+        max_depth = max(1, min(max_depth, MAX_HOPS))
+        visited = self._walk(source_id, max_depth, edge_types, stop=lambda visited: target_id in visited)
+        if target_id not in visited:
+            return None
+        path = [target_id]
+        while path[-1] != source_id:
+            path.append(visited[path[-1]][1])
+        return path[::-1]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run graph queries against the Postgres nodes/edges mirror')
+    subparsers = parser.add_subparsers(dest='query', required=True)
+    k_hop_parser = subparsers.add_parser('k-hop', help='Neighborhood of a node')
+    k_hop_parser.add_argument('node_id')
+    k_hop_parser.add_argument('--hops', type=int, default=2)
+    k_hop_parser.add_argument('--edge-types', nargs='+')
+    shared_parser = subparsers.add_parser('shared', help='Persons sharing a name/address node with a person')
+    shared_parser.add_argument('person_id')
+    path_parser = subparsers.add_parser('path', help='Shortest path between two nodes')
+    path_parser.add_argument('source_id')
+    path_parser.add_argument('target_id')
+    path_parser.add_argument('--max-depth', type=int, default=3)
+    args = parser.parse_args()
+
+    with PostgresGraph() as graph:
+        if args.query == 'k-hop':
+            result = graph.k_hop(args.node_id, args.hops, args.edge_types)
+        elif args.query == 'shared':
+            result = graph.shared_attribute_persons(args.person_id)
+        else:
+            result = graph.path_exists(args.source_id, args.target_id, args.max_depth)
+    print(json.dumps(result, indent=2, default=str))
@@ -0,0 +1,265 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from neptune.gds import GDS_DIR, GDS_NODE_FILES, gds_edge_files, iter_json_array
+
+REPORT_DIR = 'src/data/output/profile'
+# Edges decoded per batch before their IDs are mapped to integers
+CHUNK_SIZE = 1000000
+TOP_HUBS = 20
+SAMPLE_SIZE = 5
+UNKNOWN = -1
+
+
+class GraphArrays:
+    """Nodes and edges as dense integer arrays.
+
+    Node IDs are factorized once to 0..N-1; edges are stored as int32/int64
+    arrays of node positions and edge type codes, so every statistic below is
+    a bincount, unique or argpartition over flat arrays.
+    """
+
+    def __init__(self, node_ids, node_types):
+        self.node_index = pd.Index(np.asarray(node_ids, dtype=object))
+        type_codes, self.node_types = pd.factorize(pd.Series(node_types, dtype=object))
+        self.node_type_codes = type_codes.astype(np.int16)
+        self.node_types = list(self.node_types)
+        self.index_dtype = np.int32 if len(self.node_index) < 2 ** 31 else np.int64
+        self.edge_types = []
+        self._edge_type_codes = {}
+        self._from = []
+        self._to = []
+        self._types = []
+
+    @property
+    def node_count(self):
+        return len(self.node_index)
+
+    def add_edges(self, from_ids, to_ids, edge_types):
+        """Map one batch of edge endpoint IDs to node positions (UNKNOWN if not a node)"""
+        for edge_type in pd.unique(np.asarray(edge_types, dtype=object)):
+            if edge_type not in self._edge_type_codes:
+                self._edge_type_codes[edge_type] = len(self.edge_types)
+                self.edge_types.append(edge_type)
+        self._from.append(self.node_index.get_indexer(from_ids).astype(self.index_dtype))
+        self._to.append(self.node_index.get_indexer(to_ids).astype(self.index_dtype))
+        self._types.append(pd.Series(edge_types, dtype=object).map(self._edge_type_codes).to_numpy(np.int16))
+
+    def finish(self):
+        def concat(parts, dtype):
+            return np.concatenate(parts) if parts else np.array([], dtype=dtype)
+        self.edge_from = concat(self._from, self.index_dtype)
+        self.edge_to = concat(self._to, self.index_dtype)
+        self.edge_type_codes = concat(self._types, np.int16)
+        self._from, self._to, self._types = [], [], []
+        return self
+
+def load_graph(gds_dir=GDS_DIR, node_data=None, chunk_size=CHUNK_SIZE):
+    """Stream the GDS node and edge files into GraphArrays"""
+    node_ids = []
+    node_types = []
+    from_files = set()
+    for node_type, filename in GDS_NODE_FILES.items():
+        path = os.path.join(gds_dir, filename)
+        if os.path.exists(path):
+            from_files.add(node_type)
+            for node in iter_json_array(path):
+                node_ids.append(node['node_id'])
+                node_types.append(node_type)
+    if node_data:
+        for chunk in pd.read_csv(node_data, usecols=['node_id', 'node_type'], dtype=str, chunksize=chunk_size):
+            chunk = chunk.dropna()
+            chunk = chunk[~chunk['node_type'].isin(from_files)]
+            node_ids.extend(chunk['node_id'].tolist())
+            node_types.extend(chunk['node_type'].tolist())
+
+    # An ID listed twice keeps its first type
+    unique = ~pd.Index(node_ids).duplicated()
+    graph = GraphArrays(np.asarray(node_ids, dtype=object)[unique], np.asarray(node_types, dtype=object)[unique])
+    graph.duplicate_node_ids = int((~unique).sum())
+
+    for path in gds_edge_files(gds_dir):
+        from_ids, to_ids, edge_types = [], [], []
+        for edge in iter_json_array(path):
+            from_ids.append(edge.get('node_id_from'))
+            to_ids.append(edge.get('node_id_to'))
+            edge_types.append(edge.get('edge_type') or 'unknown')
+            if len(from_ids) >= chunk_size:
+                graph.add_edges(from_ids, to_ids, edge_types)
+                from_ids, to_ids, edge_types = [], [], []
+        if from_ids:
+            graph.add_edges(from_ids, to_ids, edge_types)
+    return graph.finish()
+
+def degree_summary(degrees):
+    """Histogram {degree: nodes} over nodes with at least one edge, plus summary stats"""
+    connected = degrees[degrees > 0]
+    histogram = np.bincount(connected) if len(connected) else np.array([], dtype=np.int64)
+    return {
+        'nodes': int(len(connected)),
+        'max': int(connected.max()) if len(connected) else 0,
+        'mean': round(float(connected.mean()), 3) if len(connected) else 0.0,
+        'p99': int(np.percentile(connected, 99, method='higher')) if len(connected) else 0,
+        'histogram': {int(d): int(n) for d, n in enumerate(histogram) if n}
+    }
+
+def profile_graph(graph, top_hubs=TOP_HUBS):
+    n = graph.node_count
+    node_type_count = len(graph.node_types)
+    edge_type_count = len(graph.edge_types)
+    valid = (graph.edge_from != UNKNOWN) & (graph.edge_to != UNKNOWN)
+    src = graph.edge_from[valid].astype(np.int64)
+    dst = graph.edge_to[valid].astype(np.int64)
+    types = graph.edge_type_codes[valid]
+
+    profile = {
+        'nodes': n,
+        'edges': int(len(graph.edge_from)),
+        'duplicate_node_ids': graph.duplicate_node_ids,
+        'dangling_edges': int((~valid).sum()),
+        'node_types': {t: int(c) for t, c in zip(graph.node_types,
+                                                 np.bincount(graph.node_type_codes, minlength=node_type_count))},
+        'edge_types': {t: int(c) for t, c in zip(graph.edge_types,
+                                                 np.bincount(graph.edge_type_codes, minlength=edge_type_count))},
+        'degrees': {},
+        'duplicate_edges': {},
+    }
+
+    # Degrees per edge type: one bincount per direction
+    for code, edge_type in enumerate(graph.edge_types):
+        mask = types == code
+        profile['degrees'][edge_type] = {
+            'out': degree_summary(np.bincount(src[mask], minlength=n)),
+            'in': degree_summary(np.bincount(dst[mask], minlength=n))
+        }
+
+    # Orphans: nodes no valid edge touches
+    total_degree = np.bincount(src, minlength=n) + np.bincount(dst, minlength=n)
+    orphans = np.flatnonzero(total_degree == 0)
+    profile['orphans'] = {
+        'total': int(len(orphans)),
+        'by_node_type': {t: int(c) for t, c in zip(graph.node_types, np.bincount(
+            graph.node_type_codes[orphans], minlength=node_type_count)) if c},
+        'samples': graph.node_index[orphans[:SAMPLE_SIZE]].tolist()
+    }
+
+    # Parallel edges: same (from, to) within an edge type, found by sorting one int64 key
+    for code, edge_type in enumerate(graph.edge_types):
+        mask = types == code
+        keys, counts = np.unique(src[mask] * n + dst[mask], return_counts=True)
+        repeated = counts > 1
+        worst = np.argsort(counts[repeated])[::-1][:SAMPLE_SIZE]
+        profile['duplicate_edges'][edge_type] = {
+            'extra_edges': int((counts[repeated] - 1).sum()),
+            'node_pairs': int(repeated.sum()),
+            'samples': [{'from': graph.node_index[int(k // n)], 'to': graph.node_index[int(k % n)], 'edges': int(c)}
+                        for k, c in zip(keys[repeated][worst], counts[repeated][worst])]
+        }
+
+    # Node type x edge type, for the source and the target end of each edge
+    for end, nodes in (('from', src), ('to', dst)):
+        matrix = np.bincount(graph.node_type_codes[nodes].astype(np.int64) * edge_type_count + types,
+                             minlength=node_type_count * edge_type_count).reshape(node_type_count, edge_type_count)
+        profile[f'type_matrix_{end}'] = {
+            node_type: {edge_type: int(matrix[i, j]) for j, edge_type in enumerate(graph.edge_types) if matrix[i, j]}
+            for i, node_type in enumerate(graph.node_types) if matrix[i].any()
+        }
+
+    # Hubs: highest total degree, without sorting every node
+    k = min(top_hubs, n)
+    if k:
+        top = np.argpartition(total_degree, -k)[-k:]
+        top = top[np.argsort(total_degree[top])[::-1]]
+        profile['hubs'] = [{'node_id': graph.node_index[i], 'node_type': graph.node_types[graph.node_type_codes[i]],
+                            'degree': int(total_degree[i])} for i in top if total_degree[i]]
+    else:
+        profile['hubs'] = []
+    return profile
+
+def markdown_report(profile):
+    lines = [
+        '# Graph Profile',
+        '',
+        f"- Nodes: {profile['nodes']}",
+        f"- Edges: {profile['edges']}",
+        f"- Dangling edges (endpoint not a node): {profile['dangling_edges']}",
+        f"- Duplicate node IDs: {profile['duplicate_node_ids']}",
+        f"- Orphan nodes: {profile['orphans']['total']}",
+        '',
+        '## Node types',
+        '',
+        '| node type | nodes | orphans |',
+        '|---|---:|---:|'
+    ]
+    for node_type, count in profile['node_types'].items():
+        lines.append(f"| {node_type} | {count} | {profile['orphans']['by_node_type'].get(node_type, 0)} |")
+
+    lines += ['', '## Degrees per edge type', '',
+              '| edge type | edges | out: nodes / mean / p99 / max | in: nodes / mean / p99 / max | parallel extra edges |',
+              '|---|---:|---|---|---:|']
+    for edge_type, count in profile['edge_types'].items():
+        out_degree = profile['degrees'][edge_type]['out']
+        in_degree = profile['degrees'][edge_type]['in']
+        lines.append(f"| {edge_type} | {count} "
+                     f"| {out_degree['nodes']} / {out_degree['mean']} / {out_degree['p99']} / {out_degree['max']} "
+                     f"| {in_degree['nodes']} / {in_degree['mean']} / {in_degree['p99']} / {in_degree['max']} "
+                     f"| {profile['duplicate_edges'][edge_type]['extra_edges']} |")
+
+    for end in ('from', 'to'):
+        matrix = profile[f'type_matrix_{end}']
+        edge_types = list(profile['edge_types'])
+        lines += ['', f"## Node type x edge type ({end} end)", '',
+                  '| node type | ' + ' | '.join(edge_types) + ' |',
+                  '|---|' + '---:|' * len(edge_types)]
+        for node_type, row in matrix.items():
+            lines.append(f"| {node_type} | " + ' | '.join(str(row.get(t, 0)) for t in edge_types) + ' |')
+
+    lines += ['', '## Hubs', '', '| node id | node type | degree |', '|---|---|---:|']
+    for hub in profile['hubs']:
+        lines.append(f"| {hub['node_id']} | {hub['node_type']} | {hub['degree']} |")
+    return '\n'.join(lines) + '\n'
+
+def run_profile(gds_dir=GDS_DIR, node_data=None, report_dir=REPORT_DIR, top_hubs=TOP_HUBS):
+    try:
+        start_time = time.time()
+        print(f"Reading nodes and edges from {gds_dir}...")
+        graph = load_graph(gds_dir, node_data)
+        load_seconds = time.time() - start_time
+        print(f"Loaded {graph.node_count} nodes and {len(graph.edge_from)} edges in {load_seconds:.2f}s")
+
+        profile_start = time.time()
+        profile = profile_graph(graph, top_hubs)
+        profile['seconds'] = {'load': round(load_seconds, 3), 'profile': round(time.time() - profile_start, 3)}
+        print(f"Profiled in {profile['seconds']['profile']:.2f}s")
+
+        os.makedirs(report_dir, exist_ok=True)
+        json_path = os.path.join(report_dir, 'graph_profile.json')
+        markdown_path = os.path.join(report_dir, 'graph_profile.md')
+        with open(json_path, 'w') as f:
+            json.dump(profile, f, indent=2)
+        markdown = markdown_report(profile)
+        with open(markdown_path, 'w') as f:
+            f.write(markdown)
+
+        print()
+        print(markdown)
+        print(f"Saved {json_path} and {markdown_path}")
+        return profile
+
+    except Exception as e:
+        print(f"Error profiling graph: {str(e)}")
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Degree, orphan, duplicate-edge and type profile of the GDS graph')
+    parser.add_argument('--gds-dir', default=GDS_DIR, help='Directory with the GDS node and edge files')
+    parser.add_argument('--node-data', help='node_data.csv with IDs for node types that have no GDS node file')
+    parser.add_argument('--report-dir', default=REPORT_DIR, help='Directory for graph_profile.json/.md')
+    parser.add_argument('--top-hubs', type=int, default=TOP_HUBS, help='Highest-degree nodes to list')
+    args = parser.parse_args()
+    run_profile(args.gds_dir, args.node_data, args.report_dir, args.top_hubs)
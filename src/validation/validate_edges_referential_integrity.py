@@ -1,47 +1,220 @@
+import argparse
+import os
+
+import numpy as np
 import pandas as pd
-import json
 
-def validate_edges():
+from neptune.bloom_filter import DEFAULT_FPR, NodeBloomFilters
+from neptune.gds import GDS_DIR, GDS_NODE_FILES, gds_edge_files, iter_json_array
+from neptune.node_registry import MISSING, UNKNOWN_TYPE, NodeRegistry
+
+# Edges checked per vectorized batch; memory is bounded by this plus the node registry
+CHUNK_SIZE = 1000000
+SAMPLE_SIZE = 5
+ENDPOINT_COLUMNS = ['node_id_from', 'node_id_to']
+
+
+def iter_node_id_chunks(gds_dir=GDS_DIR, node_data=None, chunk_size=CHUNK_SIZE):
+    """(node_type, ids) batches from the GDS node files, plus node_data.csv for types without a node file"""
+    from_files = set()
+    for node_type, filename in GDS_NODE_FILES.items():
+        path = os.path.join(gds_dir, filename)
+        if not os.path.exists(path):
+            continue
+        from_files.add(node_type)
+        ids = []
+        for node in iter_json_array(path):
+            ids.append(node['node_id'])
+            if len(ids) >= chunk_size:
+                yield node_type, ids
+                ids = []
+        if ids:
+            yield node_type, ids
+    if node_data:
+        for chunk in pd.read_csv(node_data, usecols=['node_id', 'node_type'], chunksize=chunk_size):
+            for node_type, group in chunk.groupby('node_type'):
+                if node_type not in from_files:
+                    yield node_type, group['node_id'].tolist()
+
+def load_registry(gds_dir=GDS_DIR, node_data=None):
+    ids_by_type = {}
+    for node_type, ids in iter_node_id_chunks(gds_dir, node_data):
+        ids_by_type.setdefault(node_type, []).extend(ids)
+    return NodeRegistry.from_ids_by_type(ids_by_type)
+
+def load_bloom_filters(gds_dir=GDS_DIR, node_data=None, fpr=DEFAULT_FPR):
+    """One Bloom filter per node type, built in a single pass over the node files"""
+    filters = NodeBloomFilters(fpr)
+    for node_type, ids in iter_node_id_chunks(gds_dir, node_data):
+        filters.add(node_type, ids)
+    return filters
+
+def endpoint_types(edge_type):
+    """Expected (from, to) node types of an edge type, e.g. person_name -> (person, name)"""
+    parts = str(edge_type).split('_', 1)
+    return (parts[0], parts[1]) if len(parts) == 2 else (None, None)
+
+def new_file_stats():
+    return {
+        'edges': 0,
+        'missing_from': 0,
+        'missing_to': 0,
+        'wrong_from_type': 0,
+        'wrong_to_type': 0,
+        'samples': {'missing_from': [], 'missing_to': [], 'wrong_from_type': [], 'wrong_to_type': []}
+    }
+
+def check_chunk(registry, chunk, stats):
+    """Vectorized endpoint existence and type checks for one batch of edges"""
+    edges = pd.DataFrame(chunk, columns=['edge_id', 'node_id_from', 'node_id_to', 'edge_type'])
+    # One hash join per endpoint column
+    from_codes = registry.type_codes(edges['node_id_from'])
+    to_codes = registry.type_codes(edges['node_id_to'])
+
+    expected = {edge_type: tuple(registry.type_code(t) if t else UNKNOWN_TYPE for t in endpoint_types(edge_type))
+                for edge_type in edges['edge_type'].unique()}
+    expected_from = edges['edge_type'].map({k: v[0] for k, v in expected.items()}).to_numpy()
+    expected_to = edges['edge_type'].map({k: v[1] for k, v in expected.items()}).to_numpy()
+
+    checks = {
+        'missing_from': (from_codes == MISSING, 'node_id_from'),
+        'missing_to': (to_codes == MISSING, 'node_id_to'),
+        'wrong_from_type': ((from_codes != MISSING) & (from_codes != expected_from), 'node_id_from'),
+        'wrong_to_type': ((to_codes != MISSING) & (to_codes != expected_to), 'node_id_to')
+    }
+    stats['edges'] += len(edges)
+    for name, (mask, column) in checks.items():
+        stats[name] += int(mask.sum())
+        room = SAMPLE_SIZE - len(stats['samples'][name])
+        if room > 0 and mask.any():
+            for row in edges.loc[mask, ['edge_id', 'edge_type', column]].head(room).itertuples(index=False):
+                stats['samples'][name].append({'edge_id': row[0], 'edge_type': row[1], 'node_id': row[2]})
+
+def iter_edge_chunks(path, chunk_size=CHUNK_SIZE):
+    chunk = []
+    for edge in iter_json_array(path):
+        chunk.append((edge.get('edge_id'), edge.get('node_id_from'), edge.get('node_id_to'), edge.get('edge_type')))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def validate_edge_file(registry, path, chunk_size=CHUNK_SIZE):
+    stats = new_file_stats()
+    for chunk in iter_edge_chunks(path, chunk_size):
+        check_chunk(registry, chunk, stats)
+    return stats
+
+def scan_edge_file_bloom(filters, path, chunk_size=CHUNK_SIZE):
+    """Edge count and suspected misses: endpoints the Bloom filter of their expected type rules out.
+
+    Filter misses are certain, so only these endpoints need an exact check;
+    they are keyed by (column, node_id, expected type, edge_type) so the
+    exact pass resolves each distinct ID once.
+    """
+    edge_count = 0
+    suspects = {}
+    for chunk in iter_edge_chunks(path, chunk_size):
+        edges = pd.DataFrame(chunk, columns=['edge_id', 'node_id_from', 'node_id_to', 'edge_type'])
+        edge_count += len(edges)
+        for edge_type, group in edges.groupby('edge_type', sort=False):
+            for column, expected in zip(ENDPOINT_COLUMNS, endpoint_types(edge_type)):
+                # No expected type (edge type not from_to): every endpoint is a wrong type or missing,
+                # as in registry mode, so all of them go to the exact check
+                if expected is None:
+                    misses = np.ones(len(group), dtype=bool)
+                else:
+                    misses = ~filters.contains(group[column].to_numpy(), expected)
+                for edge_id, node_id in zip(group['edge_id'][misses], group[column][misses]):
+                    entry = suspects.setdefault((column, node_id, expected, edge_type), {'count': 0, 'edge_ids': []})
+                    entry['count'] += 1
+                    if len(entry['edge_ids']) < SAMPLE_SIZE:
+                        entry['edge_ids'].append(edge_id)
+    return edge_count, suspects
+
+def exact_node_types(node_ids, gds_dir=GDS_DIR, node_data=None):
+    """Actual node type of each suspected ID, from one more pass over the node files"""
+    wanted = pd.Index(list(node_ids))
+    found = {}
+    for node_type, ids in iter_node_id_chunks(gds_dir, node_data):
+        ids = pd.Series(ids, dtype=object)
+        for node_id in ids[ids.isin(wanted)]:
+            found.setdefault(node_id, node_type)
+    return found
+
+def classify_suspects(edge_count, suspects, actual_types):
+    stats = new_file_stats()
+    stats['edges'] = edge_count
+    for (column, node_id, expected, edge_type), entry in suspects.items():
+        actual = actual_types.get(node_id)
+        if actual is not None and actual == expected:
+            continue
+        end = 'from' if column == 'node_id_from' else 'to'
+        name = f"missing_{end}" if actual is None else f"wrong_{end}_type"
+        stats[name] += entry['count']
+        for edge_id in entry['edge_ids'][:SAMPLE_SIZE - len(stats['samples'][name])]:
+            stats['samples'][name].append({'edge_id': edge_id, 'edge_type': edge_type, 'node_id': node_id})
+    return stats
+
+def validate_edge_files_bloom(edge_files, gds_dir=GDS_DIR, node_data=None, chunk_size=CHUNK_SIZE, fpr=DEFAULT_FPR):
+    """Per-file stats using Bloom filters, with an exact re-check of only the suspected misses"""
+    filters = load_bloom_filters(gds_dir, node_data, fpr)
+    for node_type, count in filters.counts().items():
+        print(f"  {node_type}: {count} nodes (filter FPR ~{filters.filters[node_type].estimated_fpr():.4%})")
+    print(f"  Bloom filters: {filters.nbytes() / 1024 ** 2:.1f} MiB")
+
+    scans = {}
+    for path in edge_files:
+        print(f"Scanning {os.path.basename(path)}...")
+        scans[path] = scan_edge_file_bloom(filters, path, chunk_size)
+
+    suspect_ids = {node_id for _, suspects in scans.values() for (_, node_id, _, _) in suspects}
+    print(f"Re-checking {len(suspect_ids)} suspected missing endpoint IDs against the node files...")
+    actual_types = exact_node_types(suspect_ids, gds_dir, node_data) if suspect_ids else {}
+    return {path: classify_suspects(edge_count, suspects, actual_types)
+            for path, (edge_count, suspects) in scans.items()}
+
+def validate_edges(gds_dir=GDS_DIR, node_data=None, chunk_size=CHUNK_SIZE, bloom=False, fpr=DEFAULT_FPR):
     try:
-        # Read the node data
-        print("Reading mock_person_data.json...")
-        with open('src/data/output/gds/mock_person_data.json', 'r') as f:
-            person_data = json.load(f)
-        node_ids = set(person['node_id'] for person in person_data)
-        print(f"Found {len(node_ids)} unique nodes in mock_person_data.json")
-        
-        # Read the edge data
-        print("\nReading mock_person-name_data.json...")
-        with open('src/data/output/gds/mock_person-name_data.json', 'r') as f:
-            edge_data = [json.loads(line) for line in f]
-        edge_df = pd.DataFrame(edge_data)
-        print(f"Found {len(edge_df)} edges to validate")
-        
-        # Check for missing source nodes
-        missing_from = set(edge_df['node_id_from']) - node_ids
-        if missing_from:
-            print(f"\nERROR: Found {len(missing_from)} edges with missing source nodes:")
-            for node_id in missing_from:
-                print(f"  - Edge source node {node_id} not found in mock_person_data.json")
-        
-        # Check for missing target nodes
-        missing_to = set(edge_df['node_id_to']) - node_ids
-        if missing_to:
-            print(f"\nERROR: Found {len(missing_to)} edges with missing target nodes:")
-            for node_id in missing_to:
-                print(f"  - Edge target node {node_id} not found in mock_person_data.json")
-        
-        # Print summary
-        total_errors = len(missing_from) + len(missing_to)
+        edge_files = gds_edge_files(gds_dir)
+        if not edge_files:
+            print(f"Error: No edge files found in {gds_dir}")
+            return False
+
+        if bloom:
+            print("Building Bloom filters from node IDs...")
+            results = validate_edge_files_bloom(edge_files, gds_dir, node_data, chunk_size, fpr)
+        else:
+            print("Loading node IDs...")
+            registry = load_registry(gds_dir, node_data)
+            for node_type, count in registry.counts().items():
+                print(f"  {node_type}: {count} nodes")
+            if registry.duplicate_ids:
+                print(f"\nWARNING: {len(registry.duplicate_ids)} node IDs appear under more than one node type")
+                print("  Sample:", registry.duplicate_ids[:SAMPLE_SIZE])
+            results = {path: validate_edge_file(registry, path, chunk_size) for path in edge_files}
+
+        total_errors = 0
+        for path, stats in results.items():
+            print(f"\nValidating {os.path.basename(path)}...")
+            errors = stats['missing_from'] + stats['missing_to'] + stats['wrong_from_type'] + stats['wrong_to_type']
+            total_errors += errors
+            print(f"  Edges: {stats['edges']}")
+            for name in ('missing_from', 'missing_to', 'wrong_from_type', 'wrong_to_type'):
+                if stats[name]:
+                    print(f"  ERROR: {stats[name]} edges with {name.replace('_', ' ')} node")
+                    for sample in stats['samples'][name]:
+                        print(f"    - edge {sample['edge_id']} ({sample['edge_type']}): node {sample['node_id']}")
+
+        if bloom:
+            print(f"\nNote: Bloom filter hits are not re-checked; up to ~{fpr:.2%} of bad endpoints can go undetected")
         if total_errors == 0:
-            print("\nSUCCESS: All edges have valid source and target nodes!")
+            print("\nSUCCESS: All edges have existing source and target nodes of the expected types!")
         else:
             print(f"\nFAILURE: Found {total_errors} referential integrity errors")
-            print(f"  - {len(missing_from)} missing source nodes")
-            print(f"  - {len(missing_to)} missing target nodes")
-        
         return total_errors == 0
-        
+
     except FileNotFoundError as e:
         print(f"Error: Required file not found - {str(e)}")
         return False
@@ -50,4 +223,13 @@ def validate_edges():
         return False
 
 if __name__ == "__main__":
-    validate_edges() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Check that every GDS edge points at existing nodes of the right types')
+    parser.add_argument('--gds-dir', default=GDS_DIR, help='Directory with the GDS node and edge files')
+    parser.add_argument('--node-data', help='node_data.csv with IDs for node types that have no GDS node file')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Edges checked per batch')
+    parser.add_argument('--bloom', action='store_true',
+                        help='Use per-type Bloom filters instead of an in-memory ID index (graphs larger than RAM)')
+    parser.add_argument('--fpr', type=float, default=DEFAULT_FPR, help='Bloom filter false-positive rate')
+    args = parser.parse_args()
+    if not validate_edges(args.gds_dir, args.node_data, args.chunk_size, args.bloom, args.fpr):
+        exit(1)
@@ -1,38 +1,29 @@
 import pandas as pd
-from tqdm import tqdm
+
+from neptune.node_registry import MISSING, NodeRegistry
 
 def validate_name_data():
     try:
         print("Reading data files...")
         
-        # Read both CSV files
+        # Read the mock names and the (cached) node registry for node_data.csv
         mock_name_df = pd.read_csv('mock_name_data.csv')
-        node_df = pd.read_csv('node_data.csv', usecols=['node_id', 'node_type'])
-        
-        # Get all name nodes from node_data.csv
-        name_nodes = set(node_df[node_df['node_type'] == 'name']['node_id'])
+        registry = NodeRegistry.load('node_data.csv')
         
-        # Initialize counters and lists for errors
         total_mock_records = len(mock_name_df)
-        missing_nodes = []
-        wrong_type_nodes = []
+        name_count = registry.counts().get('name', 0)
         
         print("\nValidating name data...")
-        # Check each record in mock_name_data.csv
-        for _, row in tqdm(mock_name_df.iterrows(), total=total_mock_records, desc="Validating records"):
-            node_id = row['node_id']
-            
-            # Check if node exists in node_data.csv
-            if node_id not in node_df['node_id'].values:
-                missing_nodes.append(node_id)
-            # Check if node is of type 'name'
-            elif node_id not in name_nodes:
-                wrong_type_nodes.append(node_id)
+        # One hash lookup per record instead of a scan of node_data.csv
+        node_ids = mock_name_df['node_id']
+        codes = registry.type_codes(node_ids)
+        missing_nodes = node_ids[codes == MISSING].tolist()
+        wrong_type_nodes = node_ids[(codes != MISSING) & (codes != registry.type_code('name'))].tolist()
         
         # Print validation results
         print("\nValidation Results:")
         print(f"Total records in mock_name_data.csv: {total_mock_records}")
-        print(f"Total name nodes in node_data.csv: {len(name_nodes)}")
+        print(f"Total name nodes in node_data.csv: {name_count}")
         
         if missing_nodes:
             print(f"\nError: Found {len(missing_nodes)} nodes in mock_name_data.csv that don't exist in node_data.csv")
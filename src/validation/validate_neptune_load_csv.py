@@ -0,0 +1,338 @@
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from datetime import date
+
+NEPTUNE_DIR = 'src/data/output/neptune'
+# Row-level samples kept per file and rule; every occurrence is still counted
+MAX_SAMPLES = 20
+
+# Neptune bulk load property types (case-insensitive). openCypher adds DateTime.
+SCALAR_TYPES = {'bool', 'boolean', 'byte', 'short', 'int', 'long', 'float', 'double', 'string', 'date'}
+OPENCYPHER_TYPES = SCALAR_TYPES | {'datetime'}
+INT_RANGES = {
+    'byte': (-2 ** 7, 2 ** 7 - 1),
+    'short': (-2 ** 15, 2 ** 15 - 1),
+    'int': (-2 ** 31, 2 ** 31 - 1),
+    'long': (-2 ** 63, 2 ** 63 - 1)
+}
+
+# System columns each file kind must have
+REQUIRED_COLUMNS = {
+    ('gremlin', 'vertex'): ['~id', '~label'],
+    ('gremlin', 'edge'): ['~id', '~from', '~to', '~label'],
+    ('opencypher', 'vertex'): ['ID', 'LABEL'],
+    ('opencypher', 'edge'): ['ID', 'START_ID', 'END_ID', 'TYPE']
+}
+GREMLIN_SYSTEM_COLUMNS = {'~id', '~label', '~from', '~to'}
+
+PROPERTY_HEADER = re.compile(r'^(?P<name>[^:]+)(?::(?P<type>[A-Za-z]+)(?:\((?P<cardinality>single|set)\))?'
+                             r'(?P<array>\[\])?)?$')
+OPENCYPHER_SYSTEM_HEADER = re.compile(r'^(?P<name>[^:]*):(?P<kind>ID|START_ID|END_ID|LABEL|TYPE|IGNORE)'
+                                      r'(?:\((?P<space>[^)]*)\))?$')
+DATE_VALUE = re.compile(r'^\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?$')
+# Neptune splits array values on ';' unless escaped as '\;'
+ARRAY_SPLIT = re.compile(r'(?<!\\);')
+
+
+def check_int(kind):
+    low, high = INT_RANGES[kind]
+
+    def check(value):
+        try:
+            number = int(value)
+        except ValueError:
+            return f"'{value}' is not an integer"
+        if not low <= number <= high:
+            return f"{value} is out of range for {kind.capitalize()}"
+        return None
+    return check
+
+def check_float(value):
+    try:
+        float(value)
+    except ValueError:
+        return f"'{value}' is not a number"
+    return None
+
+def check_bool(value):
+    if value.lower() not in ('true', 'false'):
+        return f"'{value}' is not true or false"
+    return None
+
+def check_date(value):
+    if not DATE_VALUE.match(value):
+        return f"'{value}' is not an ISO-8601 date (yyyy-MM-dd[THH:mm[:ss][Z]])"
+    try:
+        date.fromisoformat(value[:10])
+    except ValueError:
+        return f"'{value}' is not a valid calendar date"
+    return None
+
+def scalar_checker(type_name):
+    type_name = type_name.lower()
+    if type_name in INT_RANGES:
+        return check_int(type_name)
+    if type_name in ('float', 'double'):
+        return check_float
+    if type_name in ('bool', 'boolean'):
+        return check_bool
+    if type_name in ('date', 'datetime'):
+        return check_date
+    return None
+
+def array_checker(type_name):
+    """Checks each ';'-separated element and flags arrays written with the wrong delimiter"""
+    element_check = scalar_checker(type_name)
+
+    def check(value):
+        if value.startswith('[') and value.endswith(']'):
+            return (f"array written as a bracketed list {value[:40]!r}; Neptune array values are "
+                    f"';'-separated", 'error')
+        elements = ARRAY_SPLIT.split(value)
+        if len(elements) == 1 and type_name.lower() == 'string' and ':' in value:
+            return f"'{value[:40]}' looks like a ':'-joined list; Neptune splits arrays on ';' only", 'warning'
+        if element_check:
+            for element in elements:
+                message = element_check(element)
+                if message:
+                    return message, 'error'
+        return None
+    return check
+
+class LintReport:
+    """Error and warning counts per file and rule, with the first MAX_SAMPLES occurrences of each"""
+
+    def __init__(self, max_samples=MAX_SAMPLES):
+        self.max_samples = max_samples
+        self.files = {}
+
+    def file(self, path):
+        return self.files.setdefault(path, {'rows': 0, 'format': None, 'kind': None, 'issues': {}})
+
+    def add(self, path, rule, severity, line, message):
+        issue = self.file(path)['issues'].setdefault(rule, {'severity': severity, 'count': 0, 'samples': []})
+        issue['count'] += 1
+        if len(issue['samples']) < self.max_samples:
+            issue['samples'].append({'line': line, 'message': message})
+
+    def count(self, severity):
+        return sum(issue['count'] for entry in self.files.values()
+                   for issue in entry['issues'].values() if issue['severity'] == severity)
+
+def parse_header(path, header, report):
+    """(format, kind, id_columns, property_checkers) for a CSV header, or None if it is unusable"""
+    if any(column in GREMLIN_SYSTEM_COLUMNS for column in header):
+        load_format = 'gremlin'
+        kind = 'edge' if '~from' in header or '~to' in header else 'vertex'
+    elif any(OPENCYPHER_SYSTEM_HEADER.match(column) for column in header):
+        load_format = 'opencypher'
+        kind = 'edge' if any(re.search(r':(START|END)_ID', column) for column in header) else 'vertex'
+    else:
+        report.add(path, 'header.format', 'error', 1,
+                   "no ~id/~label (Gremlin) or :ID/:LABEL (openCypher) columns; not a Neptune load file")
+        return None
+
+    system = {}
+    checkers = []
+    seen = set()
+    for position, column in enumerate(header):
+        if load_format == 'gremlin' and column.startswith('~'):
+            if column not in GREMLIN_SYSTEM_COLUMNS:
+                report.add(path, 'header.system_column', 'error', 1, f"unknown system column '{column}'")
+            system[column] = (position, None)
+            continue
+        if load_format == 'opencypher':
+            match = OPENCYPHER_SYSTEM_HEADER.match(column)
+            if match:
+                system[match.group('kind')] = (position, match.group('space') or None)
+                # 'name:ID' also stores the ID as a String property
+                if match.group('name') and match.group('kind') != 'IGNORE':
+                    seen.add(match.group('name'))
+                continue
+
+        match = PROPERTY_HEADER.match(column)
+        if not match:
+            report.add(path, 'header.property', 'error', 1, f"malformed property column '{column}'")
+            continue
+        name = match.group('name')
+        type_name = (match.group('type') or 'String')
+        if name in seen:
+            report.add(path, 'header.duplicate', 'error', 1, f"property '{name}' appears more than once")
+        seen.add(name)
+        allowed = OPENCYPHER_TYPES if load_format == 'opencypher' else SCALAR_TYPES
+        if type_name.lower() not in allowed:
+            report.add(path, 'header.type', 'error', 1, f"'{column}' has unknown type '{type_name}'")
+            continue
+        is_array = bool(match.group('array'))
+        if kind == 'edge' and (is_array or match.group('cardinality') == 'set'):
+            report.add(path, 'header.edge_array', 'error', 1, f"'{column}': edge properties cannot be multi-valued")
+            continue
+        checker = array_checker(type_name) if is_array else scalar_checker(type_name)
+        if checker:
+            checkers.append((position, column, checker, is_array))
+
+    missing = [column for column in REQUIRED_COLUMNS[(load_format, kind)] if column not in system]
+    for column in missing:
+        shown = column if load_format == 'gremlin' else f":{column}"
+        report.add(path, 'header.required', 'error', 1, f"{kind} file is missing the required '{shown}' column")
+    if missing:
+        return None
+
+    if load_format == 'gremlin':
+        columns = {'id': system['~id'], 'label': system['~label'],
+                   'from': system.get('~from'), 'to': system.get('~to')}
+    else:
+        columns = {'id': system['ID'], 'label': system.get('LABEL') or system.get('TYPE'),
+                   'from': system.get('START_ID'), 'to': system.get('END_ID')}
+    return load_format, kind, columns, checkers
+
+def lint_file(path, report, ids, check_endpoints=True):
+    """Stream one CSV once. ids holds every ID seen so far per (kind, ID space), so vertex
+    files linted first provide the endpoint lookups for the edge files after them."""
+    entry = report.file(path)
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            report.add(path, 'header.missing', 'error', 1, "file is empty")
+            return
+        parsed = parse_header(path, header, report)
+        if parsed is None:
+            return
+        load_format, kind, columns, checkers = parsed
+        entry['format'] = load_format
+        entry['kind'] = kind
+
+        id_position, id_space = columns['id']
+        label_position = columns['label'][0]
+        endpoints = [(name, columns[name]) for name in ('from', 'to') if columns[name]]
+        check_endpoints = check_endpoints and kind == 'edge'
+        width = len(header)
+        seen_ids = ids.setdefault((kind, id_space), set())
+        rows = 0
+
+        for row in reader:
+            rows += 1
+            line = reader.line_num
+            if len(row) != width:
+                report.add(path, 'row.width', 'error', line, f"{len(row)} fields, header has {width}")
+                continue
+
+            node_id = row[id_position]
+            if not node_id:
+                report.add(path, 'row.id', 'error', line, "empty id")
+            elif node_id in seen_ids:
+                report.add(path, 'row.duplicate_id', 'error', line, f"duplicate {kind} id '{node_id}'")
+            else:
+                seen_ids.add(node_id)
+
+            if not row[label_position]:
+                report.add(path, 'row.label', 'error', line, "empty label")
+
+            for name, (position, space) in endpoints:
+                endpoint = row[position]
+                if not endpoint:
+                    report.add(path, f"row.{name}", 'error', line, f"empty {name} id")
+                elif check_endpoints and endpoint not in ids.get(('vertex', space), ()):
+                    report.add(path, f"row.{name}_missing", 'error', line,
+                               f"{name} vertex '{endpoint}' is not in any vertex file")
+
+            for position, column, checker, is_array in checkers:
+                value = row[position]
+                if not value:
+                    continue
+                result = checker(value)
+                if result is None:
+                    continue
+                if is_array:
+                    message, severity = result
+                else:
+                    message, severity = result, 'error'
+                report.add(path, f"value.{column}", severity, line, message)
+
+    entry['rows'] = rows
+
+def csv_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            # Same selection as the S3 upload and bulk load scripts
+            files.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                if name.lower().endswith('.csv')))
+        else:
+            files.append(path)
+    return files
+
+def is_edge_file(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        header = next(csv.reader(f), [])
+    return '~from' in header or any(re.search(r':START_ID', column) for column in header)
+
+def lint_neptune_csv(paths=(NEPTUNE_DIR,), check_endpoints=True, max_samples=MAX_SAMPLES, report_file=None):
+    try:
+        files = csv_files(paths)
+        if not files:
+            print(f"Error: No CSV files found in {', '.join(paths)}")
+            return False
+
+        # Vertex files first, so edge endpoints are checked in the same pass
+        edge_files = [path for path in files if is_edge_file(path)]
+        vertex_files = [path for path in files if path not in edge_files]
+        if check_endpoints and edge_files and not vertex_files:
+            print("No vertex files given; skipping edge endpoint checks")
+            check_endpoints = False
+
+        report = LintReport(max_samples)
+        ids = {}
+        start_time = time.time()
+        for path in vertex_files + edge_files:
+            file_start = time.time()
+            lint_file(path, report, ids, check_endpoints)
+            entry = report.files[path]
+            status = 'ok' if not entry['issues'] else f"{sum(i['count'] for i in entry['issues'].values())} issue(s)"
+            print(f"{os.path.basename(path)}: {entry['rows']} rows, {entry['format'] or '?'} {entry['kind'] or ''} "
+                  f"({time.time() - file_start:.2f}s) {status}")
+
+        for path, entry in report.files.items():
+            for rule, issue in sorted(entry['issues'].items()):
+                print(f"\n{issue['severity'].upper()}: {os.path.basename(path)} {rule}: {issue['count']} occurrence(s)")
+                for sample in issue['samples']:
+                    print(f"  line {sample['line']}: {sample['message']}")
+
+        errors = report.count('error')
+        warnings = report.count('warning')
+        rows = sum(entry['rows'] for entry in report.files.values())
+        print(f"\nLinted {rows} rows in {len(files)} file(s) in {time.time() - start_time:.2f}s: "
+              f"{errors} error(s), {warnings} warning(s)")
+
+        if report_file:
+            os.makedirs(os.path.dirname(report_file) or '.', exist_ok=True)
+            with open(report_file, 'w') as f:
+                json.dump({'errors': errors, 'warnings': warnings, 'files': report.files}, f, indent=2)
+            print(f"Saved report to {report_file}")
+
+        if errors == 0:
+            print("\nSUCCESS: Files are ready for Neptune bulk load")
+        else:
+            print("\nFAILURE: Fix the errors above before uploading")
+        return errors == 0
+
+    except Exception as e:
+        print(f"Error during validation: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Lint Neptune bulk load CSVs (Gremlin and openCypher) before upload')
+    parser.add_argument('paths', nargs='*', default=[NEPTUNE_DIR], help='CSV files or directories')
+    parser.add_argument('--no-endpoints', action='store_true',
+                        help='Do not require edge endpoints to be in the linted vertex files')
+    parser.add_argument('--max-samples', type=int, default=MAX_SAMPLES, help='Row samples shown per file and rule')
+    parser.add_argument('--report', help='Write the full result as JSON')
+    args = parser.parse_args()
+    ok = lint_neptune_csv(args.paths, not args.no_endpoints, args.max_samples, args.report)
+    sys.exit(0 if ok else 1)